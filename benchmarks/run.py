@@ -0,0 +1,338 @@
+"""Benchmark harness for the preprocess -> merge -> predict pipeline.
+
+Every case runs in a fresh worker process so wall time and peak RSS are not skewed by
+caches or allocations left behind by earlier cases. Results are written to
+``benchmarks/results/<timestamp>_<commit>.json`` and can be compared across commits.
+
+Usage (from the project root):
+    python -m benchmarks.run                          # bundled data, scales 1/10/100
+    python -m benchmarks.run --scales 1 10 --cases merge predict_batch
+    python -m benchmarks.run --compare benchmarks/results/A.json benchmarks/results/B.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+_project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from preprocessing import preprocessing as pp
+from preprocessing.merge_datasets import AVAILABLE_YEARS, PREPROCESSED_FILES, get_preprocessed_dir
+from preprocessing.schemas import DATASET_SCHEMAS
+
+RESULTS_DIR = os.path.join(_project_root, "benchmarks", "results")
+LITE_MODEL_PATH = os.path.join(_project_root, "streamlit", "models", "catboost_best_model_lite.joblib")
+TEST_DATA_PATH = os.path.join(_project_root, "streamlit", "models", "test_data.csv")
+
+# 원본(raw) 테이블을 읽는 전처리 함수
+PREPROCESS_CASES = {
+    "preprocess_activity_consumption": pp.preprocess_activity_consumption,
+    "preprocess_activity_history": pp.preprocess_activity_history,
+    "preprocess_lodging_consumption": pp.preprocess_lodging_consumption,
+    "preprocess_traveller_master": pp.preprocess_traveller_master,
+    "preprocess_visit_area_info": pp.preprocess_visit_area_info,
+}
+PIPELINE_CASES = ["merge", "mis_one_hot", "predict_single", "predict_batch"]
+ALL_CASES = list(PREPROCESS_CASES) + PIPELINE_CASES
+
+# 복제 시 새 키를 부여할 컬럼
+STRING_KEYS = ["TRAVEL_ID", "TRAVELER_ID"]
+INTEGER_KEYS = ["VISIT_AREA_ID"]
+
+
+# ---------------------------------------------------------------------------
+# Scaled inputs
+# ---------------------------------------------------------------------------
+def scaled_mode(source_mode, scale):
+    """Mode directory name that holds ``source_mode`` replicated ``scale`` times."""
+    return source_mode if scale == 1 else f"bench_x{scale}_{source_mode}"
+
+
+def replicate_table(df, scale):
+    """Stack ``scale`` copies of a table, re-keying IDs so every copy is a distinct trip."""
+    if scale == 1:
+        return df
+    copies = []
+    offsets = {
+        column: int(pd.to_numeric(df[column], errors="coerce").max() or 0) + 1
+        for column in INTEGER_KEYS if column in df.columns
+    }
+    for k in range(scale):
+        copy = df.copy()
+        if k:
+            for column in STRING_KEYS:
+                if column in copy.columns:
+                    copy[column] = copy[column].astype(str) + f"_{k}"
+            for column, offset in offsets.items():
+                copy[column] = pd.to_numeric(copy[column], errors="coerce") + k * offset
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def _raw_paths(mode, year):
+    """Raw table paths for the preprocess cases, or None when the raw drop is not on disk."""
+    try:
+        file_map = pp.get_file_map(mode=mode, year=year)
+    except FileNotFoundError:
+        return None
+    paths = {key: file_map.get(key) for key in DATASET_SCHEMAS}
+    if any(path is None or not os.path.exists(path) for path in paths.values()):
+        return None
+    return paths
+
+
+def prepare_scaled_data(source_mode, scale, years=None):
+    """Write ``scale``x copies of the preprocessed (and, if present, raw) tables.
+
+    Scaled data lives under ``data/bench_x<scale>_<mode>/<year>/`` and is reused by later
+    runs; delete the folder to regenerate it.
+    """
+    years = years or AVAILABLE_YEARS
+    mode = scaled_mode(source_mode, scale)
+    if scale == 1:
+        return mode
+    for year in years:
+        source_dir = get_preprocessed_dir(mode=source_mode, year=year)
+        target_dir = get_preprocessed_dir(mode=mode, year=year)
+        if os.path.isdir(source_dir) and not os.path.isdir(target_dir):
+            os.makedirs(target_dir)
+            for filename in PREPROCESSED_FILES.values():
+                source = os.path.join(source_dir, filename)
+                if os.path.exists(source):
+                    replicate_table(pd.read_csv(source), scale).to_csv(os.path.join(target_dir, filename), index=False)
+            print(f"  prepared {mode}/{year}/preprocessing")
+
+        raw = _raw_paths(source_mode, year)
+        raw_dir = os.path.join(_project_root, "data", mode, year, "TL_csv")
+        if raw is not None and not os.path.isdir(raw_dir):
+            os.makedirs(raw_dir)
+            file_dir = {}
+            for key, source in raw.items():
+                target = os.path.join(raw_dir, os.path.basename(source))
+                replicate_table(pd.read_csv(source), scale).to_csv(target, index=False)
+                file_dir[key] = os.path.relpath(target, _project_root).replace(os.sep, "/")
+            # bench_x* 모드는 get_file_map 에서 항상 file_dir.json 을 읽습니다.
+            with open(os.path.join(_project_root, "data", mode, year, "file_dir.json"), "w", encoding="utf-8") as handle:
+                json.dump(file_dir, handle, ensure_ascii=False, indent=2)
+            print(f"  prepared {mode}/{year}/TL_csv")
+    return mode
+
+
+# ---------------------------------------------------------------------------
+# Cases (each runs inside a fresh worker process)
+# ---------------------------------------------------------------------------
+def _peak_rss_mb():
+    """Peak resident set size of the current process in MB."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 는 KB, macOS 는 byte 단위
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+
+
+def _final_frame(mode):
+    from preprocessing.merge_datasets import build_final_dataset
+    with tempfile.TemporaryDirectory() as final_dir:
+        return build_final_dataset(mode=mode, incremental=False, final_dir=final_dir)
+
+
+def _batch_input(rows):
+    sys.path.insert(0, _project_root)
+    from model_test import build_input_frame
+    base = build_input_frame(pd.read_csv(TEST_DATA_PATH, encoding="utf-8-sig"))
+    repeats = -(-rows // len(base))
+    return pd.concat([base] * repeats, ignore_index=True).iloc[:rows]
+
+
+def _run_case(case, mode, year, scale, repeat):
+    """Run one case ``repeat`` times and return its timing record."""
+    rss_before = _peak_rss_mb()
+    setup = None
+    if case == "mis_one_hot":
+        setup = _final_frame(mode)
+    elif case in ("predict_single", "predict_batch"):
+        import joblib
+        model = joblib.load(LITE_MODEL_PATH)
+        rows = 1 if case == "predict_single" else 5000 * scale
+        setup = (model, _batch_input(rows))
+        model.predict_proba(setup[1].iloc[:1])  # 첫 호출 지연은 제외
+
+    timings = []
+    rows_out = 0
+    for _ in range(repeat):
+        if case in PREPROCESS_CASES:
+            pp.clear_dataset_cache(mode=mode, year=year)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if case in PREPROCESS_CASES:
+            result = PREPROCESS_CASES[case](mode=mode, year=year)
+            result = result[0] if isinstance(result, tuple) else result
+            rows_out = len(result)
+        elif case == "merge":
+            rows_out = len(_final_frame(mode))
+        elif case == "mis_one_hot":
+            from preprocessing.merge_datasets import apply_mis_one_hot
+            rows_out = len(apply_mis_one_hot(setup))
+        elif case == "predict_single":
+            model, X = setup
+            for _ in range(100):
+                model.predict_proba(X)
+            rows_out = 100
+        elif case == "predict_batch":
+            model, X = setup
+            rows_out = len(model.predict_proba(X))
+        timings.append((time.perf_counter() - wall_start, time.process_time() - cpu_start))
+
+    wall, cpu = min(timings)
+    return {
+        "case": case,
+        "mode": mode,
+        "year": year,
+        "scale": scale,
+        "repeat": repeat,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "rows": rows_out,
+        "rows_per_s": rows_out / wall if wall > 0 else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "baseline_rss_mb": rss_before,
+    }
+
+
+def run_isolated(case, mode, year, scale, repeat):
+    """Run a case in its own process so peak RSS reflects only that case."""
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        return executor.submit(_run_case, case, mode, year, scale, repeat).result()
+
+
+def plan_cases(source_mode, scales, cases, years=None):
+    """Yield (case, mode, year, scale) for every runnable combination."""
+    years = years or AVAILABLE_YEARS
+    for scale in scales:
+        mode = scaled_mode(source_mode, scale)
+        for case in cases:
+            if case in PREPROCESS_CASES:
+                for year in years:
+                    if _raw_paths(mode, year) is None:
+                        print(f"  skip {case} {mode}/{year}: raw TL_csv not found")
+                        continue
+                    yield case, mode, year, scale
+            else:
+                yield case, mode, None, scale
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_project_root,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def save_results(records, output=None):
+    commit = _git_commit()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}_{commit}.json")
+    payload = {
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "results": records,
+    }
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=False, indent=2)
+    return output
+
+
+def _record_key(record):
+    return record["case"], record["scale"], record["year"]
+
+
+def compare_results(baseline_path, candidate_path):
+    """Print wall time and peak RSS of two result files side by side."""
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    with open(candidate_path, encoding="utf-8") as handle:
+        candidate = json.load(handle)
+    base = {_record_key(r): r for r in baseline["results"]}
+    print(f"{'case':<34}{'scale':>6}{'year':>6}{'base s':>10}{'new s':>10}{'speedup':>9}{'base MB':>10}{'new MB':>10}")
+    for record in candidate["results"]:
+        old = base.get(_record_key(record))
+        if old is None:
+            continue
+        speedup = old["wall_s"] / record["wall_s"] if record["wall_s"] else float("nan")
+        print(
+            f"{record['case']:<34}{record['scale']:>6}{str(record['year'] or '-'):>6}"
+            f"{old['wall_s']:>10.3f}{record['wall_s']:>10.3f}{speedup:>8.2f}x"
+            f"{old['peak_rss_mb']:>10.1f}{record['peak_rss_mb']:>10.1f}"
+        )
+    print(f"baseline: {baseline['commit']}  candidate: {candidate['commit']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the preprocess -> merge -> predict pipeline.")
+    parser.add_argument("--mode", default="training", help="Source dataset mode directory (e.g. training, validation, synthetic).")
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10, 100], help="Row-count multipliers to run.")
+    parser.add_argument("--cases", nargs="+", choices=ALL_CASES, default=ALL_CASES, help="Cases to run.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per case (the fastest is recorded).")
+    parser.add_argument("--output", default=None, help="Results JSON path (default: benchmarks/results/<time>_<commit>.json).")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="Compare two result files and exit.")
+    parser.add_argument("--clean", action="store_true", help="Delete the scaled bench_x* data folders and exit.")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+
+    if args.clean:
+        for scale in args.scales:
+            if scale != 1:
+                shutil.rmtree(os.path.join(_project_root, "data", scaled_mode(args.mode, scale)), ignore_errors=True)
+        return
+
+    print("Preparing scaled inputs...")
+    for scale in args.scales:
+        prepare_scaled_data(args.mode, scale)
+
+    records = []
+    for case, mode, year, scale in plan_cases(args.mode, args.scales, args.cases):
+        try:
+            record = run_isolated(case, mode, year, scale, args.repeat)
+        except Exception as e:
+            print(f"  [{case}] x{scale} {year or ''}: failed ({e})")
+            continue
+        records.append(record)
+        print(
+            f"  [{case}] x{scale} {year or ''}: {record['wall_s']:.3f}s, "
+            f"{record['rows_per_s'] or 0:,.0f} rows/s, peak {record['peak_rss_mb']:.0f} MB"
+        )
+
+    output = save_results(records, args.output)
+    print(f"Saved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
 import argparse
 import sys
 import os
+import time
 
-# from preprocessing.preprocessing import save_all_preprocessed_data
-from preprocessing.preprocessing_ver2 import save_all_preprocessed_data
-# from preprocessing.merge_datasets import save_final_dataset
-from preprocessing.merge_ver2 import save_final_dataset
-from preprocessing.ML_preprocessing import run_ml_preprocessing
+from preprocessing.preprocessing import save_all_preprocessed_data
+from preprocessing.merge_datasets import save_final_dataset
+from preprocessing.parallel import run_parallel_preprocessing
+from preprocessing import profiling
+from preprocessing.synthetic import add_synthetic_arguments, run_from_args as run_synthetic
 
 
 def main():
@@ -20,20 +21,45 @@ def main():
 
     # Preprocess command
     p_preprocess = subparsers.add_parser("preprocess", help="Run preprocessing for a specific year and mode.")
-    p_preprocess.add_argument("--year", choices=["2022", "2023"], required=True, help="Year of the dataset to preprocess.")
-    p_preprocess.add_argument("--mode", choices=["train", "validation"], required=True, dest="mode", help="Dataset mode (train or validation).")
+    p_preprocess.add_argument("--year", choices=["2022", "2023"], help="Year of the dataset to preprocess.")
+    p_preprocess.add_argument("--mode", choices=["train", "validation"], dest="mode", help="Dataset mode (train or validation).")
+    p_preprocess.add_argument("--all", action="store_true", help="Preprocess every year and mode in parallel.")
+    p_preprocess.add_argument("--jobs", type=int, default=None, help="Number of worker processes for --all (default: CPU count).")
+    p_preprocess.add_argument("--chunksize", type=int, default=None, help="Stream the activity tables in chunks of this many rows to bound peak memory.")
+    p_preprocess.add_argument("--profile", action="store_true", help="Record per-stage timing/memory and write profile_report.json next to the outputs.")
+    p_preprocess.add_argument("--profile-backend", choices=profiling.PROFILE_BACKENDS, default=None, help="Also dump cProfile/pyinstrument output per top-level stage (single-year runs).")
 
     # Merge command
     p_merge = subparsers.add_parser("merge", help="Merge preprocessed data from all years for a specific mode.")
     p_merge.add_argument("--mode", choices=["train", "validation"], required=True, dest="mode", help="Dataset mode to merge (train or validation).")
+    p_merge.add_argument("--rebuild", action="store_true", help="Ignore cached per-year merges and rebuild every year.")
+    p_merge.add_argument("--profile", action="store_true", help="Record per-stage timing/memory and write merge_profile_report.json next to the output.")
+    p_merge.add_argument("--profile-backend", choices=profiling.PROFILE_BACKENDS, default=None, help="Also dump cProfile/pyinstrument output per top-level stage.")
 
     # ML Preprocessing command
     p_ml = subparsers.add_parser("ml", help="Run ML preprocessing on the final validation dataset.")
     p_ml.add_argument("--mode", choices=["train", "validation"], required=True, dest="mode", help="Dataset mode to preprocess (train or validation).")
 
+    # Synthetic data command
+    p_synth = subparsers.add_parser("synth", help="Generate a synthetic TL_csv drop of any size for scale testing.")
+    add_synthetic_arguments(p_synth)
+
     args = parser.parse_args()
 
-    if args.task == "preprocess":
+    if args.task == "preprocess" and args.all:
+        print(f"Starting parallel preprocessing for all years and modes (jobs={args.jobs or os.cpu_count()})...")
+        start = time.perf_counter()
+        results, errors = run_parallel_preprocessing(jobs=args.jobs, profile=args.profile, chunksize=args.chunksize)
+        print(f"Finished {len(results)} jobs in {time.perf_counter() - start:.2f}s.")
+        if errors:
+            print(f"{len(errors)} job(s) failed:", file=sys.stderr)
+            for (mode, year, step), e in errors.items():
+                print(f"  - {mode}/{year}/{step}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    elif args.task == "preprocess":
+        if args.year is None or args.mode is None:
+            p_preprocess.error("--year and --mode are required unless --all is given.")
         mode_to_dir = {"train": "training", "validation": "validation"}
         mode_dir_name = mode_to_dir[args.mode]
         year = args.year
@@ -42,14 +68,25 @@ def main():
         os.makedirs(preprocess_output_dir, exist_ok=True)
         
         print(f"Starting data preprocessing for '{year} {args.mode}' dataset...")
+        if args.profile:
+            profiling.enable_profiling(os.path.join(preprocess_output_dir, "profile"), backend=args.profile_backend)
         try:
-            saved_paths = save_all_preprocessed_data(output_dir=preprocess_output_dir, mode=mode_dir_name, year=year)
+            stream_kwargs = {"chunksize": args.chunksize} if args.chunksize else {}
+            saved_paths = save_all_preprocessed_data(output_dir=preprocess_output_dir, mode=mode_dir_name, year=year, **stream_kwargs)
             print("Preprocessing finished successfully. Output files:")
             for key, path in saved_paths.items():
                 print(f"  - {key}: {path}")
         except Exception as e:
             print(f"An error occurred during preprocessing: {e}", file=sys.stderr)
             sys.exit(1)
+        finally:
+            if args.profile:
+                report = profiling.write_report(
+                    os.path.join(preprocess_output_dir, "profile_report.json"), mode=mode_dir_name, year=year
+                )
+                profiling.print_summary()
+                profiling.disable_profiling()
+                print(f"Profile report saved to {report}")
 
     elif args.task == "merge":
         mode_to_dir = {"train": "training", "validation": "validation"}
@@ -58,16 +95,32 @@ def main():
         os.makedirs(final_output_dir, exist_ok=True)
         
         print(f"Starting dataset merging for all years for '{args.mode}' dataset...")
+        if args.profile:
+            profiling.enable_profiling(os.path.join(final_output_dir, "profile"), backend=args.profile_backend)
         try:
-            final_path = save_final_dataset(mode=mode_dir_name, output_dir=final_output_dir)
+            final_path = save_final_dataset(mode=mode_dir_name, output_dir=final_output_dir, incremental=not args.rebuild)
             print(f"Merging finished successfully. Final dataset saved to:")
             print(f"  - {final_path}")
         except Exception as e:
             print(f"An error occurred during merging: {e}", file=sys.stderr)
             sys.exit(1)
+        finally:
+            if args.profile:
+                report = profiling.write_report(
+                    os.path.join(final_output_dir, "merge_profile_report.json"), mode=mode_dir_name
+                )
+                profiling.print_summary()
+                profiling.disable_profiling()
+                print(f"Profile report saved to {report}")
             
     elif args.task == "ml":
         print(f"Starting ML preprocessing for '{args.mode}' dataset...")
+        try:
+            # ML 전처리 모듈은 이 명령에서만 필요하므로 여기서 import 합니다.
+            from preprocessing.ML_preprocessing import run_ml_preprocessing
+        except ImportError as e:
+            print(f"ML preprocessing is not available in this checkout: {e}", file=sys.stderr)
+            sys.exit(1)
         try:
             output_path = run_ml_preprocessing(mode=args.mode)
             print(f"ML preprocessing finished successfully. Output file: {output_path}")
@@ -75,5 +128,13 @@ def main():
             print(f"An error occurred during ML preprocessing: {e}", file=sys.stderr)
             sys.exit(1)
 
+    elif args.task == "synth":
+        print(f"Generating {args.travellers:,} synthetic travellers from '{args.source_mode} {args.source_year}'...")
+        try:
+            run_synthetic(args)
+        except Exception as e:
+            print(f"An error occurred during synthetic data generation: {e}", file=sys.stderr)
+            sys.exit(1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
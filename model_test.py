@@ -1,10 +1,25 @@
 import argparse
+import os
 import sys
-from typing import Optional, Dict
+import time
+from typing import Optional
 
-import joblib
 import pandas as pd
 
+# 모델 로드와 입력 정규화는 streamlit 앱과 같은 구현(streamlit/utils/model_files.py, normalize.py)을 씁니다.
+_streamlit_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit")
+if _streamlit_dir not in sys.path:
+    sys.path.insert(0, _streamlit_dir)
+
+from utils.model_files import load_model_file
+from utils.normalize import (
+    normalize_activity_type_series,
+    normalize_age_grp_series,
+    normalize_gender_series,
+    parse_activity_type_series,
+    parse_age_grp_series,
+    parse_gender_series,
+)
 
 LITE_FEATURES = [
     "TRIP_DAYS",
@@ -16,70 +31,36 @@ LITE_FEATURES = [
 
 def load_model(path: str):
     try:
-        return joblib.load(path)
+        return load_model_file(path)
     except Exception as e:
         print(f"[ERROR] Failed to load model from {path}: {e}", file=sys.stderr)
         sys.exit(1)
 
 
-ACT_LABEL_TO_CODE: Dict[str, str] = {
-    # Canonical Korean labels -> ACT cd_b code (as string)
-    "취식": "1",
-    "쇼핑": "2",
-    "쇼핑/구매": "2",
-    "체험": "3",
-    "체험 활동": "3",
-    "입장": "3",
-    "관람": "3",
-    "산책": "4",
-    "단순 구경": "4",
-    "걷기": "4",
-    "휴식": "5",
-    "기타": "6",
-    "이동": "7",  # 환승/경유 의미
-    "환승": "7",
-    "경유": "7",
-    "없음": "99",
-}
+def _parse_one(parse, value):
+    """Apply a Series parser from utils.normalize to one value (None when unrecognised)."""
+    parsed = parse(pd.Series([value], dtype=object)).iloc[0]
+    return None if pd.isna(parsed) else parsed
 
 
 def _normalize_gender(value: Optional[str]) -> int:
     if value is None:
-        v = input("GENDER (M/F 또는 남/여): ").strip()
-    else:
-        v = str(value).strip()
-    v_lower = v.lower()
-    mapping = {
-        "m": 1, "남": 1, "남자": 1, "male": 1,
-        "f": 2, "여": 2, "여자": 2, "female": 2,
-    }
-    if v in mapping:
-        return mapping[v]
-    if v_lower in mapping:
-        return mapping[v_lower]
-    # Try numeric
-    try:
-        return int(float(v))
-    except Exception:
+        value = input("GENDER (M/F 또는 남/여): ").strip()
+    code = _parse_one(parse_gender_series, value)
+    if code is None:
         print("[WARN] Unknown gender, defaulting to 1(남)")
         return 1
+    return int(code)
 
 
 def _normalize_age_grp(value: Optional[str]) -> int:
     if value is None:
-        v = input("AGE_GRP (예: 20, 30대): ").strip()
-    else:
-        v = str(value).strip()
-    # Accept '30대' -> 30, '30' -> 30
-    try:
-        # extract leading digits
-        digits = "".join(ch for ch in v if ch.isdigit())
-        if digits:
-            return int(digits)
-        return int(float(v))
-    except Exception:
+        value = input("AGE_GRP (예: 20, 30대): ").strip()
+    age = _parse_one(parse_age_grp_series, value)
+    if age is None:
         print("[WARN] Unknown AGE_GRP, defaulting to 30")
         return 30
+    return int(age)
 
 
 def _normalize_activity_type(value: Optional[str]) -> str:
@@ -89,31 +70,12 @@ def _normalize_activity_type(value: Optional[str]) -> str:
     if value is None:
         print("ACTIVITY_TYPE (아래 중 선택):")
         print(", ".join(choices))
-        v = input("> ").strip()
-    else:
-        v = str(value).strip()
-
-    # If user enters a known label
-    if v in ACT_LABEL_TO_CODE:
-        return ACT_LABEL_TO_CODE[v]
-
-    # Accept variants: '쇼핑 / 구매' etc.
-    vv = v.replace(" ", "").replace("/", "")
-    for k in list(ACT_LABEL_TO_CODE.keys()):
-        kk = k.replace(" ", "").replace("/", "")
-        if vv == kk:
-            return ACT_LABEL_TO_CODE[k]
-
-    # Accept raw code like '1','2','99'
-    if v.isdigit():
-        return v
-
-    # Accept pattern like 'A01' -> '1'
-    if (len(v) >= 2) and (v[0] in ("A", "a")) and v[1:].isdigit():
-        return str(int(v[1:]))
-
-    print("[WARN] Unknown ACTIVITY_TYPE; defaulting to '없음'(99)")
-    return "99"
+        value = input("> ").strip()
+    code = _parse_one(parse_activity_type_series, value)
+    if code is None:
+        print("[WARN] Unknown ACTIVITY_TYPE; defaulting to '없음'(99)")
+        return "99"
+    return str(code)
 
 
 def build_input_row(
@@ -146,10 +108,165 @@ def build_input_row(
     return X
 
 
+def _require_features(df: pd.DataFrame):
+    missing = [column for column in LITE_FEATURES if column not in df.columns]
+    if missing:
+        raise KeyError(f"Input is missing required columns: {missing}")
+
+
+def build_input_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Vectorised build_input_row for a whole DataFrame of raw inputs."""
+    _require_features(df)
+    return pd.DataFrame(
+        {
+            "TRIP_DAYS": pd.to_numeric(df["TRIP_DAYS"], errors="coerce").astype(float),
+            "GENDER": normalize_gender_series(df["GENDER"]),
+            "AGE_GRP": normalize_age_grp_series(df["AGE_GRP"]),
+            "ACTIVITY_TYPE_CD": normalize_activity_type_series(df["ACTIVITY_TYPE_CD"]),
+        },
+        columns=LITE_FEATURES,
+    )
+
+
+# 배치 채점에서 받아들이는 값의 범위 (연령대는 10대~90대, 여행일수는 당일치기(1) 이상)
+AGE_GRP_RANGE = (10, 90)
+OUTPUT_COLUMNS = ("class_1_proba", "pred_label", "input_error")
+
+
+def input_errors(df: pd.DataFrame) -> pd.Series:
+    """Describe the unusable inputs of each row ('' when the row can be scored).
+
+    Unlike build_input_frame, which falls back to defaults (GENDER 1, AGE_GRP 30, activity 99),
+    this flags missing, unrecognised or out-of-range values, e.g. ``GENDER=5, AGE_GRP=0``.
+    """
+    _require_features(df)
+    trip_days = pd.to_numeric(df["TRIP_DAYS"], errors="coerce")
+    age = parse_age_grp_series(df["AGE_GRP"])
+    invalid = {
+        "TRIP_DAYS": ~(trip_days.ge(1) & trip_days.lt(float("inf"))),
+        "GENDER": parse_gender_series(df["GENDER"]).isna(),
+        "AGE_GRP": ~age.between(*AGE_GRP_RANGE),
+        "ACTIVITY_TYPE_CD": parse_activity_type_series(df["ACTIVITY_TYPE_CD"]).isna(),
+    }
+    errors = pd.Series("", index=df.index, dtype=object)
+    for column, bad in invalid.items():
+        if bad.any():
+            values = df[column].astype(object)
+            message = (column + "=" + values.astype(str)).where(values.notna(), column + " missing")
+            errors = errors.mask(bad, errors.where(errors == "", errors + ", ") + message)
+    return errors
+
+
+def _is_parquet(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def iter_input_chunks(path: str, chunksize: int):
+    """Yield DataFrame chunks from a CSV or Parquet file.
+
+    CSV columns are read as text so every chunk has the same dtypes regardless of
+    which values (blanks, labels, numbers) happen to fall into it.
+    """
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, encoding="utf-8-sig", dtype=str)
+
+
+def output_schema(input_path: str):
+    """Arrow schema every scored chunk is written with.
+
+    Input columns keep the Parquet file's stored types (CSV columns are text), followed by
+    ``class_1_proba``, ``pred_label`` and ``input_error``. Fixing it up front means a later chunk whose pandas
+    dtype differs (NaN turning ints into floats, an all-blank column) still matches the writer.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if _is_parquet(input_path):
+        schema = pq.read_schema(input_path)
+        # pandas 인덱스로 복원되는 컬럼은 출력에 쓰지 않습니다. (preserve_index=False)
+        index_columns = [c for c in (schema.pandas_metadata or {}).get("index_columns", []) if isinstance(c, str)]
+        fields = [field for field in schema if field.name not in index_columns]
+    else:
+        header = pd.read_csv(input_path, nrows=0, encoding="utf-8-sig").columns
+        fields = [pa.field(name, pa.string()) for name in header]
+    fields = [field for field in fields if field.name not in OUTPUT_COLUMNS]
+    return pa.schema(fields + [
+        pa.field("class_1_proba", pa.float64()),
+        pa.field("pred_label", pa.int64()),
+        pa.field("input_error", pa.string()),
+    ])
+
+
+def score_file(model, input_path: str, output_path: str, threshold: float = 0.5, chunksize: int = 50_000):
+    """Score every row of a CSV/Parquet file in chunks and write probabilities and labels.
+
+    The output keeps the input columns and appends ``class_1_proba``, ``pred_label`` and
+    ``input_error``. Rows with unusable inputs (see :func:`input_errors`) are not scored: their
+    probability and label are left empty and ``input_error`` says which values were rejected.
+    Returns ``(rows, seconds)``.
+    """
+    writer = None
+    rows = 0
+    rejected = 0
+    start = time.perf_counter()
+    try:
+        for chunk in iter_input_chunks(input_path, chunksize):
+            errors = input_errors(chunk)
+            valid = errors == ""
+            proba = pd.Series(float("nan"), index=chunk.index)
+            if valid.any():
+                proba[valid] = model.predict_proba(build_input_frame(chunk[valid]))[:, 1]
+            out = chunk.drop(columns=[c for c in OUTPUT_COLUMNS if c in chunk.columns])
+            out["class_1_proba"] = proba
+            out["pred_label"] = proba.ge(threshold).astype("Int64").where(valid)
+            out["input_error"] = errors.where(~valid)
+            rejected += int((~valid).sum())
+            if _is_parquet(output_path):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, output_schema(input_path))
+                writer.write_table(pa.Table.from_pandas(out, schema=writer.schema, preserve_index=False))
+            else:
+                out.to_csv(output_path, mode="w" if rows == 0 else "a", header=rows == 0, index=False)
+            rows += len(out)
+    finally:
+        if writer is not None:
+            writer.close()
+    if rejected:
+        print(
+            f"[WARN] {rejected} of {rows} rows have missing or invalid inputs and were not scored; "
+            f"see the input_error column in {output_path}",
+            file=sys.stderr,
+        )
+    return rows, time.perf_counter() - start
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Predict IS_FAILED_TRIP using the lite CatBoost model (4 features)."
     )
+    subparsers = parser.add_subparsers(dest="command")
+    p_score = subparsers.add_parser(
+        "score",
+        help="Batch-score a CSV/Parquet file of trips (columns: TRIP_DAYS, GENDER, AGE_GRP, ACTIVITY_TYPE_CD).",
+    )
+    p_score.add_argument("input", help="Input CSV or Parquet file.")
+    p_score.add_argument("-o", "--output", required=True, help="Output file (.csv or .parquet).")
+    p_score.add_argument(
+        "--model-path",
+        default="ML/outputs/01_Catboost/catboost_best_model_lite.joblib",
+        help="Path to the saved lite model.",
+    )
+    p_score.add_argument("--threshold", type=float, default=0.5, help="Decision threshold for positive class.")
+    p_score.add_argument("--chunksize", type=int, default=50_000, help="Rows per predict_proba batch.")
+
     parser.add_argument(
         "--model-path",
         default="ML/outputs/01_Catboost/catboost_best_model_lite.joblib",
@@ -173,6 +290,17 @@ def main():
 
     args = parser.parse_args()
 
+    if args.command == "score":
+        model = load_model(args.model_path)
+        try:
+            rows, seconds = score_file(model, args.input, args.output, args.threshold, args.chunksize)
+        except KeyError as e:
+            print(f"[ERROR] Cannot score {args.input}: {e.args[0]}", file=sys.stderr)
+            sys.exit(1)
+        rate = rows / seconds if seconds > 0 else float("inf")
+        print(f"Processed {rows} rows in {seconds:.2f}s ({rate:,.0f} rows/sec) -> {args.output}")
+        return
+
     model = load_model(args.model_path)
     X = build_input_row(args.trip_days, args.gender, args.age_grp, args.activity_type)
 
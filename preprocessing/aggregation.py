@@ -0,0 +1,90 @@
+"""Per-key aggregation engine shared by the merge step.
+
+Per-trip features are declared as ``(column, reducer, output)`` specs. The key column is
+factorized once into sorted integer codes, and every spec is then a single NumPy
+reduction over those codes, so adding a feature does not add another ``groupby`` scan.
+Results match ``df.groupby(key)[column].<reducer>()``: keys are sorted, rows with a
+missing key are dropped, and NaN values are skipped.
+"""
+import numpy as np
+import pandas as pd
+
+REDUCERS = ("sum", "size", "count", "nunique", "mean", "min", "max")
+
+
+def _group_sum(codes, values, n_groups):
+    weights = values.to_numpy(dtype=float, na_value=np.nan)
+    total = np.bincount(codes, weights=np.nan_to_num(weights, nan=0.0), minlength=n_groups)
+    if pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values):
+        # 정수 열의 합계는 groupby와 같이 정수형으로 돌려줍니다.
+        return total.astype(np.int64)
+    return total
+
+
+def _group_count(codes, values, n_groups):
+    return np.bincount(codes[values.notna().to_numpy()], minlength=n_groups)
+
+
+def _group_nunique(codes, values, n_groups):
+    value_codes, uniques = pd.factorize(values)
+    width = max(len(uniques), 1)
+    valid = value_codes >= 0
+    pairs = np.unique(codes[valid].astype(np.int64) * width + value_codes[valid])
+    return np.bincount(pairs // width, minlength=n_groups)
+
+
+def _group_extreme(codes, values, n_groups, reducer):
+    # 값을 정렬된 코드로 바꾸면 문자열·날짜 열도 같은 방식으로 최솟값/최댓값을 구할 수 있습니다.
+    value_codes, uniques = pd.factorize(values, sort=True)
+    valid = value_codes >= 0
+    if reducer == "min":
+        best = np.full(n_groups, len(uniques), dtype=np.int64)
+        np.minimum.at(best, codes[valid], value_codes[valid])
+        missing = best == len(uniques)
+    else:
+        best = np.full(n_groups, -1, dtype=np.int64)
+        np.maximum.at(best, codes[valid], value_codes[valid])
+        missing = best < 0
+    if not len(uniques):
+        return np.full(n_groups, np.nan)
+    result = pd.Series(uniques.take(np.where(missing, 0, best)))
+    return result.mask(missing).to_numpy() if missing.any() else result.to_numpy()
+
+
+def aggregate_by_key(df, specs, key="TRAVEL_ID"):
+    """Compute every ``(column, reducer, output)`` spec per ``key`` in one grouped pass.
+
+    ``column`` may be None for ``size``. Returns one row per non-missing key value,
+    sorted by key, with the key column first and the outputs in spec order.
+    """
+    for column, reducer, output in specs:
+        if reducer not in REDUCERS:
+            raise ValueError(f"Unknown reducer '{reducer}' for '{output}'. Choose from {REDUCERS}.")
+        if column is None and reducer != "size":
+            raise ValueError(f"Reducer '{reducer}' for '{output}' needs a column.")
+
+    codes, uniques = pd.factorize(df[key], sort=True)
+    keep = codes >= 0
+    codes = codes[keep]
+    n_groups = len(uniques)
+
+    result = {key: uniques}
+    for column, reducer, output in specs:
+        if reducer == "size":
+            result[output] = np.bincount(codes, minlength=n_groups)
+            continue
+        values = df[column][keep]
+        if reducer == "sum":
+            result[output] = _group_sum(codes, values, n_groups)
+        elif reducer == "count":
+            result[output] = _group_count(codes, values, n_groups)
+        elif reducer == "nunique":
+            result[output] = _group_nunique(codes, values, n_groups)
+        elif reducer == "mean":
+            count = _group_count(codes, values, n_groups)
+            total = _group_sum(codes, values, n_groups)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result[output] = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        else:
+            result[output] = _group_extreme(codes, values, n_groups, reducer)
+    return pd.DataFrame(result)
@@ -0,0 +1,71 @@
+"""Keyed feature assembly without chained ``DataFrame.merge`` calls.
+
+For each join key (TRAVEL_ID, TRAVELER_ID) the base table's keys and the keys of every
+table joined on it are factorized together once, so all of them share one integer code
+space. Each table's rows are then scattered into a code -> row position lookup, and
+its columns are gathered by position into one column block that becomes the result
+frame. There are no repeated hash joins and no intermediate merged frames. Missing matches follow
+``merge(how="left")`` (NaN, with int columns upcast to float and bool columns to object).
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+
+def _column_values(series):
+    """The column's backing array: a NumPy array for NumPy dtypes, else the extension array."""
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()
+    return series.array
+
+
+def _join_positions(base, joins):
+    """Return {join index: base row -> table row position (-1 when absent)} for alignable joins.
+
+    A join is left out (and later done with ``merge``) when its key dtype differs from the
+    base's or its keys are missing or duplicated, since merge would then match or
+    repeat rows differently.
+    """
+    positions = {}
+    for key in dict.fromkeys(key for _, key in joins):
+        if key not in base.columns:
+            continue
+        members = [i for i, (table, k) in enumerate(joins) if k == key and table[key].dtype == base[key].dtype]
+        if not members:
+            continue
+        # 같은 키를 쓰는 모든 테이블의 키를 한 번에 factorize 해 같은 코드 공간을 공유합니다.
+        codes, uniques = pd.factorize(np.concatenate([base[key].to_numpy()] + [joins[i][0][key].to_numpy() for i in members]))
+        base_codes = codes[:len(base)]
+        offset = len(base)
+        for i in members:
+            n_rows = len(joins[i][0])
+            table_codes = codes[offset:offset + n_rows]
+            offset += n_rows
+            if (table_codes < 0).any() or np.bincount(table_codes, minlength=1).max(initial=0) > 1:
+                continue
+            lookup = np.full(len(uniques), -1, dtype=np.intp)
+            lookup[table_codes] = np.arange(n_rows)
+            positions[i] = np.where(base_codes >= 0, lookup[base_codes], -1)
+    return positions
+
+
+def assemble_features(base, joins):
+    """Left-join each ``(table, key)`` in ``joins`` onto ``base`` by integer position.
+
+    Equivalent to applying ``frame.merge(table, on=key, how="left")`` in order. From the
+    first join that cannot be aligned by position (see ``_join_positions``) or whose
+    columns clash with the result, the remaining joins fall back to ``merge``.
+    """
+    positions = _join_positions(base, joins)
+    columns = {name: _column_values(base[name]) for name in base.columns}
+    for index, (table, key) in enumerate(joins):
+        overlap = (set(table.columns) - {key}) & set(columns)
+        if index not in positions or overlap:
+            frame = pd.DataFrame(columns)
+            for rest_table, rest_key in joins[index:]:
+                frame = frame.merge(rest_table, on=rest_key, how="left")
+            return frame
+        for name in table.columns:
+            if name != key:
+                columns[name] = take(_column_values(table[name]), positions[index], allow_fill=True)
+    return pd.DataFrame(columns)
@@ -1,7 +1,12 @@
+import hashlib
 import os
+import numpy as np
 import pandas as pd
 import json
-from collections import Counter
+
+from .aggregation import aggregate_by_key
+from .feature_store import assemble_features
+from .profiling import profiled, stage
 
 # Define the years to be processed
 AVAILABLE_YEARS = ["2022", "2023"]
@@ -38,47 +43,46 @@ def read_preprocessed_csv_for_all_years(filename, mode="train"):
     
     return pd.concat(all_dfs, ignore_index=True)
 
-def aggregate_activity_consumption(df):
-    columns = ["TRAVEL_ID", "activity_payment_sum", "activity_payment_count", "activity_store_count"]
+# 여행별 집계 정의: (원본 열, 집계 방식, 결과 열). 새 피처는 여기에 한 줄 추가하면 같은 패스에서 계산됩니다.
+ACTIVITY_CONSUMPTION_SPECS = [
+    ("PAYMENT_AMT_WON", "sum", "activity_payment_sum"),
+    (None, "size", "activity_payment_count"),
+    ("STORE_NM", "nunique", "activity_store_count"),
+]
+ACTIVITY_HISTORY_SPECS = [
+    (None, "size", "activity_history_rows"),
+    ("ACTIVITY_TYPE_CD", "nunique", "activity_type_unique"),
+]
+LODGING_SPECS = [
+    ("PAYMENT_AMT_WON", "sum", "lodging_payment_sum"),
+    (None, "size", "lodging_payment_count"),
+    ("STORE_NM", "nunique", "lodging_store_count"),
+]
+
+def _aggregate_payments(df, specs):
+    """Per-trip payment sum/count/store count; amounts that are not numbers count as 0."""
+    columns = ["TRAVEL_ID"] + [output for _, _, output in specs]
     if df.empty:
         return pd.DataFrame(columns=columns)
-
-    df = df.copy()
-    df["PAYMENT_AMT_WON"] = pd.to_numeric(df["PAYMENT_AMT_WON"], errors="coerce").fillna(0)
-    total = df.groupby("TRAVEL_ID")["PAYMENT_AMT_WON"].sum().rename("activity_payment_sum")
-    count = df.groupby("TRAVEL_ID").size().rename("activity_payment_count")
-    stores = df.groupby("TRAVEL_ID")["STORE_NM"].nunique().rename("activity_store_count")
-    merged = pd.concat([total, count, stores], axis=1).reset_index()
-    for column in columns[1:]:
-        if column in merged.columns:
-            merged[column] = merged[column].fillna(0)
-    if "activity_payment_sum" in merged.columns:
-        merged["activity_payment_sum"] = merged["activity_payment_sum"].round().astype(int)
+    amounts = pd.to_numeric(df["PAYMENT_AMT_WON"], errors="coerce").fillna(0)
+    merged = aggregate_by_key(df[["TRAVEL_ID", "STORE_NM"]].assign(PAYMENT_AMT_WON=amounts), specs)
+    sum_column = specs[0][2]
+    merged[sum_column] = merged[sum_column].round().astype(int)
     return merged
 
+@profiled
+def aggregate_activity_consumption(df):
+    return _aggregate_payments(df, ACTIVITY_CONSUMPTION_SPECS)
+
+@profiled
 def aggregate_activity_history(df):
     if df.empty:
         return pd.DataFrame(columns=["TRAVEL_ID", "activity_history_rows", "activity_type_unique"])
-    counts = df.groupby("TRAVEL_ID").size().rename("activity_history_rows")
-    unique_types = df.groupby("TRAVEL_ID")["ACTIVITY_TYPE_CD"].nunique().rename("activity_type_unique")
-    return pd.concat([counts, unique_types], axis=1).reset_index()
+    return aggregate_by_key(df, ACTIVITY_HISTORY_SPECS)
 
+@profiled
 def aggregate_lodging(df):
-    columns = ["TRAVEL_ID", "lodging_payment_sum", "lodging_payment_count", "lodging_store_count"]
-    if df.empty:
-        return pd.DataFrame(columns=columns)
-    df = df.copy()
-    df["PAYMENT_AMT_WON"] = pd.to_numeric(df["PAYMENT_AMT_WON"], errors="coerce").fillna(0)
-    total = df.groupby("TRAVEL_ID")["PAYMENT_AMT_WON"].sum().rename("lodging_payment_sum")
-    count = df.groupby("TRAVEL_ID").size().rename("lodging_payment_count")
-    stores = df.groupby("TRAVEL_ID")["STORE_NM"].nunique().rename("lodging_store_count")
-    merged = pd.concat([total, count, stores], axis=1).reset_index()
-    for column in columns[1:]:
-        if column in merged.columns:
-            merged[column] = merged[column].fillna(0)
-    if "lodging_payment_sum" in merged.columns:
-        merged["lodging_payment_sum"] = merged["lodging_payment_sum"].round().astype(int)
-    return merged
+    return _aggregate_payments(df, LODGING_SPECS)
 
 def prepare_visit_summary(df):
     if df.empty:
@@ -104,21 +108,34 @@ def _extract_codes(value, delimiter=";"):
             codes.append(code)
     return codes
 
+def _split_codes(series, delimiter=";"):
+    """Explode delimited code strings into one stripped code per entry.
+
+    The result is indexed by the row position in ``series`` so it can be scattered into
+    a (rows x codes) matrix; NaN and empty parts are skipped like ``_extract_codes``.
+    """
+    values = series.reset_index(drop=True).dropna().astype(str)
+    parts = values.str.split(delimiter).explode().str.strip()
+    return parts[parts.notna() & (parts != "")]
+
 def expand_multi_value_column(df, column, prefix, delimiter=";", top_n=10):
     if column not in df.columns:
         return df
-    code_lists = df[column].apply(lambda x: _extract_codes(x, delimiter))
-    counter = Counter()
-    for codes in code_lists:
-        counter.update(codes)
-    top_codes = [code for code, _ in counter.most_common(top_n)]
-    for code in top_codes:
-        col_name = f"{prefix}{code}"
-        df[col_name] = code_lists.apply(lambda codes: int(code in codes))
-    df[f"{prefix}OTHER"] = code_lists.apply(
-        lambda codes: int(any(code not in top_codes for code in codes)) if codes else 0
-    )
-    df[f"{prefix}COUNT"] = code_lists.apply(len)
+    parts = _split_codes(df[column], delimiter)
+    rows = parts.index.to_numpy()
+    # Counter.most_common과 같이 빈도 내림차순, 동률이면 먼저 등장한 코드 순으로 고릅니다.
+    counts = parts.value_counts(sort=False).sort_values(ascending=False, kind="stable")
+    top_codes = list(counts.index[:top_n])
+    positions = pd.Index(top_codes, dtype=object).get_indexer(parts.to_numpy())
+    indicators = np.zeros((len(df), len(top_codes)), dtype=int)
+    known = positions >= 0
+    indicators[rows[known], positions[known]] = 1
+    for index, code in enumerate(top_codes):
+        df[f"{prefix}{code}"] = indicators[:, index]
+    other = np.zeros(len(df), dtype=int)
+    other[rows[~known]] = 1
+    df[f"{prefix}OTHER"] = other
+    df[f"{prefix}COUNT"] = np.bincount(rows, minlength=len(df))
     return df
 
 def expand_travel_categorical_codes(travel_df):
@@ -150,25 +167,38 @@ def _load_mis_codes(json_path):
     codes = sorted(set(codes), key=lambda x: int(x))
     return codes
 
-def _encode_mis_multi_hot(series: pd.Series, codes):
+def _encode_mis_multi_hot(series: pd.Series, codes, sparse=False):
     """Given a Series of semicolon-separated code strings, return a DataFrame of 0/1 per code.
 
     - series: e.g., TRAVEL_PURPOSE or TRAVEL_MISSION_CHECK
     - codes: list of string codes (e.g. ["1", "2", ...])
-    """
-    code_lists = series.apply(lambda x: set(_extract_codes(x, ";")) if not pd.isna(x) else set())
-    data = {}
-    for code in codes:
-        data[code] = code_lists.apply(lambda s: int(code in s))
-    return pd.DataFrame(data)
+    - sparse: return a ``scipy.sparse.csr_matrix`` (rows x codes) instead of a DataFrame
 
-def apply_mis_one_hot(final_df: pd.DataFrame) -> pd.DataFrame:
-    """Drop existing TRAVEL_PURPOSE_* encodings and append MIS-based one-hot columns for
-    TRAVEL_PURPOSE and TRAVEL_MISSION_CHECK to the rightmost side of the DataFrame.
+    All rows are split in one pass and scattered into the matrix by (row, code) position,
+    so the cost no longer grows with rows x codes in Python.
     """
-    df = final_df.copy()
-
-    # Prepare MIS codes from the tag-code JSON
+    parts = _split_codes(series, ";")
+    positions = pd.Index(codes, dtype=object).get_indexer(parts.to_numpy())
+    known = positions >= 0
+    rows = parts.index.to_numpy()[known]
+    cols = positions[known]
+    shape = (len(series), len(codes))
+
+    if sparse:
+        from scipy import sparse as sp
+
+        matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=shape)
+        # 같은 코드가 한 행에 여러 번 적혀 있어도 1로 표시합니다.
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return matrix
+
+    dense = np.zeros(shape, dtype=int)
+    dense[rows, cols] = 1
+    return pd.DataFrame(dense, index=series.index, columns=list(codes))
+
+def get_mis_codes():
+    """Load the MIS codes from the training tag-code JSON."""
     json_path = os.path.join(
         get_project_root(),
         "data",
@@ -177,7 +207,38 @@ def apply_mis_one_hot(final_df: pd.DataFrame) -> pd.DataFrame:
         "json",
         "tc_codeb_코드B.json",
     )
-    mis_codes = _load_mis_codes(json_path)
+    return _load_mis_codes(json_path)
+
+def mis_one_hot_matrix(df: pd.DataFrame, mis_codes=None):
+    """Return the TRAVEL_PURPOSE/TRAVEL_MISSION_CHECK MIS one-hot blocks as one CSR matrix.
+
+    Intended for the model-training path, where the blocks can be stacked next to the
+    dense features without materialising the wide 0/1 columns. Returns ``(matrix, columns)``.
+    """
+    from scipy import sparse as sp
+
+    mis_codes = mis_codes or get_mis_codes()
+    blocks = []
+    columns = []
+    for source, prefix in (("TRAVEL_PURPOSE", "TRAVEL_PURPOSE_CD_"), ("TRAVEL_MISSION_CHECK", "TRAVEL_MISSION_CHECK_CD_")):
+        if source in df.columns:
+            blocks.append(_encode_mis_multi_hot(df[source], mis_codes, sparse=True))
+            columns.extend(f"{prefix}{c}" for c in mis_codes)
+    if not blocks:
+        return sp.csr_matrix((len(df), 0), dtype=np.int8), columns
+    return sp.hstack(blocks, format="csr"), columns
+
+def apply_mis_one_hot(final_df: pd.DataFrame, sparse=False) -> pd.DataFrame:
+    """Drop existing TRAVEL_PURPOSE_* encodings and append MIS-based one-hot columns for
+    TRAVEL_PURPOSE and TRAVEL_MISSION_CHECK to the rightmost side of the DataFrame.
+
+    With ``sparse=True`` the appended columns are pandas sparse columns backed by the
+    CSR blocks from ``_encode_mis_multi_hot``.
+    """
+    df = final_df.copy()
+
+    # Prepare MIS codes from the tag-code JSON
+    mis_codes = get_mis_codes()
 
     # 1) Drop previously encoded TRAVEL_PURPOSE_* columns (but keep the raw TRAVEL_PURPOSE)
     to_drop = [
@@ -189,80 +250,223 @@ def apply_mis_one_hot(final_df: pd.DataFrame) -> pd.DataFrame:
         df = df.drop(columns=to_drop)
 
     # 2) Build and append new one-hot columns using MIS codes
-    if "TRAVEL_PURPOSE" in df.columns:
-        purpose_oh = _encode_mis_multi_hot(df["TRAVEL_PURPOSE"], mis_codes)
-        purpose_oh.columns = [f"TRAVEL_PURPOSE_CD_{c}" for c in mis_codes]
-    else:
-        purpose_oh = pd.DataFrame(index=df.index)
-
-    if "TRAVEL_MISSION_CHECK" in df.columns:
-        mission_oh = _encode_mis_multi_hot(df["TRAVEL_MISSION_CHECK"], mis_codes)
-        mission_oh.columns = [f"TRAVEL_MISSION_CHECK_CD_{c}" for c in mis_codes]
-    else:
-        mission_oh = pd.DataFrame(index=df.index)
-
-    # Ensure integer dtype (0/1)
-    for sub in (purpose_oh, mission_oh):
-        for col in sub.columns:
-            sub[col] = sub[col].astype(int)
+    blocks = []
+    for source, prefix in (("TRAVEL_PURPOSE", "TRAVEL_PURPOSE_CD_"), ("TRAVEL_MISSION_CHECK", "TRAVEL_MISSION_CHECK_CD_")):
+        if source not in df.columns:
+            continue
+        columns = [f"{prefix}{c}" for c in mis_codes]
+        if sparse:
+            matrix = _encode_mis_multi_hot(df[source], mis_codes, sparse=True)
+            block = pd.DataFrame.sparse.from_spmatrix(matrix, index=df.index, columns=columns)
+        else:
+            block = _encode_mis_multi_hot(df[source], mis_codes)
+            block.columns = columns
+        blocks.append(block)
 
     # Concatenate to the right (appended columns appear at end)
-    df = pd.concat([df, purpose_oh, mission_oh], axis=1)
+    df = pd.concat([df, *blocks], axis=1)
     return df
 
-def build_final_dataset(mode="train"):
-    # Load and concatenate data from all years
-    activity_consumption = read_preprocessed_csv_for_all_years("activity_consumption.csv", mode=mode)
-    activity_history = read_preprocessed_csv_for_all_years("activity_history.csv", mode=mode)
-    lodging = read_preprocessed_csv_for_all_years("lodging_consumption.csv", mode=mode)
-    traveller_master = read_preprocessed_csv_for_all_years("traveller_master.csv", mode=mode)
-    visit_summary = read_preprocessed_csv_for_all_years("visit_area_summary.csv", mode=mode)
-    travel_table = read_preprocessed_csv_for_all_years("travel.csv", mode=mode)
-
-    # # Aggregate data
-    # activity_consume_summary = aggregate_activity_consumption(activity_consumption)
-    # activity_history_summary = aggregate_activity_history(activity_history)
-    # lodging_summary = aggregate_lodging(lodging)
-    # visit_summary_ready = prepare_visit_summary(visit_summary)
-
-    # # Merge features (skip PURPOSE one-hot expansion per request)
-    # travel_features = travel_table.copy()
-    # travel_features = travel_features.merge(activity_consume_summary, on="TRAVEL_ID", how="left")
-    # travel_features = travel_features.merge(activity_history_summary, on="TRAVEL_ID", how="left")
-    # travel_features = travel_features.merge(lodging_summary, on="TRAVEL_ID", how="left")
-    # travel_features = travel_features.merge(visit_summary_ready, on="TRAVEL_ID", how="left")
-
-    # # Fill missing values
-    # if "activity_payment_sum" in travel_features.columns:
-    #     activity_median = travel_features["activity_payment_sum"].median()
-    #     travel_features["activity_payment_sum"] = travel_features["activity_payment_sum"].fillna(activity_median)
-    # if "lodging_payment_sum" in travel_features.columns:
-    #     lodging_median = travel_features["lodging_payment_sum"].median()
-    #     travel_features["lodging_payment_sum"] = travel_features["lodging_payment_sum"].fillna(lodging_median)
-    
-    # numeric_fill_zero = [
-    #     "activity_payment_count", "activity_store_count", "activity_history_rows",
-    #     "activity_type_unique", "lodging_payment_count", "lodging_store_count",
-    # ]
-    # for column in numeric_fill_zero:
-    #     if column in travel_features.columns:
-    #         travel_features[column] = travel_features[column].fillna(0)
-
-    # # Final type casting
-    # count_columns = [
-    #     "activity_payment_count", "activity_store_count", "activity_history_rows",
-    #     "activity_type_unique", "lodging_payment_count", "lodging_store_count",
-    # ]
-    # for column in count_columns:
-    #     if column in travel_features.columns:
-    #         travel_features[column] = travel_features[column].astype(int)
-    # sum_columns = ["activity_payment_sum", "lodging_payment_sum"]
-    # for column in sum_columns:
-    #     if column in travel_features.columns:
-    #         travel_features[column] = travel_features[column].round().astype(int)
-
-    # # Final merge with traveller master
-    # final_df = travel_features.merge(traveller_master, on="TRAVELER_ID", how="left")
+PREPROCESSED_FILES = {
+    "activity_consumption": "activity_consumption.csv",
+    "activity_history": "activity_history.csv",
+    "lodging": "lodging_consumption.csv",
+    "traveller_master": "traveller_master.csv",
+    "visit_summary": "visit_area_summary.csv",
+    "travel": "travel.csv",
+}
+MERGE_MANIFEST_NAME = "merge_manifest.json"
+MERGE_CACHE_DIR_NAME = "merge_cache"
+# 캐시 형식이 바뀌면 올려서 기존 캐시를 모두 무효화합니다.
+MERGE_CACHE_VERSION = 1
+# 연도별 특징을 만드는 코드(스펙 테이블 포함). 이 파일들의 내용이 바뀌면 캐시를 버립니다.
+MERGE_CODE_MODULES = ("merge_datasets.py", "aggregation.py", "feature_store.py")
+_merge_code_fingerprint = None
+
+def _file_sha1(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def merge_code_fingerprint():
+    """sha1 over the source of the modules that build per-year features (computed once per process)."""
+    global _merge_code_fingerprint
+    if _merge_code_fingerprint is None:
+        digest = hashlib.sha1()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in MERGE_CODE_MODULES:
+            digest.update(name.encode("utf-8"))
+            with open(os.path.join(here, name), "rb") as handle:
+                digest.update(handle.read())
+        _merge_code_fingerprint = digest.hexdigest()
+    return _merge_code_fingerprint
+
+def get_year_input_paths(mode="train", year=None):
+    """Return {table: path} for a year's preprocessed CSVs, or None if any is missing."""
+    folder = get_preprocessed_dir(mode=mode, year=year)
+    paths = {name: os.path.join(folder, filename) for name, filename in PREPROCESSED_FILES.items()}
+    missing = [path for path in paths.values() if not os.path.exists(path)]
+    if missing:
+        print(f"Warning: Preprocessed files not found for year {year}: {missing}. Skipping.")
+        return None
+    return paths
+
+def fingerprint_inputs(paths, previous=None):
+    """Return {filename: {size, mtime_ns, sha1}} for the given input files.
+
+    Files whose size and mtime match ``previous`` reuse the recorded hash instead of
+    being read again.
+    """
+    previous = previous or {}
+    result = {}
+    for path in paths.values():
+        filename = os.path.basename(path)
+        stat = os.stat(path)
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        old = previous.get(filename)
+        if old and old.get("size") == entry["size"] and old.get("mtime_ns") == entry["mtime_ns"]:
+            entry["sha1"] = old["sha1"]
+        else:
+            entry["sha1"] = _file_sha1(path)
+        result[filename] = entry
+    return result
+
+def _same_inputs(left, right):
+    if left is None or right is None or set(left) != set(right):
+        return False
+    return all(left[name]["sha1"] == right[name]["sha1"] for name in left)
+
+def load_merge_manifest(final_dir):
+    """Load the merge manifest; an older cache format or changed merge code starts empty."""
+    empty = {"version": MERGE_CACHE_VERSION, "code": merge_code_fingerprint(), "years": {}}
+    path = os.path.join(final_dir, MERGE_MANIFEST_NAME)
+    if not os.path.exists(path):
+        return empty
+    with open(path, encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("version") != MERGE_CACHE_VERSION:
+        return empty
+    if manifest.get("code") != empty["code"]:
+        if manifest.get("years"):
+            print("Merge code changed since the cached years were built; rebuilding every year.")
+        return empty
+    return manifest
+
+def save_merge_manifest(manifest, final_dir):
+    os.makedirs(final_dir, exist_ok=True)
+    path = os.path.join(final_dir, MERGE_MANIFEST_NAME)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, ensure_ascii=False, indent=2)
+    return path
+
+@profiled
+def build_year_features(paths):
+    """Aggregate and merge one year's preprocessed tables into per-trip features.
+
+    Dataset-wide steps (median fills, final casts, column drops) are left to
+    ``build_final_dataset`` so cached years can be concatenated with fresh ones.
+    """
+    tables = {name: pd.read_csv(path) for name, path in paths.items()}
+
+    # Aggregate data
+    activity_consume_summary = aggregate_activity_consumption(tables["activity_consumption"])
+    activity_history_summary = aggregate_activity_history(tables["activity_history"])
+    lodging_summary = aggregate_lodging(tables["lodging"])
+    visit_summary_ready = prepare_visit_summary(tables["visit_summary"])
+
+    # Merge features (skip PURPOSE one-hot expansion per request)
+    # TRAVEL_ID/TRAVELER_ID를 한 번만 factorize 하고 위치 기반으로 열을 모읍니다 (연속 merge와 결과 동일).
+    return assemble_features(tables["travel"], [
+        (activity_consume_summary, "TRAVEL_ID"),
+        (activity_history_summary, "TRAVEL_ID"),
+        (lodging_summary, "TRAVEL_ID"),
+        (visit_summary_ready, "TRAVEL_ID"),
+        # Final merge with traveller master
+        (tables["traveller_master"], "TRAVELER_ID"),
+    ])
+
+@profiled
+def load_year_features(mode="train", year=None, manifest=None, final_dir=None, rebuild=False):
+    """Return a year's merged features, rebuilding them only when its inputs changed.
+
+    Returns ``(frame, rebuilt)``; ``frame`` is None when the year has no inputs.
+    ``manifest`` is updated in place with the year's input hashes and cached frame.
+    """
+    paths = get_year_input_paths(mode=mode, year=year)
+    if paths is None:
+        return None, False
+
+    final_dir = final_dir or get_final_dir(mode=mode)
+    manifest = manifest if manifest is not None else load_merge_manifest(final_dir)
+    entry = manifest["years"].get(year, {})
+    inputs = fingerprint_inputs(paths, previous=entry.get("inputs"))
+    frame_path = os.path.join(final_dir, MERGE_CACHE_DIR_NAME, f"{year}.pkl")
+
+    if not rebuild and _same_inputs(entry.get("inputs"), inputs) and os.path.exists(frame_path):
+        manifest["years"][year] = {"inputs": inputs, "frame": os.path.relpath(frame_path, final_dir)}
+        return pd.read_pickle(frame_path), False
+
+    frame = build_year_features(paths)
+    os.makedirs(os.path.dirname(frame_path), exist_ok=True)
+    frame.to_pickle(frame_path)
+    manifest["years"][year] = {"inputs": inputs, "frame": os.path.relpath(frame_path, final_dir)}
+    return frame, True
+
+@profiled
+def build_final_dataset(mode="train", incremental=True, final_dir=None):
+    """Merge every year's preprocessed tables into the final per-trip dataset.
+
+    Each year's merged features are cached under ``<final_dir>/merge_cache`` and
+    recorded in ``merge_manifest.json`` with the hashes of their input CSVs. With
+    ``incremental=True`` only years whose inputs changed are re-merged.
+    """
+    final_dir = final_dir or get_final_dir(mode=mode)
+    manifest = load_merge_manifest(final_dir)
+    year_frames = []
+    for year in AVAILABLE_YEARS:
+        frame, rebuilt = load_year_features(
+            mode=mode, year=year, manifest=manifest, final_dir=final_dir, rebuild=not incremental
+        )
+        if frame is None:
+            continue
+        print(f"  - {year}: {'rebuilt' if rebuilt else 'cached'} ({len(frame)} rows)")
+        year_frames.append(frame)
+    if not year_frames:
+        raise FileNotFoundError(f"No preprocessed files found for any year in mode '{mode}'.")
+    save_merge_manifest(manifest, final_dir)
+
+    final_df = pd.concat(year_frames, ignore_index=True)
+
+    # Fill missing values
+    if "activity_payment_sum" in final_df.columns:
+        activity_median = final_df["activity_payment_sum"].median()
+        final_df["activity_payment_sum"] = final_df["activity_payment_sum"].fillna(activity_median)
+    if "lodging_payment_sum" in final_df.columns:
+        lodging_median = final_df["lodging_payment_sum"].median()
+        final_df["lodging_payment_sum"] = final_df["lodging_payment_sum"].fillna(lodging_median)
+
+    numeric_fill_zero = [
+        "activity_payment_count", "activity_store_count", "activity_history_rows",
+        "activity_type_unique", "lodging_payment_count", "lodging_store_count",
+    ]
+    for column in numeric_fill_zero:
+        if column in final_df.columns:
+            final_df[column] = final_df[column].fillna(0)
+
+    # Final type casting
+    count_columns = [
+        "activity_payment_count", "activity_store_count", "activity_history_rows",
+        "activity_type_unique", "lodging_payment_count", "lodging_store_count",
+    ]
+    for column in count_columns:
+        if column in final_df.columns:
+            final_df[column] = final_df[column].astype(int)
+    sum_columns = ["activity_payment_sum", "lodging_payment_sum"]
+    for column in sum_columns:
+        if column in final_df.columns:
+            final_df[column] = final_df[column].round().astype(int)
 
     # ---------------------------------------------------------------------
     # Complex feature engineering (from complex_features.md)
@@ -331,13 +535,14 @@ def build_final_dataset(mode="train"):
 
     return final_df
 
-def save_final_dataset(mode="train", output_dir=None):
-    df = build_final_dataset(mode=mode)
+def save_final_dataset(mode="train", output_dir=None, incremental=True):
     if output_dir is None:
         output_dir = get_final_dir(mode=mode)
+    df = build_final_dataset(mode=mode, incremental=incremental, final_dir=output_dir)
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, "travel_insight.csv")
-    df.to_csv(output_path, index=False)
+    with stage("write_final_csv", rows_in=len(df), mode=mode):
+        df.to_csv(output_path, index=False)
     return output_path
 
 if __name__ == "__main__":
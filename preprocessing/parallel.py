@@ -0,0 +1,124 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import preprocessing as pp
+from . import profiling
+from .merge_datasets import AVAILABLE_YEARS
+
+AVAILABLE_MODES = ["training", "validation"]
+
+# 각 저장 단계와 그 단계가 읽는 원본 테이블 키
+PREPROCESS_STEPS = {
+    "activity_consumption": (pp.save_activity_consumption, ["활동소비내역"]),
+    "activity_history": (pp.save_activity_history, ["활동내역"]),
+    "lodging_consumption": (pp.save_lodging_consumption, ["숙박소비내역", "여행"]),
+    "traveller_master": (pp.save_traveller_master, ["여행객_Master"]),
+    "travel": (pp.save_travel_table, ["여행"]),
+    "visit_area_summary": (pp.save_visit_area_info, ["방문지정보"]),
+}
+
+
+# chunksize 가 주어지면 스트리밍으로 처리하는 단계 (원본 테이블을 캐시에 통째로 올리지 않음)
+STREAMING_STEPS = {"activity_consumption", "activity_history"}
+
+
+def get_output_dir(mode, year):
+    """Return the preprocessing output folder for a mode directory name and year."""
+    return os.path.join(pp._project_root, "data", mode, year, "preprocessing")
+
+
+def _load_job(mode, year, key):
+    """Parse one raw table so its Arrow cache entry exists for the table jobs."""
+    start = time.perf_counter()
+    pp.load_dataset(key, mode=mode, year=year)
+    return time.perf_counter() - start
+
+
+def _table_job(mode, year, step, profile=False, chunksize=None):
+    """Run a single save_* step and return its output path, wall time and profile records."""
+    if profile:
+        profiling.enable_profiling()
+    start = time.perf_counter()
+    save_func, _ = PREPROCESS_STEPS[step]
+    kwargs = {"chunksize": chunksize} if chunksize and step in STREAMING_STEPS else {}
+    try:
+        with profiling.stage(step, mode=mode, year=year):
+            path = save_func(output_dir=get_output_dir(mode, year), mode=mode, year=year, **kwargs)
+    finally:
+        # 워커 프로세스의 기록은 부모 프로세스로 돌려보내 한 보고서로 합칩니다.
+        records = profiling.disable_profiling() if profile else []
+    return path, time.perf_counter() - start, records
+
+
+def plan_jobs(modes=None, years=None, steps=None, chunksize=None):
+    """Build the (mode, year, step) table jobs and the distinct raw tables they read.
+
+    With ``chunksize`` the streamed steps read their tables chunk by chunk, so those
+    tables are not pre-loaded into the cache.
+    """
+    modes = modes or AVAILABLE_MODES
+    years = years or AVAILABLE_YEARS
+    steps = steps or list(PREPROCESS_STEPS)
+    table_jobs = [(mode, year, step) for mode in modes for year in years for step in steps]
+    load_jobs = []
+    for mode, year, step in table_jobs:
+        if chunksize and step in STREAMING_STEPS:
+            continue
+        for key in PREPROCESS_STEPS[step][1]:
+            if (mode, year, key) not in load_jobs:
+                load_jobs.append((mode, year, key))
+    return load_jobs, table_jobs
+
+
+def run_parallel_preprocessing(modes=None, years=None, steps=None, jobs=None, profile=False, chunksize=None):
+    """Fan out every (mode, year, step) preprocessing job onto a process pool.
+
+    Raw tables that several steps share (e.g. 여행) are parsed once in a first phase and
+    written to the Arrow cache, so the table jobs memory-map them instead of each
+    re-reading the CSV. Returns ``(results, errors)`` where ``results`` maps
+    ``(mode, year, step)`` to ``(path, seconds)`` and ``errors`` maps it to the exception.
+    With ``profile=True`` each job's stage records are written to a
+    ``profile_report.json`` in its (mode, year) output folder. ``chunksize`` streams the
+    activity tables instead of loading them whole.
+    """
+    load_jobs, table_jobs = plan_jobs(modes=modes, years=years, steps=steps, chunksize=chunksize)
+    for mode, year in {(mode, year) for mode, year, _ in table_jobs}:
+        os.makedirs(get_output_dir(mode, year), exist_ok=True)
+
+    results = {}
+    errors = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        if pp.feather is not None:
+            # 1단계: 여러 단계가 함께 쓰는 원본 테이블을 한 번씩만 파싱해 캐시에 올립니다.
+            futures = {executor.submit(_load_job, *job): job for job in load_jobs}
+            for future in as_completed(futures):
+                mode, year, key = futures[future]
+                try:
+                    elapsed = future.result()
+                    print(f"  [load] {mode}/{year}/{key}: {elapsed:.2f}s")
+                except Exception as e:
+                    # 실패한 테이블은 2단계에서 다시 읽으며 같은 오류를 보고합니다.
+                    print(f"  [load] {mode}/{year}/{key}: failed ({e})")
+
+        # 2단계: 테이블별 전처리를 병렬로 실행합니다.
+        futures = {executor.submit(_table_job, *job, profile=profile, chunksize=chunksize): job for job in table_jobs}
+        profile_records = {}
+        for future in as_completed(futures):
+            job = futures[future]
+            mode, year, step = job
+            try:
+                path, elapsed, records = future.result()
+                results[job] = (path, elapsed)
+                if records:
+                    profile_records.setdefault((mode, year), []).extend(records)
+                print(f"  [{step}] {mode}/{year}: {elapsed:.2f}s -> {path}")
+            except Exception as e:
+                errors[job] = e
+                print(f"  [{step}] {mode}/{year}: failed ({e})")
+
+    for (mode, year), records in profile_records.items():
+        report = os.path.join(get_output_dir(mode, year), "profile_report.json")
+        profiling.write_report(report, records, mode=mode, year=year)
+        print(f"  [profile] {mode}/{year} -> {report}")
+    return results, errors
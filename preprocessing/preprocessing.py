@@ -1,14 +1,32 @@
+import glob
+import hashlib
 import io
 import json
 import os
+import pickle
+import re
+import tempfile
 
 
 import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow가 없으면 캐시 없이 CSV를 그대로 읽습니다.
+    pa = None
+    feather = None
+
+from .profiling import profiled
+from .schemas import SCHEMA_READ_VERSION, check_schema, get_schema, read_header, schema_read_kwargs
+
 _here = os.path.dirname(__file__)
 _project_root = os.path.abspath(os.path.join(_here, ".."))
 _file_map_cache = {} # Changed to a dictionary to cache multiple file maps
+_dataset_cache_root = os.path.join(_project_root, "data", "cache")
+_sido_code_map_cache = None
+_sido_pattern_cache = None
 
 
 def get_file_map(mode="train", year=None):
@@ -43,23 +61,186 @@ def get_file_map(mode="train", year=None):
     return dict(_file_map_cache[cache_key])
 
 
-def load_dataset(key, mode="train", year=None, **read_csv_kwargs):
-    """Read a CSV file by its logical key, mode, and year."""
+def get_dataset_cache_path(key, source_path, mode="train", year=None, schema=None, **read_csv_kwargs):
+    """Return the Arrow cache file for a raw CSV, keyed by its path, mtime, size and read options."""
+    stat = os.stat(source_path)
+    options = sorted((name, repr(value)) for name, value in read_csv_kwargs.items())
+    fingerprint = f"{os.path.abspath(source_path)}|{stat.st_mtime_ns}|{stat.st_size}|{options}|{schema!r}|{SCHEMA_READ_VERSION}"
+    digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(_dataset_cache_root, f"{mode}_{year}", f"{key}_{digest}.arrow")
+
+
+def _write_dataset_cache(df, cache_path):
+    """Write a DataFrame to the Arrow IPC cache, replacing stale entries for the same key."""
+    folder = os.path.dirname(cache_path)
+    os.makedirs(folder, exist_ok=True)
+    prefix = os.path.basename(cache_path).rsplit("_", 1)[0]
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(df, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, cache_path)
+    except (pa.ArrowException, ValueError, TypeError) as e:
+        # 타입이 섞인 열처럼 Arrow로 옮길 수 없는 표는 캐시하지 않고 넘어갑니다.
+        print(f"Warning: Could not cache '{prefix}' ({e}). Reading from CSV next time as well.")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    for stale_path in glob.glob(os.path.join(folder, f"{glob.escape(prefix)}_*.arrow")):
+        if stale_path != cache_path:
+            os.remove(stale_path)
+
+
+def clear_dataset_cache(mode=None, year=None):
+    """Delete cached Arrow files, optionally only for a single mode/year."""
+    pattern = f"{mode}_{year}" if mode and year else "*"
+    removed = 0
+    for path in glob.glob(os.path.join(_dataset_cache_root, pattern, "*.arrow")):
+        os.remove(path)
+        removed += 1
+    return removed
+
+
+def _select_usecols(columns, usecols):
+    """Return ``usecols`` in file order, raising like ``read_csv`` when a column is missing."""
+    wanted = set(usecols)
+    missing = sorted(wanted.difference(columns))
+    if missing:
+        raise ValueError(f"Usecols do not match columns, columns expected but not found: {missing}")
+    return [column for column in columns if column in wanted]
+
+
+def _read_raw_csv(key, source_path, schema=None, **read_csv_kwargs):
+    """Parse a raw CSV, applying the registered schema (columns, dtypes, dates) at read time."""
+    if schema is None:
+        return pd.read_csv(source_path, **read_csv_kwargs)
+
+    header = read_header(source_path)
+    check_schema(key, header, source=os.path.basename(source_path))
+    kwargs = schema_read_kwargs(key, header=header)
+    usecols = read_csv_kwargs.get("usecols")
+    if usecols is not None and not callable(usecols) and "parse_dates" in kwargs:
+        # 호출자가 일부 열만 요청하면 해당 열에 속한 날짜 열만 변환합니다.
+        kwargs["parse_dates"] = [column for column in kwargs["parse_dates"] if column in set(usecols)]
+    kwargs.update(read_csv_kwargs)
+    return pd.read_csv(source_path, **kwargs)
+
+
+@profiled
+def load_dataset(key, mode="train", year=None, use_cache=True, use_schema=True, **read_csv_kwargs):
+    """Read a CSV file by its logical key, mode, and year.
+
+    Tables registered in ``schemas.DATASET_SCHEMAS`` are read with only the needed
+    columns and explicit dtypes. The parsed table is cached as an uncompressed Arrow IPC
+    file under ``data/cache`` so repeated reads memory-map the typed columns instead of
+    re-parsing the CSV. ``usecols`` is applied on top of the cached table, so callers
+    that only need a few columns share the same cache entry.
+    """
+    file_map = get_file_map(mode=mode, year=year)
+    if key not in file_map:
+        available = ", ".join(sorted(file_map.keys()))
+        raise KeyError(f"Unknown dataset key '{key}'. Available keys: {available}")
+    source_path = file_map[key]
+    schema = get_schema(key) if use_schema else None
+    if not use_cache or feather is None or callable(read_csv_kwargs.get("usecols")):
+        return _read_raw_csv(key, source_path, schema, **read_csv_kwargs)
+
+    usecols = read_csv_kwargs.pop("usecols", None)
+    cache_path = get_dataset_cache_path(key, source_path, mode=mode, year=year, schema=schema, **read_csv_kwargs)
+    if os.path.exists(cache_path):
+        table = feather.read_table(cache_path, memory_map=True)
+        if usecols is not None:
+            # read_csv와 동일하게 원본 파일의 열 순서를 유지합니다.
+            table = table.select(_select_usecols(table.column_names, usecols))
+        return table.to_pandas()
+
+    df = _read_raw_csv(key, source_path, schema, **read_csv_kwargs)
+    _write_dataset_cache(df, cache_path)
+    if usecols is not None:
+        df = df[_select_usecols(df.columns, usecols)]
+    return df
+
+
+def _resolve_chunk_dtypes(key, source_path, schema, chunksize, **read_csv_kwargs):
+    """Fix one dtype per column so every CSV chunk is parsed the same way.
+
+    Columns without a declared dtype would otherwise be inferred per chunk (e.g. int in
+    one chunk, float in the next when it happens to contain NaN) and written differently.
+    A light pass over just those columns picks the type a whole-file read would infer.
+    """
+    header = read_header(source_path)
+    kwargs = schema_read_kwargs(key, header=header) if schema is not None else {}
+    columns = read_csv_kwargs.get("usecols") or kwargs.get("usecols") or header
+    declared = {**kwargs.get("dtype", {}), **read_csv_kwargs.get("dtype", {})}
+    undeclared = [column for column in columns if column not in declared and column not in kwargs.get("parse_dates", [])]
+    if not undeclared:
+        return declared
+
+    pass_kwargs = {k: v for k, v in read_csv_kwargs.items() if k not in ("usecols", "dtype", "parse_dates")}
+    kinds = {column: set() for column in undeclared}
+    with pd.read_csv(source_path, usecols=undeclared, chunksize=chunksize, **pass_kwargs) as reader:
+        for chunk in reader:
+            for column in undeclared:
+                kinds[column].add(chunk[column].dtype.kind)
+
+    resolved = {}
+    for column, seen in kinds.items():
+        if seen == {"b"}:
+            resolved[column] = "bool"
+        elif seen <= {"i", "u"}:
+            resolved[column] = "int64"
+        elif seen <= {"i", "u", "f"}:
+            resolved[column] = "float64"
+        else:
+            resolved[column] = "str"
+    return {**declared, **resolved}
+
+
+def iter_dataset_chunks(key, mode="train", year=None, chunksize=100_000, use_schema=True, **read_csv_kwargs):
+    """Yield a table in DataFrames of at most ``chunksize`` rows.
+
+    An existing Arrow cache entry is memory-mapped and sliced; otherwise the CSV is parsed
+    chunk by chunk with the same schema as ``load_dataset`` (undeclared column types are
+    fixed up front so all chunks agree). No cache entry is written, because that would
+    need the whole table in memory at once.
+    """
     file_map = get_file_map(mode=mode, year=year)
     if key not in file_map:
         available = ", ".join(sorted(file_map.keys()))
         raise KeyError(f"Unknown dataset key '{key}'. Available keys: {available}")
-    return pd.read_csv(file_map[key], **read_csv_kwargs)
+    source_path = file_map[key]
+    schema = get_schema(key) if use_schema else None
 
+    usecols = read_csv_kwargs.get("usecols")
+    if feather is not None and not callable(usecols):
+        cache_kwargs = {k: v for k, v in read_csv_kwargs.items() if k != "usecols"}
+        cache_path = get_dataset_cache_path(key, source_path, mode=mode, year=year, schema=schema, **cache_kwargs)
+        if os.path.exists(cache_path):
+            table = feather.read_table(cache_path, memory_map=True)
+            if usecols is not None:
+                table = table.select(_select_usecols(table.column_names, usecols))
+            # 빈 테이블도 read_csv와 같이 빈 DataFrame 하나를 돌려줍니다.
+            for offset in range(0, max(table.num_rows, 1), chunksize):
+                yield table.slice(offset, chunksize).to_pandas()
+            return
 
-def preprocess_activity_consumption(drop_columns=None, dataset_key="활동소비내역", mode="train", year=None):
-    """Drop unused columns from the activity consumption table."""
-    df = load_dataset(dataset_key, mode=mode, year=year).copy()
-    default_drop = [
-        "SGG_CD", "ROAD_NM_ADDR", "LOTNO_ADDR", "ROAD_NM_CD", "LOTNO_CD",
-        "BRNO", "PAYMENT_DT", "CONSUME_HIS_SEQ", "CONSUME_HIS_SNO",
-    ]
-    columns_to_drop = list(default_drop)
+    read_csv_kwargs["dtype"] = _resolve_chunk_dtypes(key, source_path, schema, chunksize, **read_csv_kwargs)
+    with _read_raw_csv(key, source_path, schema, chunksize=chunksize, **read_csv_kwargs) as reader:
+        yield from reader
+
+
+def _append_csv(df, path, first):
+    """Write ``df`` to ``path``, truncating on the first chunk and appending afterwards."""
+    df.to_csv(path, index=False, mode="w" if first else "a", header=first)
+
+
+_ACTIVITY_CONSUMPTION_DROP = [
+    "SGG_CD", "ROAD_NM_ADDR", "LOTNO_ADDR", "ROAD_NM_CD", "LOTNO_CD",
+    "BRNO", "PAYMENT_DT", "CONSUME_HIS_SEQ", "CONSUME_HIS_SNO",
+]
+
+
+def _drop_activity_consumption_columns(df, drop_columns=None):
+    columns_to_drop = list(_ACTIVITY_CONSUMPTION_DROP)
     if drop_columns:
         for column in drop_columns:
             if column not in columns_to_drop:
@@ -67,6 +248,24 @@ def preprocess_activity_consumption(drop_columns=None, dataset_key="활동소비
     return df.drop(columns=columns_to_drop, errors="ignore")
 
 
+@profiled
+def preprocess_activity_consumption(drop_columns=None, dataset_key="활동소비내역", mode="train", year=None):
+    """Drop unused columns from the activity consumption table."""
+    # load_dataset은 매번 새 DataFrame을 돌려주므로 별도 복사가 필요 없습니다.
+    df = load_dataset(dataset_key, mode=mode, year=year)
+    return _drop_activity_consumption_columns(df, drop_columns)
+
+
+@profiled
+def stream_activity_consumption(output_path, chunksize=100_000, drop_columns=None, dataset_key="활동소비내역", mode="train", year=None):
+    """Streaming version of ``preprocess_activity_consumption`` that appends to ``output_path``."""
+    first = True
+    for chunk in iter_dataset_chunks(dataset_key, mode=mode, year=year, chunksize=chunksize):
+        _append_csv(_drop_activity_consumption_columns(chunk, drop_columns), output_path, first)
+        first = False
+    return output_path
+
+
 _activity_codebook_csv = """idx,cd_a,cd_b,cd_nm
 1055,ACT,"1","취식"
 1056,ACT,"2","쇼핑 / 구매"
@@ -84,14 +283,21 @@ def load_activity_codebook():
     return pd.read_csv(io.StringIO(_activity_codebook_csv), usecols=["cd_b", "cd_nm"])
 
 
-def preprocess_activity_history(dataset_key="활동내역", codebook=None, mode="train", year=None):
-    """Fill sparse fields and attach readable activity names."""
-    df = load_dataset(dataset_key, mode=mode, year=year).copy()
+ACTIVITY_SORT_KEYS = ["TRAVEL_ID", "VISIT_AREA_ID", "ACTIVITY_TYPE_CD", "ACTIVITY_TYPE_SEQ"]
+
+
+def _prepare_activity_codebook(codebook=None):
+    code_df = codebook.copy() if codebook is not None else load_activity_codebook()
+    code_df = code_df.rename(columns={"cd_nm": "ACTIVITY_TYPE_NM"})
+    code_df["cd_b"] = code_df["cd_b"].astype(str)
+    return code_df
+
 
+def _fill_activity_history(df, code_df):
+    """Sort, forward-fill within each travel/visit/activity group and attach activity names."""
     # 여행 진행 순서를 맞추기 위해 정렬 기준을 지정합니다.
 
-    sort_keys = ["TRAVEL_ID", "VISIT_AREA_ID", "ACTIVITY_TYPE_CD", "ACTIVITY_TYPE_SEQ"]
-    available_sort_keys = [column for column in sort_keys if column in df.columns]
+    available_sort_keys = [column for column in ACTIVITY_SORT_KEYS if column in df.columns]
     if available_sort_keys:
         df = df.sort_values(available_sort_keys)
 
@@ -105,11 +311,8 @@ def preprocess_activity_history(dataset_key="활동내역", codebook=None, mode=
 
         df[available_fill_columns] = df.groupby(group_keys)[available_fill_columns].ffill()
 
-    # 활동 유형 코드를 사람이 읽기 쉬운 이름으로 바꾸기 위해 코드북을 준비합니다.
+    # 활동 유형 코드를 사람이 읽기 쉬운 이름으로 바꿉니다.
 
-    code_df = codebook.copy() if codebook is not None else load_activity_codebook()
-    code_df = code_df.rename(columns={"cd_nm": "ACTIVITY_TYPE_NM"})
-    code_df["cd_b"] = code_df["cd_b"].astype(str)
     df["ACTIVITY_TYPE_CD"] = df["ACTIVITY_TYPE_CD"].astype(str)
     # 코드북과 합쳐서 활동명 열을 붙입니다.
 
@@ -119,6 +322,72 @@ def preprocess_activity_history(dataset_key="활동내역", codebook=None, mode=
     return df.drop(columns=["cd_b"], errors="ignore")
 
 
+@profiled
+def preprocess_activity_history(dataset_key="활동내역", codebook=None, mode="train", year=None):
+    """Fill sparse fields and attach readable activity names."""
+    df = load_dataset(dataset_key, mode=mode, year=year)
+    return _fill_activity_history(df, _prepare_activity_codebook(codebook))
+
+
+def _plan_travel_buckets(dataset_key, chunksize, mode, year):
+    """Split the sorted TRAVEL_IDs into contiguous ranges of roughly ``chunksize`` rows."""
+    counts = None
+    for chunk in iter_dataset_chunks(dataset_key, mode=mode, year=year, chunksize=chunksize, usecols=["TRAVEL_ID"]):
+        chunk_counts = chunk["TRAVEL_ID"].value_counts()
+        counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+    if counts is None or counts.empty:
+        return pd.Series(dtype="int64")
+    counts = counts.sort_index()
+    # 한 여행의 행은 항상 같은 묶음에 들어가므로 ffill 그룹이 묶음 경계를 넘지 않습니다.
+    return ((counts.cumsum() - 1) // chunksize).astype("int64")
+
+
+@profiled
+def stream_activity_history(output_path, chunksize=100_000, dataset_key="활동내역", codebook=None, mode="train", year=None):
+    """Streaming version of ``preprocess_activity_history`` that appends to ``output_path``.
+
+    The raw table does not have to be sorted. A first pass counts rows per TRAVEL_ID and
+    assigns contiguous TRAVEL_ID ranges to buckets of about ``chunksize`` rows; a second
+    pass spills each chunk's rows into their bucket file. Buckets are then processed in
+    TRAVEL_ID order, so the output matches the in-memory result while only one bucket is
+    held in memory at a time.
+    """
+    code_df = _prepare_activity_codebook(codebook)
+    bucket_of = _plan_travel_buckets(dataset_key, chunksize, mode, year)
+    n_buckets = int(bucket_of.max()) + 2 if not bucket_of.empty else 1  # 마지막 묶음은 TRAVEL_ID 결측 행
+
+    spill_root = os.path.dirname(os.path.abspath(output_path))
+    with tempfile.TemporaryDirectory(prefix=".activity_history_", dir=spill_root) as spill_dir:
+        spill_paths = [os.path.join(spill_dir, f"{index:05d}.pkl") for index in range(n_buckets)]
+        header = None
+        for chunk in iter_dataset_chunks(dataset_key, mode=mode, year=year, chunksize=chunksize):
+            if header is None:
+                header = chunk.iloc[:0]
+            buckets = chunk["TRAVEL_ID"].map(bucket_of).fillna(n_buckets - 1).astype("int64")
+            for index, part in chunk.groupby(buckets.to_numpy(), sort=False):
+                with open(spill_paths[index], "ab") as handle:
+                    pickle.dump(part, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+        first = True
+        for path in spill_paths:
+            if not os.path.exists(path):
+                continue
+            parts = []
+            with open(path, "rb") as handle:
+                while True:
+                    try:
+                        parts.append(pickle.load(handle))
+                    except EOFError:
+                        break
+            bucket = pd.concat(parts, ignore_index=True)
+            _append_csv(_fill_activity_history(bucket, code_df), output_path, first)
+            first = False
+        if first and header is not None:
+            # 빈 입력이라도 헤더만 있는 파일을 남깁니다.
+            _append_csv(_fill_activity_history(header, code_df), output_path, True)
+    return output_path
+
+
 def label_encode_series(series):
     """Encode a pandas Series and return the codes plus a value-to-code map."""
     # factorize를 사용해 고유값마다 정수 코드를 배정합니다.
@@ -135,6 +404,7 @@ def label_encode_series(series):
     return encoded, mapping
 
 
+@profiled
 def preprocess_lodging_consumption(
     dataset_key="숙박소비내역",
     travel_dataset_key="여행",
@@ -230,7 +500,16 @@ def get_sido_code_map():
     """
     JSON 파일을 읽어 SIDO_NM을 SSG_CD1로 매핑하는 딕셔너리를 생성합니다.
     다양한 형태의 축약된 지명도 처리합니다.
+    JSON은 처음 한 번만 읽고 이후에는 캐시된 매핑의 사본을 반환합니다.
     """
+    global _sido_code_map_cache
+    if _sido_code_map_cache is None:
+        _sido_code_map_cache = _build_sido_code_map()
+    return dict(_sido_code_map_cache)
+
+
+def _build_sido_code_map():
+    """tc_sgg_시군구코드.json에서 시도명/축약어 → SGG_CD1 매핑을 만듭니다."""
     json_path = os.path.join(_project_root, "data", "tag_code", "training", "json", "tc_sgg_시군구코드.json")
     
     with open(json_path, 'r', encoding='utf-8') as f:
@@ -264,29 +543,44 @@ def get_sido_code_map():
 
     return sido_map
 
+
+def get_sido_pattern():
+    """
+    시도명 키를 긴 이름부터 나열한 하나의 정규식으로 컴파일해 반환합니다.
+    ('경상남도'가 '경남'보다 먼저 매칭되도록 길이 내림차순으로 정렬합니다.)
+    """
+    global _sido_pattern_cache
+    if _sido_pattern_cache is None:
+        sorted_sido_keys = sorted(get_sido_code_map().keys(), key=len, reverse=True)
+        _sido_pattern_cache = re.compile("(" + "|".join(re.escape(key) for key in sorted_sido_keys) + ")")
+    return _sido_pattern_cache
+
+
+def map_region_codes(series):
+    """
+    지역명 문자열 Series를 SGG_CD1 코드 Series로 변환합니다. 매칭되지 않으면 NaN입니다.
+    고유값 수백 개에 대해서만 정규식을 적용한 뒤 결과를 전체 행에 매핑합니다.
+    """
+    sido_code_map = get_sido_code_map()
+    uniques = pd.Series([value for value in series.dropna().unique() if isinstance(value, str)], dtype=object)
+    if uniques.empty:
+        return pd.Series(np.nan, index=series.index)
+    matched = uniques.str.extract(get_sido_pattern(), expand=False)
+    code_by_text = dict(zip(uniques, matched.map(sido_code_map)))
+    return series.map(code_by_text)
+
+
+@profiled
 def preprocess_traveller_master(dataset_key="여행객_Master", mode="train", year=None):
     """
     여행객 Master 테이블을 전처리하고, 거주지 및 목적지 컬럼을 SGG_CD1 코드로 변환합니다.
     """
     df = load_dataset(dataset_key, mode=mode, year=year).copy()
-    sido_code_map = get_sido_code_map()
-    
-    # 긴 이름부터 찾도록 키를 정렬 ('경상남도'가 '경남'보다 먼저 매칭되도록)
-    sorted_sido_keys = sorted(sido_code_map.keys(), key=len, reverse=True)
-
-    def get_code_from_text(text):
-        """문자열에서 지역명 키를 찾아 코드를 반환하는 함수"""
-        if not isinstance(text, str):
-            return None
-        for key in sorted_sido_keys:
-            if key in text:
-                return sido_code_map[key]
-        return None
 
     # TRAVEL_STATUS_RESIDENCE 컬럼 변환
     if "TRAVEL_STATUS_RESIDENCE" in df.columns:
         df["TRAVEL_STATUS_RESIDENCE_CODE"] = (
-            df["TRAVEL_STATUS_RESIDENCE"].apply(get_code_from_text)
+            map_region_codes(df["TRAVEL_STATUS_RESIDENCE"])
             .fillna(0)
             .astype(int)
         )
@@ -294,7 +588,7 @@ def preprocess_traveller_master(dataset_key="여행객_Master", mode="train", ye
     # TRAVEL_STATUS_DESTINATION 컬럼 변환
     if "TRAVEL_STATUS_DESTINATION" in df.columns:
         df["TRAVEL_STATUS_DESTINATION_CODE"] = (
-            df["TRAVEL_STATUS_DESTINATION"].apply(get_code_from_text)
+            map_region_codes(df["TRAVEL_STATUS_DESTINATION"])
             .fillna(0)
             .astype(int)
         )
@@ -328,6 +622,7 @@ def preprocess_traveller_master(dataset_key="여행객_Master", mode="train", ye
     return df.reset_index(drop=True)
 
 
+@profiled
 def preprocess_visit_area_info(
     dataset_key="방문지정보",
     exclude_codes=(21, 22, 23),
@@ -378,12 +673,14 @@ def preprocess_visit_area_info(
     # 2. 여행 단위(TRAVEL_ID)로 통계 집계
     parts = []
     
-    # 만족도, 재방문/추천의향 평균 계산 (제외 코드 제외)
-    filtered = df[~df["VISIT_AREA_TYPE_CD"].isin(set(exclude_codes))].copy()
+    # 만족도, 재방문/추천의향 평균 계산 (제외 코드 제외) - 한 번의 groupby로 세 평균을 함께 구합니다.
+    filtered = df[~df["VISIT_AREA_TYPE_CD"].isin(set(exclude_codes))]
     if not filtered.empty:
-        parts.append(filtered.groupby("TRAVEL_ID")["DGSTFN"].mean().rename("DGSTFN_AVG"))
-        parts.append(filtered.groupby("TRAVEL_ID")["REVISIT_INTENTION"].mean().rename("REVISIT_AVG"))
-        parts.append(filtered.groupby("TRAVEL_ID")["RCMDTN_INTENTION"].mean().rename("RCMDTN_AVG"))
+        parts.append(filtered.groupby("TRAVEL_ID").agg(
+            DGSTFN_AVG=("DGSTFN", "mean"),
+            REVISIT_AVG=("REVISIT_INTENTION", "mean"),
+            RCMDTN_AVG=("RCMDTN_INTENTION", "mean"),
+        ))
 
     # ------------------------------------------------------------------------------- #
     # 타겟변수(IS_FAILED_TRIP) 작업 코드 (사용자 요청 로직 반영)
@@ -406,16 +703,22 @@ def preprocess_visit_area_info(
     # ------------------------------------------------------------------------------- #
     
     # 여행 기간(TRIP_DAYS) 및 이동 횟수(MOVE_CNT) 계산
-    if {"VISIT_START_YMD", "VISIT_END_YMD"}.issubset(df.columns):
-        trip_days = df.groupby("TRAVEL_ID").apply(
-            lambda x: (x["VISIT_END_YMD"].max() - x["VISIT_START_YMD"].min()).days + 1
-            if x["VISIT_START_YMD"].notna().any() and x["VISIT_END_YMD"].notna().any()
-            else np.nan
-        ).rename("TRIP_DAYS")
-        parts.append(trip_days)
+    # 여행마다 람다를 호출하지 않도록 최소/최대 날짜와 방문 수를 한 번의 groupby로 집계합니다.
+    trip_aggs = {}
+    has_visit_dates = {"VISIT_START_YMD", "VISIT_END_YMD"}.issubset(df.columns)
+    if has_visit_dates:
+        trip_aggs["first_visit"] = ("VISIT_START_YMD", "min")
+        trip_aggs["last_visit"] = ("VISIT_END_YMD", "max")
     if "VISIT_AREA_NM" in df.columns:
-        move_count = df.groupby("TRAVEL_ID")["VISIT_AREA_NM"].count().rename("MOVE_CNT")
-        parts.append(move_count)
+        trip_aggs["MOVE_CNT"] = ("VISIT_AREA_NM", "count")
+    if trip_aggs:
+        trip_stats = df.groupby("TRAVEL_ID").agg(**trip_aggs)
+        if has_visit_dates:
+            # 시작일 또는 종료일이 모두 비어 있는 여행은 NaT 차이가 되어 NaN으로 남습니다.
+            trip_days = (trip_stats["last_visit"] - trip_stats["first_visit"]).dt.days + 1
+            parts.append(trip_days.rename("TRIP_DAYS"))
+        if "MOVE_CNT" in trip_stats.columns:
+            parts.append(trip_stats["MOVE_CNT"])
 
     # 집계된 모든 통계를 하나의 데이터프레임으로 합칩니다.
     aggregated = pd.concat(parts, axis=1).reset_index()
@@ -446,6 +749,7 @@ def ensure_preprocessing_dir(output_dir=None):
     return path_value
 
 
+@profiled
 def save_dataframe(df, filename, output_dir=None):
     """Save a DataFrame as CSV inside the specified output folder."""
     folder = ensure_preprocessing_dir(output_dir)
@@ -454,14 +758,26 @@ def save_dataframe(df, filename, output_dir=None):
     return filepath
 
 
-def save_activity_consumption(output_dir=None, mode="train", year=None, **preprocess_kwargs):
-    """Run the activity consumption preprocessing and save the result."""
+def save_activity_consumption(output_dir=None, mode="train", year=None, chunksize=None, **preprocess_kwargs):
+    """Run the activity consumption preprocessing and save the result.
+
+    With ``chunksize`` the table is streamed to disk instead of being built in memory.
+    """
+    if chunksize:
+        filepath = os.path.join(ensure_preprocessing_dir(output_dir), "activity_consumption.csv")
+        return stream_activity_consumption(filepath, chunksize=chunksize, mode=mode, year=year, **preprocess_kwargs)
     df = preprocess_activity_consumption(mode=mode, year=year, **preprocess_kwargs)
     return save_dataframe(df, "activity_consumption.csv", output_dir)
 
 
-def save_activity_history(output_dir=None, mode="train", year=None, **preprocess_kwargs):
-    """Run the activity history preprocessing and save the result."""
+def save_activity_history(output_dir=None, mode="train", year=None, chunksize=None, **preprocess_kwargs):
+    """Run the activity history preprocessing and save the result.
+
+    With ``chunksize`` the table is streamed to disk instead of being built in memory.
+    """
+    if chunksize:
+        filepath = os.path.join(ensure_preprocessing_dir(output_dir), "activity_history.csv")
+        return stream_activity_history(filepath, chunksize=chunksize, mode=mode, year=year, **preprocess_kwargs)
     df = preprocess_activity_history(mode=mode, year=year, **preprocess_kwargs)
     return save_dataframe(df, "activity_history.csv", output_dir)
 
@@ -529,11 +845,14 @@ def save_visit_area_info(output_dir=None, save_base_table=False, mode="train", y
     return summary_path
 
 
-def save_all_preprocessed_data(output_dir=None, save_visit_base=False, mode="train", year=None):
-    """Run every preprocessing step and save each result to disk."""
+def save_all_preprocessed_data(output_dir=None, save_visit_base=False, mode="train", year=None, chunksize=None):
+    """Run every preprocessing step and save each result to disk.
+
+    ``chunksize`` streams the two activity tables, the largest outputs, in bounded memory.
+    """
     paths = {}
-    paths["activity_consumption"] = save_activity_consumption(output_dir=output_dir, mode=mode, year=year)
-    paths["activity_history"] = save_activity_history(output_dir=output_dir, mode=mode, year=year)
+    paths["activity_consumption"] = save_activity_consumption(output_dir=output_dir, mode=mode, year=year, chunksize=chunksize)
+    paths["activity_history"] = save_activity_history(output_dir=output_dir, mode=mode, year=year, chunksize=chunksize)
     paths["lodging_consumption"] = save_lodging_consumption(output_dir=output_dir, mode=mode, year=year)
     paths["traveller_master"] = save_traveller_master(output_dir=output_dir, mode=mode, year=year)
     paths["travel"] = save_travel_table(output_dir=output_dir, mode=mode, year=year)
@@ -0,0 +1,213 @@
+"""Opt-in per-stage timing and memory instrumentation.
+
+Profiling is off by default and the ``profiled`` wrapper then only costs one flag check.
+Once enabled, every ``stage`` (context manager) or ``@profiled`` call records
+- wall and CPU time
+- rows in (first DataFrame argument) and rows out (returned DataFrame)
+- peak traced Python memory while the stage ran (tracemalloc; nested stages are tracked
+  on a stack so a parent's peak includes its children)
+
+Outermost stages can additionally be dumped with cProfile (``.prof``) or pyinstrument
+(``.html``). ``write_report`` saves the records and a per-stage summary as JSON.
+"""
+import cProfile
+import functools
+import json
+import os
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+PROFILE_BACKENDS = ("cprofile", "pyinstrument")
+
+_state = {
+    "enabled": False,
+    "profile_dir": None,
+    "backend": None,
+    "records": [],
+    "stack": [],
+    "started_tracemalloc": False,
+}
+
+
+def enable_profiling(profile_dir=None, backend=None):
+    """Start recording stages; ``backend`` dumps outermost stages into ``profile_dir``."""
+    if backend is not None and backend not in PROFILE_BACKENDS:
+        raise ValueError(f"Unknown profile backend '{backend}'. Choose from {PROFILE_BACKENDS}.")
+    _state.update(enabled=True, profile_dir=profile_dir, backend=backend, records=[], stack=[])
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _state["started_tracemalloc"] = True
+    if backend and profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+
+
+def disable_profiling():
+    """Stop recording and return the collected records."""
+    records = list(_state["records"])
+    if _state["started_tracemalloc"]:
+        tracemalloc.stop()
+    _state.update(enabled=False, profile_dir=None, backend=None, records=[], stack=[], started_tracemalloc=False)
+    return records
+
+
+def is_profiling():
+    return _state["enabled"]
+
+
+def get_records():
+    return list(_state["records"])
+
+
+def _count_rows(value):
+    """Rows of a DataFrame/Series result (or the first one in a tuple), else None."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, tuple):
+        for item in value:
+            if isinstance(item, (pd.DataFrame, pd.Series)):
+                return len(item)
+    return None
+
+
+def _start_backend(name):
+    backend = _state["backend"]
+    if backend is None or _state["profile_dir"] is None or _state["stack"]:
+        return None
+    if backend == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("Warning: pyinstrument is not installed; falling back to cProfile.")
+            _state["backend"] = backend = "cprofile"
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_backend(profiler, name):
+    if profiler is None:
+        return None
+    index = len(_state["records"])
+    safe_name = re.sub(r"[^\w.-]+", "_", name)
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        path = os.path.join(_state["profile_dir"], f"{index:03d}_{safe_name}.prof")
+        profiler.dump_stats(path)
+    else:
+        profiler.stop()
+        path = os.path.join(_state["profile_dir"], f"{index:03d}_{safe_name}.html")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(profiler.output_html())
+    return path
+
+
+@contextmanager
+def stage(name, rows_in=None, **labels):
+    """Record one pipeline stage. Yields a dict; set ``info["rows_out"]`` inside the block."""
+    info = {"rows_out": None}
+    if not _state["enabled"]:
+        yield info
+        return
+
+    stack = _state["stack"]
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1]["abs_peak"] = max(stack[-1]["abs_peak"], peak)
+    tracemalloc.reset_peak()
+    frame = {"start": current, "abs_peak": current}
+    profiler = _start_backend(name)
+    stack.append(frame)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield info
+    finally:
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        stack.pop()
+        profile_path = _stop_backend(profiler, name)
+        frame["abs_peak"] = max(frame["abs_peak"], tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1]["abs_peak"] = max(stack[-1]["abs_peak"], frame["abs_peak"])
+        tracemalloc.reset_peak()
+        record = {
+            "stage": name,
+            "depth": len(stack),
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "rows_in": rows_in,
+            "rows_out": info["rows_out"],
+            "peak_mem_mb": (frame["abs_peak"] - frame["start"]) / (1024 * 1024),
+            **{key: value for key, value in labels.items() if value is not None},
+        }
+        if profile_path:
+            record["profile"] = profile_path
+        _state["records"].append(record)
+
+
+def profiled(func=None, *, name=None):
+    """Decorator form of ``stage``; labels the record with the call's mode/year/key if given."""
+    if func is None:
+        return functools.partial(profiled, name=name)
+    stage_name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _state["enabled"]:
+            return func(*args, **kwargs)
+        rows_in = next((len(a) for a in list(args) + list(kwargs.values()) if isinstance(a, pd.DataFrame)), None)
+        labels = {k: kwargs.get(k) for k in ("mode", "year")}
+        if args and isinstance(args[0], str):
+            labels["key"] = args[0]
+        with stage(stage_name, rows_in=rows_in, **labels) as info:
+            result = func(*args, **kwargs)
+            info["rows_out"] = _count_rows(result)
+        return result
+
+    return wrapper
+
+
+def summarize(records):
+    """Aggregate records by stage name: calls, total wall/CPU time, max peak memory."""
+    summary = {}
+    for record in records:
+        entry = summary.setdefault(
+            record["stage"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "rows_out": 0, "peak_mem_mb": 0.0}
+        )
+        entry["calls"] += 1
+        entry["wall_s"] += record["wall_s"]
+        entry["cpu_s"] += record["cpu_s"]
+        entry["rows_out"] += record["rows_out"] or 0
+        entry["peak_mem_mb"] = max(entry["peak_mem_mb"], record["peak_mem_mb"])
+    return dict(sorted(summary.items(), key=lambda item: -item[1]["wall_s"]))
+
+
+def write_report(path, records=None, **extra):
+    """Write the records plus a per-stage summary to ``path`` as JSON."""
+    records = get_records() if records is None else records
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        **extra,
+        "summary": summarize(records),
+        "records": records,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, ensure_ascii=False, indent=2)
+    return path
+
+
+def print_summary(records=None, top=10):
+    records = get_records() if records is None else records
+    for name, entry in list(summarize(records).items())[:top]:
+        print(
+            f"  {name:<36} x{entry['calls']:<3} wall {entry['wall_s']:.2f}s  cpu {entry['cpu_s']:.2f}s  "
+            f"peak {entry['peak_mem_mb']:.1f} MB"
+        )
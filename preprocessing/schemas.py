@@ -0,0 +1,206 @@
+"""Declarative read schemas for the raw TL_csv tables.
+
+Each entry is keyed by the dataset key used in ``file_dir.json`` and lists
+- ``columns``: the columns the preprocessing steps actually need, with their pandas dtype
+  (``None`` keeps pandas' own inference, ``"datetime"`` parses the column as a date)
+- ``unused``: columns known to exist in the raw drop but never read
+
+Columns outside ``columns`` + ``unused`` (or missing ``columns``) indicate schema drift
+between survey years and are reported by ``check_schema``. Such unexpected columns are
+still read (with pandas' inferred dtype); only the ``unused`` ones are skipped.
+"""
+import pandas as pd
+
+# Bump when the way a schema turns into read_csv arguments changes, so Arrow cache
+# entries parsed under the old rules are not reused.
+SCHEMA_READ_VERSION = 2
+
+DATASET_SCHEMAS = {
+    "활동소비내역": {
+        "columns": {
+            "TRAVEL_ID": "str",
+            "VISIT_AREA_ID": "Int64",
+            "ACTIVITY_TYPE_CD": "category",
+            "ACTIVITY_TYPE_SEQ": "Int64",
+            "PAYMENT_NUM": None,
+            "STORE_NM": "str",
+            "PAYMENT_MTHD_SE": "category",
+            "PAYMENT_AMT_WON": None,
+            "PAYMENT_ETC": "str",
+        },
+        "unused": [
+            "SGG_CD", "ROAD_NM_ADDR", "LOTNO_ADDR", "ROAD_NM_CD", "LOTNO_CD",
+            "BRNO", "PAYMENT_DT", "CONSUME_HIS_SEQ", "CONSUME_HIS_SNO",
+        ],
+    },
+    "활동내역": {
+        "columns": {
+            "TRAVEL_ID": "str",
+            "VISIT_AREA_ID": "Int64",
+            # 정렬 기준이므로 숫자 순서를 유지하도록 정수형으로 읽습니다.
+            "ACTIVITY_TYPE_CD": "Int64",
+            "ACTIVITY_TYPE_SEQ": "Int64",
+            "ACTIVITY_ETC": "str",
+            "ACTIVITY_DTL": "str",
+            "RSVT_YN": "category",
+            "EXPND_SE": None,
+            "ADMISSION_SE": None,
+        },
+        "unused": [],
+    },
+    "숙박소비내역": {
+        "columns": {
+            "TRAVEL_ID": "str",
+            "LODGING_NM": "str",
+            "LODGING_PAYMENT_SEQ": "Int64",
+            "LODGING_TYPE_CD": "Int64",
+            "RSVT_YN": "category",
+            "PAYMENT_NUM": None,
+            "STORE_NM": "str",
+            "ROAD_NM_ADDR": "str",
+            "LOTNO_ADDR": "str",
+            "PAYMENT_DT": "datetime",
+            "PAYMENT_MTHD_SE": None,
+            "PAYMENT_AMT_WON": None,
+        },
+        "unused": [
+            "CHK_IN_DT_MIN", "CHK_OUT_DT_MIN", "BRNO", "ROAD_NM_CD", "LOTNO_CD", "PAYMENT_ETC",
+        ],
+    },
+    "여행": {
+        "columns": {
+            "TRAVEL_ID": "str",
+            "TRAVELER_ID": "str",
+            "TRAVEL_PURPOSE": "str",
+            "TRAVEL_START_YMD": "datetime",
+            "TRAVEL_END_YMD": "datetime",
+            "MVMN_NM": "str",
+            "TRAVEL_MISSION_CHECK": "str",
+            "TRAVEL_SEASON": None,
+        },
+        "unused": ["TRAVEL_NM", "TRAVEL_PERSONA", "TRAVEL_MISSION"],
+    },
+    "여행객_Master": {
+        "columns": {
+            "TRAVELER_ID": "str",
+            "RESIDENCE_SGG_CD": None,
+            "GENDER": None,
+            "AGE_GRP": None,
+            "EDU_NM": None,
+            "MARR_STTS": None,
+            "FAMILY_MEMB": None,
+            "JOB_NM": None,
+            "INCOME": None,
+            "HOUSE_INCOME": None,
+            "TRAVEL_TERM": None,
+            "TRAVEL_NUM": None,
+            "TRAVEL_LIKE_SIDO_1": None,
+            "TRAVEL_LIKE_SGG_1": None,
+            "TRAVEL_LIKE_SIDO_2": None,
+            "TRAVEL_LIKE_SGG_2": None,
+            "TRAVEL_LIKE_SIDO_3": None,
+            "TRAVEL_LIKE_SGG_3": None,
+            "TRAVEL_STATUS_RESIDENCE": "str",
+            "TRAVEL_STATUS_DESTINATION": "str",
+            "TRAVEL_STATUS_ACCOMPANY": "category",
+            "TRAVEL_MOTIVE_1": None,
+            "TRAVEL_MOTIVE_2": None,
+            "TRAVEL_MOTIVE_3": None,
+            "TRAVEL_COMPANIONS_NUM": None,
+        },
+        "unused": (
+            ["TRAVEL_STATUS_YMD", "JOB_ETC", "EDU_FNSH_SE"]
+            + [f"TRAVEL_STYL_{i}" for i in range(1, 9)]
+            + [f"TRAVEL_STYLE_{i}" for i in range(1, 9)]
+        ),
+    },
+    "방문지정보": {
+        "columns": {
+            "VISIT_AREA_ID": "Int64",
+            "TRAVEL_ID": "str",
+            "VISIT_ORDER": "Int64",
+            "VISIT_AREA_NM": "str",
+            "VISIT_START_YMD": "datetime",
+            "VISIT_END_YMD": "datetime",
+            # exclude_codes(21, 22, 23)와 비교하므로 정수형으로 읽습니다.
+            "VISIT_AREA_TYPE_CD": "Int64",
+            "REVISIT_YN": "category",
+            "VISIT_CHC_REASON_CD": None,
+            # 만족도 점수는 결측을 NaN으로 비교해야 하므로 float 추론을 유지합니다.
+            "DGSTFN": None,
+            "REVISIT_INTENTION": None,
+            "RCMDTN_INTENTION": None,
+        },
+        "unused": [
+            "ROAD_NM_ADDR", "LOTNO_ADDR", "X_COORD", "Y_COORD", "ROAD_NM_CD",
+            "LOTNO_CD", "POI_ID", "POI_NM", "RESIDENCE_TIME_MIN",
+            "LODGING_TYPE_CD", "SGG_CD",
+        ],
+    },
+}
+
+
+def get_schema(key):
+    """Return the schema registered for a dataset key, or None if the key has none."""
+    return DATASET_SCHEMAS.get(key)
+
+
+def schema_read_kwargs(key, header=None):
+    """Translate a registered schema into ``pd.read_csv`` keyword arguments.
+
+    When ``header`` (the raw column names) is given, every column except the known
+    ``unused`` ones is read in file order, so columns the schema does not list yet pass
+    through instead of being dropped, and optional columns absent from the file are
+    skipped. Without a header only the declared columns are read.
+    """
+    schema = get_schema(key)
+    if schema is None:
+        return {}
+    columns = schema["columns"]
+    usecols = list(columns)
+    if header is not None:
+        unused = set(schema["unused"])
+        usecols = [name for name in header if name not in unused]
+        present = set(usecols)
+        columns = {name: dtype for name, dtype in columns.items() if name in present}
+
+    dtype = {}
+    parse_dates = []
+    for name, column_dtype in columns.items():
+        if column_dtype == "datetime":
+            parse_dates.append(name)
+        elif column_dtype is not None:
+            dtype[name] = column_dtype
+
+    kwargs = {"usecols": usecols}
+    if dtype:
+        kwargs["dtype"] = dtype
+    if parse_dates:
+        kwargs["parse_dates"] = parse_dates
+    return kwargs
+
+
+def check_schema(key, header, source=None):
+    """Compare a raw header against the registered schema and report drift.
+
+    Returns the list of unexpected columns. Prints a warning for unexpected or missing
+    columns; missing columns are not fatal because every preprocessing step already
+    guards optional columns with ``if column in df.columns``.
+    """
+    schema = get_schema(key)
+    if schema is None:
+        return []
+    label = source or key
+    known = set(schema["columns"]) | set(schema["unused"])
+    unexpected = [column for column in header if column not in known]
+    missing = [column for column in schema["columns"] if column not in set(header)]
+    if unexpected:
+        print(f"Warning: Schema drift in '{label}': unexpected columns {unexpected}.")
+    if missing:
+        print(f"Warning: Schema drift in '{label}': missing columns {missing}.")
+    return unexpected
+
+
+def read_header(path):
+    """Read only the header row of a CSV file."""
+    return list(pd.read_csv(path, nrows=0).columns)
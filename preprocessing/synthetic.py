@@ -0,0 +1,288 @@
+"""Synthetic multi-table survey data for scale testing.
+
+The generator learns, from an existing year's tables,
+- the empirical distribution of child rows per parent row along the key chain
+  여행객_Master (TRAVELER_ID) → 여행 (TRAVEL_ID) → 방문지정보 (VISIT_AREA_ID)
+  → 활동내역 (ACTIVITY_TYPE_CD, ACTIVITY_TYPE_SEQ) → 활동소비내역, and 여행 → 숙박소비내역
+- the per-column marginal distribution of every other column (column groups listed in
+  ``JOINT_COLUMNS`` are sampled together so e.g. start/end dates stay ordered)
+
+and writes a consistent dataset of any size to ``data/<mode>/<year>/TL_csv`` together with
+the ``file_dir.json`` that ``get_file_map`` reads. Rows are generated and appended in chunks
+of travellers, so memory stays bounded for millions of visits.
+
+Learn from a year whose raw TL_csv drop is on disk. Without it the generator falls back to
+the preprocessed outputs, which lack some raw columns (e.g. travel dates, visit details),
+so only the steps whose columns survived can be run on the result.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import preprocessing as pp
+
+# 테이블 간 키 관계: 자식 테이블은 link 컬럼으로 부모 행을 가리키고, key 컬럼은 생성 시 새로 부여합니다.
+TABLE_TREE = {
+    "여행객_Master": {"parent": None, "link": [], "key": ["TRAVELER_ID"]},
+    "여행": {"parent": "여행객_Master", "link": ["TRAVELER_ID"], "key": ["TRAVEL_ID"]},
+    "방문지정보": {"parent": "여행", "link": ["TRAVEL_ID"], "key": ["VISIT_AREA_ID", "VISIT_ORDER"]},
+    "활동내역": {"parent": "방문지정보", "link": ["TRAVEL_ID", "VISIT_AREA_ID"], "key": ["ACTIVITY_TYPE_SEQ"]},
+    "활동소비내역": {
+        "parent": "활동내역",
+        "link": ["TRAVEL_ID", "VISIT_AREA_ID", "ACTIVITY_TYPE_CD", "ACTIVITY_TYPE_SEQ"],
+        "key": [],
+    },
+    "숙박소비내역": {"parent": "여행", "link": ["TRAVEL_ID"], "key": ["LODGING_PAYMENT_SEQ"]},
+}
+
+# 함께 샘플링해야 값의 관계(시작일 ≤ 종료일 등)가 유지되는 컬럼 묶음
+JOINT_COLUMNS = {
+    "여행": [["TRAVEL_START_YMD", "TRAVEL_END_YMD"]],
+    "방문지정보": [["VISIT_START_YMD", "VISIT_END_YMD"]],
+    "숙박소비내역": [["CHK_IN_DT_MIN", "CHK_OUT_DT_MIN"]],
+}
+
+# 원본(TL_csv)이 없을 때 대신 학습할 전처리 결과 파일과, 전처리 과정에서 추가된 파생 컬럼
+FALLBACK_FILES = {
+    "여행객_Master": "traveller_master.csv",
+    "여행": "travel.csv",
+    "활동내역": "activity_history.csv",
+    "활동소비내역": "activity_consumption.csv",
+    "숙박소비내역": "lodging_consumption.csv",
+}
+DERIVED_COLUMNS = [
+    "ACTIVITY_TYPE_NM", "LODGING_TYPE_NM", "cd_a", "idx",
+    "TRAVEL_STATUS_RESIDENCE_CODE", "TRAVEL_STATUS_DESTINATION_CODE",
+]
+
+DEFAULT_FILE_NAMES = {
+    "활동소비내역": "tn_activity_consume_his_활동소비내역_S.csv",
+    "활동내역": "tn_activity_his_활동내역_S.csv",
+    "숙박소비내역": "tn_lodge_consume_his_숙박소비내역_S.csv",
+    "여행": "tn_travel_여행_S.csv",
+    "여행객_Master": "tn_traveller_master_여행객 Master_S.csv",
+    "방문지정보": "tn_visit_area_info_방문지정보_S.csv",
+}
+
+
+def load_source_tables(mode="train", year=None):
+    """Load every table in ``TABLE_TREE`` for a year, preferring the raw TL_csv drop.
+
+    Tables without a raw file fall back to the matching preprocessed CSV (with derived
+    columns removed). 방문지정보 has no visit-level preprocessed output, so without the raw
+    file only its keys are reconstructed from 활동내역.
+    """
+    tables = {}
+    preprocessed_dir = os.path.join(pp._project_root, "data", mode, year, "preprocessing")
+    for key in TABLE_TREE:
+        try:
+            tables[key] = pp.load_dataset(key, mode=mode, year=year, use_schema=False)
+            continue
+        except (FileNotFoundError, KeyError):
+            pass
+        fallback = os.path.join(preprocessed_dir, FALLBACK_FILES.get(key, ""))
+        if key in FALLBACK_FILES and os.path.exists(fallback):
+            print(f"Warning: Raw '{key}' not found for {mode}/{year}; learning from {fallback}.")
+            df = pd.read_csv(fallback)
+            derived = [c for c in df.columns if c in DERIVED_COLUMNS or c.endswith("_ENC")]
+            tables[key] = df.drop(columns=derived)
+
+    if "방문지정보" not in tables and "활동내역" in tables:
+        print(f"Warning: Raw '방문지정보' not found for {mode}/{year}; only its keys are reconstructed from 활동내역.")
+        visits = tables["활동내역"][["TRAVEL_ID", "VISIT_AREA_ID"]].drop_duplicates()
+        visits["VISIT_ORDER"] = visits.groupby("TRAVEL_ID").cumcount() + 1
+        tables["방문지정보"] = visits.reset_index(drop=True)
+
+    missing = [key for key in TABLE_TREE if key not in tables]
+    if missing:
+        raise FileNotFoundError(f"No raw or preprocessed source for {missing} in {mode}/{year}.")
+    return tables
+
+
+def _child_counts(parent, child, link, label=""):
+    """Empirical number of child rows per parent row (parents without children count as 0).
+
+    When most child rows do not point at any parent row (e.g. tables from different
+    drops), the distribution is learned from the child's own groups instead.
+    """
+    counts = child.groupby(link, dropna=False).size().rename("n").reset_index()
+    if not set(link) <= set(parent.columns):
+        return counts["n"].to_numpy(dtype=np.int64)
+    matched = parent[link].drop_duplicates().merge(counts, on=link, how="left")["n"]
+    if matched.sum() < 0.5 * len(child):
+        print(f"Warning: Most '{label}' rows do not match a parent row; using per-group counts only.")
+        return counts["n"].to_numpy(dtype=np.int64)
+    return matched.fillna(0).to_numpy(dtype=np.int64)
+
+
+def fit_synthetic_model(tables):
+    """Learn child-count distributions and column value pools from the source tables."""
+    model = {}
+    for key, spec in TABLE_TREE.items():
+        df = tables[key]
+        generated = set(spec["link"]) | set(spec["key"])
+        attributes = [c for c in df.columns if c not in generated]
+        groups = [[c for c in group if c in attributes] for group in JOINT_COLUMNS.get(key, [])]
+        groups = [group for group in groups if group]
+        grouped = {c for group in groups for c in group}
+        groups += [[c] for c in attributes if c not in grouped]
+
+        entry = {
+            "columns": list(df.columns),
+            "values": df[attributes].reset_index(drop=True),
+            "groups": groups,
+        }
+        if spec["parent"] is not None:
+            entry["child_counts"] = _child_counts(tables[spec["parent"]], df, spec["link"], label=key)
+        if "ACTIVITY_TYPE_SEQ" in spec["key"] and "ACTIVITY_TYPE_SEQ" in df.columns:
+            entry["seq_start"] = int(pd.to_numeric(df["ACTIVITY_TYPE_SEQ"], errors="coerce").min())
+        if "LODGING_PAYMENT_SEQ" in spec["key"] and "LODGING_PAYMENT_SEQ" in df.columns:
+            entry["seq_start"] = int(pd.to_numeric(df["LODGING_PAYMENT_SEQ"], errors="coerce").min())
+        model[key] = entry
+    return model
+
+
+def _sample_attributes(entry, n, rng):
+    """Sample ``n`` rows of attribute columns, one independent draw per column group."""
+    values = entry["values"]
+    out = {}
+    if len(values) == 0:
+        return pd.DataFrame(index=range(n), columns=values.columns)
+    for group in entry["groups"]:
+        picks = rng.integers(0, len(values), size=n)
+        for column in group:
+            out[column] = values[column].to_numpy()[picks]
+    return pd.DataFrame(out, index=range(n))
+
+
+def _expand_parents(parent_links, counts):
+    """Repeat each parent's link columns by its sampled child count."""
+    return parent_links.loc[parent_links.index.repeat(counts)].reset_index(drop=True)
+
+
+def generate_chunk(model, n_travellers, rng, traveller_offset=0, visit_offset=0, prefix="s"):
+    """Generate one consistent chunk of every table for ``n_travellers`` new travellers.
+
+    Returns ``(tables, n_visits)`` so the caller can keep VISIT_AREA_ID unique across chunks.
+    """
+    tables = {}
+
+    master = _sample_attributes(model["여행객_Master"], n_travellers, rng)
+    master["TRAVELER_ID"] = [f"{prefix}{i:07d}" for i in range(traveller_offset, traveller_offset + n_travellers)]
+    tables["여행객_Master"] = master
+
+    entry = model["여행"]
+    counts = rng.choice(entry["child_counts"], size=n_travellers)
+    travel = _expand_parents(master[["TRAVELER_ID"]], counts)
+    nth = travel.groupby("TRAVELER_ID").cumcount().to_numpy()
+    travel["TRAVEL_ID"] = [f"{prefix}_{tid}" + (f"_{j}" if j else "") for tid, j in zip(travel["TRAVELER_ID"], nth)]
+    tables["여행"] = pd.concat([travel, _sample_attributes(entry, len(travel), rng)], axis=1)
+
+    entry = model["방문지정보"]
+    counts = rng.choice(entry["child_counts"], size=len(travel))
+    visits = _expand_parents(travel[["TRAVEL_ID"]], counts)
+    visits["VISIT_AREA_ID"] = np.arange(visit_offset, visit_offset + len(visits), dtype=np.int64)
+    visits["VISIT_ORDER"] = visits.groupby("TRAVEL_ID").cumcount() + 1
+    tables["방문지정보"] = pd.concat([visits, _sample_attributes(entry, len(visits), rng)], axis=1)
+
+    entry = model["활동내역"]
+    counts = rng.choice(entry["child_counts"], size=len(visits))
+    history = _expand_parents(visits[["TRAVEL_ID", "VISIT_AREA_ID"]], counts)
+    history = pd.concat([history, _sample_attributes(entry, len(history), rng)], axis=1)
+    seq_keys = ["VISIT_AREA_ID", "ACTIVITY_TYPE_CD"] if "ACTIVITY_TYPE_CD" in history.columns else ["VISIT_AREA_ID"]
+    history["ACTIVITY_TYPE_SEQ"] = history.groupby(seq_keys, dropna=False).cumcount() + entry.get("seq_start", 0)
+    tables["활동내역"] = history
+
+    entry = model["활동소비내역"]
+    link = [c for c in TABLE_TREE["활동소비내역"]["link"] if c in history.columns]
+    counts = rng.choice(entry["child_counts"], size=len(history))
+    consumption = _expand_parents(history[link], counts)
+    tables["활동소비내역"] = pd.concat([consumption, _sample_attributes(entry, len(consumption), rng)], axis=1)
+
+    entry = model["숙박소비내역"]
+    counts = rng.choice(entry["child_counts"], size=len(travel))
+    lodging = _expand_parents(travel[["TRAVEL_ID"]], counts)
+    lodging["LODGING_PAYMENT_SEQ"] = lodging.groupby("TRAVEL_ID").cumcount() + entry.get("seq_start", 1)
+    tables["숙박소비내역"] = pd.concat([lodging, _sample_attributes(entry, len(lodging), rng)], axis=1)
+
+    # 원본과 같은 컬럼 순서로 정렬
+    for key, df in tables.items():
+        tables[key] = df[[c for c in model[key]["columns"] if c in df.columns]]
+    return tables, len(visits)
+
+
+def generate_synthetic_dataset(
+    source_mode="training",
+    source_year="2022",
+    mode="synthetic",
+    year="2022",
+    n_travellers=100_000,
+    chunk_travellers=50_000,
+    seed=42,
+):
+    """Learn from ``source_mode/source_year`` and write ``n_travellers`` synthetic travellers.
+
+    Tables are written to ``data/<mode>/<year>/TL_csv`` chunk by chunk, followed by the
+    ``file_dir.json`` (``file_dir_validation.json`` for mode "validation"). Returns
+    ``{dataset key: (path, rows)}``.
+    """
+    tables = load_source_tables(mode=source_mode, year=source_year)
+    model = fit_synthetic_model(tables)
+    del tables
+
+    rng = np.random.default_rng(seed)
+    out_dir = os.path.join(pp._project_root, "data", mode, year, "TL_csv")
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {key: os.path.join(out_dir, DEFAULT_FILE_NAMES[key]) for key in TABLE_TREE}
+    rows = {key: 0 for key in TABLE_TREE}
+
+    visit_offset = int(f"9{year[-2:]}0000000") if year[-2:].isdigit() else 9_000_000_000
+    done = 0
+    while done < n_travellers:
+        size = min(chunk_travellers, n_travellers - done)
+        chunk, n_visits = generate_chunk(model, size, rng, traveller_offset=done, visit_offset=visit_offset)
+        for key, df in chunk.items():
+            df.to_csv(paths[key], mode="w" if done == 0 else "a", header=done == 0, index=False)
+            rows[key] += len(df)
+        done += size
+        visit_offset += n_visits
+        print(f"  generated {done:,}/{n_travellers:,} travellers")
+
+    file_name = "file_dir_validation.json" if mode == "validation" else "file_dir.json"
+    file_dir = {key: os.path.relpath(path, pp._project_root).replace(os.sep, "/") for key, path in paths.items()}
+    with open(os.path.join(pp._project_root, "data", mode, year, file_name), "w", encoding="utf-8") as handle:
+        json.dump(file_dir, handle, ensure_ascii=False, indent=2)
+    # 같은 프로세스에서 바로 전처리할 수 있도록 파일 맵/원본 캐시를 비웁니다.
+    pp._file_map_cache.pop(f"{mode}_{year}", None)
+    pp.clear_dataset_cache(mode=mode, year=year)
+    return {key: (paths[key], rows[key]) for key in TABLE_TREE}
+
+
+def add_synthetic_arguments(parser):
+    """Register the generator options on an argparse parser (shared with main.py)."""
+    parser.add_argument("--source-mode", default="training", help="Mode directory to learn from.")
+    parser.add_argument("--source-year", default="2022", help="Year to learn from.")
+    parser.add_argument("--out-mode", default="synthetic", help="Output mode directory under data/.")
+    parser.add_argument("--out-year", default="2022", help="Output year directory.")
+    parser.add_argument("--travellers", type=int, default=100_000, help="Number of travellers to generate.")
+    parser.add_argument("--chunk", type=int, default=50_000, help="Travellers generated per chunk.")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser
+
+
+def run_from_args(args):
+    result = generate_synthetic_dataset(
+        source_mode=args.source_mode, source_year=args.source_year, mode=args.out_mode, year=args.out_year,
+        n_travellers=args.travellers, chunk_travellers=args.chunk, seed=args.seed,
+    )
+    for key, (path, n) in result.items():
+        print(f"  - {key}: {n:,} rows -> {path}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = add_synthetic_arguments(argparse.ArgumentParser(description="Generate a synthetic TL_csv drop for scale testing."))
+    run_from_args(parser.parse_args())
@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
 import pathlib
 import joblib
 import time
@@ -9,8 +8,11 @@ import os
 #------------------------------
 # 커스텀 모듈 & 경로
 #------------------------------
-from utils.loader import load_css, img_to_base64, render_clouds, render_image, render_season_clouds
+from utils.loader import load_css, img_to_base64, render_audio, render_clouds, render_image, render_season_clouds
 from utils.services import *
+from utils.metrics import render_metrics_sidebar, track_render
+from utils.gauge import render_gauge
+from utils.cohort import get_cohort_cube, lookup_cohort
 BASE_DIR = pathlib.Path(__file__).resolve().parent
 STYLE_DIR = BASE_DIR / "style"
 ASSETS_DIR = BASE_DIR / "assets" / "img"
@@ -22,6 +24,18 @@ MODEL_PATH = BASE_DIR / "models"
 #------------------------------
 st.set_page_config(page_title="One Trip, Two Fates", page_icon="✈️", layout="centered")
 
+@st.cache_resource
+def warm_up():
+    """서버 프로세스당 한 번: 모든 모델을 get_model 캐시에 올리고 첫 예측까지 실행"""
+    model_paths = {key: MODEL_PATH/file_name for key, file_name in MODEL_FILES.items()}
+    stats = warm_up_models(model_paths, loader=get_model)
+    for key, path in model_paths.items():
+        if MODEL_FEATURES[key] == LITE_FEATURES:
+            get_lookup_table(path)
+    return stats
+
+warm_up()
+
 if "page" not in st.session_state:
     st.session_state.page = "intro"
 if "result" not in st.session_state:
@@ -76,7 +90,7 @@ def form_page():
                 """, unsafe_allow_html=True)
     
     # OTTF 배경음악 
-    st.audio(str(AUDIO_DIR/"OTTF_INTRO_V2.wav"), format="audio/wav", start_time=0, autoplay=False)
+    render_audio(AUDIO_DIR/"OTTF_INTRO_V2.wav", start_time=0, autoplay=False)
     
     st.session_state.setdefault("show_form", False)
     if not st.session_state.show_form:
@@ -111,10 +125,8 @@ def form_page():
     st.session_state.setdefault("act_ui", "🍽️ 맛집 탐방")
     
     # -- 모델버전선택 -------------------------
-    model_versions = {
-            "model_v1": MODEL_PATH/"catboost_best_model_lite.joblib",
-            "model_v2": MODEL_PATH/"catboost_best_model_lite_v2.joblib",
-        }
+    # 선택한 모델에 따라 입력 항목 구성이 바뀌므로 이 위젯만 전체 rerun 합니다.
+    model_versions = {key: MODEL_PATH/file_name for key, file_name in MODEL_FILES.items()}
     default_version = "model_v1"
 
     PLAN_CHOICES = ["간단한계획", "꼼꼼한계획"]
@@ -138,132 +150,31 @@ def form_page():
     model_path = model_versions[model_choice]
     input_features = MODEL_FEATURES[model_choice]
 
-    # -- 여행계절 -------------------------
-    default_bg = str(ASSETS_DIR / "cloudy.png")      
-    season = None
-    if "SEASON" in input_features:
-        season = st.radio(
-            "여행 계절",
-            ["봄", "여름", "가을", "겨울"],
-            horizontal=True,
-            key="season_ui"
-        )
-
-        if season:
-            render_season_clouds(
-                season=season,
-                count=5, top_range=(5, 80), size_range=(120, 240)
-            )
+    # -- 입력 항목 (fragment) -------------------------
+    # 각 위젯 묶음은 fragment 라서 값을 바꾸면 해당 묶음만 다시 실행됩니다.
+    # (CSS/구름/오디오/나머지 폼은 다시 그리지 않음) 입력 정보 카드는 아래 preview_slot 을 제자리에서 갱신합니다.
+    inputs_area = st.container()
+    preview_slot = st.empty()
+    st.session_state["_preview_deferred"] = True  # 전체 실행 중에는 마지막에 한 번만 그림
+    with inputs_area:
+        if "SEASON" in input_features:
+            season_fragment(input_features, preview_slot)
         else:
-            render_clouds(default_bg, count=5, top_range=(5, 80), size_range=(120, 240))
-    else:
-        render_clouds(default_bg, count=5, top_range=(5, 80), size_range=(120, 240))
-
-    # -- 성별&연령대 -------------------------
-    gender = st.radio(
-        "당신의 성별은 무엇인가요?",
-        ["남", "여"],
-        horizontal=True,
-        key="gender"
-    )
-    age_grp = st.radio(
-        "당신의 연령대를 선택해주세요.",
-        ["10대", "20대", "30대", "40대", "50대 이상"],
-        horizontal=True,
-        key="age_grp"
-    )
-
-    # -- 여행기간 -------------------------
-    trip_option = st.radio(
-        "여행기간은 얼마나 되나요?"
-        , ["당일치기", "1박 2일", "2박 3일", "3박 4일", "장기 여행 (직접 입력)"]
-        , horizontal=True
-        , key="trip_option"
-    )
-
-    if trip_option == "장기 여행 (직접 입력)":
-        trip_days_long = st.slider(
-            "여행 일수를 선택하세요(5~30일)",
-            min_value=5, max_value=30, step=1, key="trip_days_long"
-        )
-        trip_days = int(trip_days_long)
-    else:
-        trip_map = {"당일치기": 1, "1박 2일": 2, "2박 3일": 3, "3박 4일": 4}
-        trip_days = trip_map[trip_option]
-
-    # -- 동반인원 -------------------------
-    companions_num = None
-    if "TRAVEL_COMPANIONS_NUM" in input_features:
-        companions_num = st.slider(
-            "동반 인원수(본인 제외)",
-            min_value=0, max_value=10, value=0, step=1, key="companions_num_ui"
-        )
-
-    # -- 활동유형 -------------------------
-    ACT_UI_LABELS = {
-        "🍽️ 맛집 탐방": "취식",
-        "🛍️ 쇼핑 여행": "쇼핑",
-        "🎨 체험 액티비티": "체험",
-        "🚶 걷기/투어": "산책",
-        "🛌 힐링 여행": "휴식",
-        "🗂 기타 활동": "기타",
-        "🚌 이동이 많은 여행": "이동",
-        "❌ 계획 없음": "없음",
-    }
-
-    ui_keys = list(ACT_UI_LABELS.keys())
-    act_ui = st.radio(
-        "이번 여행에서 가장 많이 할 활동을 선택해주세요."
-        , ui_keys
-        , horizontal=True
-        , key="act_ui"
-    )
-    act_type = ACT_UI_LABELS[act_ui]
-    
-    # -- 소비성향 -------------------------
-    payment_persona = None
-    if "payment_persona" in input_features:
-        payment_persona = st.radio(
-            "소비 성향",
-            ["낮음(low)", "중간(med)", "높음(high)"],
-            horizontal=True,
-            key="payment_persona_ui"
-        )
-
-        if payment_persona:
-            if "low" in payment_persona: payment_persona = "low"
-            elif "high" in payment_persona: payment_persona = "high"
-            else: payment_persona = "med"
-
-    # -- 입력정보확인 -------------------------
-    def nights_days_label(days: int) -> str:
-        if days <= 1: return "당일치기 (1일)"
-        return f"{days-1}박 {days}일"
-    
-    extra_bits = []
-    if "payment_persona" in input_features and payment_persona:
-        extra_bits.append(f"소비성향: {payment_persona}")
-
-    if "TRAVEL_COMPANIONS_NUM" in input_features and companions_num is not None:
-        extra_bits.append(f"동반인원: {companions_num}명")
-
-    if "SEASON" in input_features and season:
-        extra_bits.append(f"계절: {season}")
-    
-    extra_text = (" | " + " | ".join(extra_bits)) if extra_bits else ""
-
-    st.markdown(
-        f"""
-        <div class="form-preview-card">
-            <b>입력 정보 확인</b><br>
-            성별: {gender} | 연령대: {age_grp} | 여행기간: {nights_days_label(trip_days)} | 활동: {act_ui}{extra_text}
-        </div>
-        """, unsafe_allow_html=True
-    )
+            render_clouds(str(ASSETS_DIR / "cloudy.png"), count=5, top_range=(5, 80), size_range=(120, 240))
+        profile_fragment(input_features, preview_slot)
+        trip_fragment(input_features, preview_slot)
+        if "TRAVEL_COMPANIONS_NUM" in input_features:
+            companions_fragment(input_features, preview_slot)
+        activity_fragment(input_features, preview_slot)
+        if "payment_persona" in input_features:
+            payment_fragment(input_features, preview_slot)
+    st.session_state["_preview_deferred"] = False
+    render_preview(input_features, preview_slot)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
     # -- 입력값 제출 -------------------------
+    # 페이지 이동/제출 버튼은 fragment 밖에 두어 여기서만 전체 rerun 이 일어납니다.
     col1, col2, col3 = st.columns([1, 1, 1])
     with col1:
         if st.button("처음으로", key="back_to_intro", use_container_width=True):
@@ -283,30 +194,201 @@ def form_page():
         if model is None:
             st.error("Opps! 잠시 후 다시 시도해주세요.")
         
+        inputs = collect_form_inputs(input_features)
         X = build_input_df_dynamic(
             input_features,
-            trip_days=trip_days,
-            gender=st.session_state.gender,
-            age_grp=st.session_state.age_grp,
-            activity_type_cd=act_type,
-            payment_persona=payment_persona,
-            companions_num=companions_num,
-            season=season,
+            trip_days=inputs["trip_days"],
+            gender=inputs["gender"],
+            age_grp=inputs["age_grp"],
+            activity_type_cd=inputs["act_type"],
+            payment_persona=inputs["payment_persona"],
+            companions_num=inputs["companions_num"],
+            season=inputs["season"],
         )
 
-        proba = float(model.predict_proba(X)[:, 1][0])
+        if input_features == LITE_FEATURES:
+            # 간단한계획: 사전 계산된 룩업 테이블에서 조회 (격자 밖 입력만 모델 예측)
+            proba = float(predict_with_lookup(model, X, get_lookup_table(model_path))[0])
+        else:
+            proba = float(model.predict_proba(X)[:, 1][0])
         print(proba)
 
         st.session_state.result = proba
+        st.session_state.result_input = X  # 결과 페이지의 플랜 B 스윕에서 재사용
+        st.session_state.result_model = model_choice
         st.session_state.page = "result"
 
+#------------------------------
+# 입력 폼 fragment
+# - 위젯 값은 key 로 session_state 에 남으므로, 제출 시 collect_form_inputs 로 한 번에 읽습니다.
+#------------------------------
+ACT_UI_LABELS = {
+    "🍽️ 맛집 탐방": "취식",
+    "🛍️ 쇼핑 여행": "쇼핑",
+    "🎨 체험 액티비티": "체험",
+    "🚶 걷기/투어": "산책",
+    "🛌 힐링 여행": "휴식",
+    "🗂 기타 활동": "기타",
+    "🚌 이동이 많은 여행": "이동",
+    "❌ 계획 없음": "없음",
+}
+# 활동코드 → 화면 라벨 (플랜 B 표시용)
+ACT_CODE_TO_UI = {ACT_LABEL_TO_CODE[label]: ui for ui, label in ACT_UI_LABELS.items()}
+TRIP_OPTION_DAYS = {"당일치기": 1, "1박 2일": 2, "2박 3일": 3, "3박 4일": 4}
+LONG_TRIP_OPTION = "장기 여행 (직접 입력)"
+
+def collect_form_inputs(input_features) -> dict:
+    """session_state 의 위젯 값 → 모델 입력값 (모델에 없는 항목은 None)"""
+    state = st.session_state
+    if state.trip_option == LONG_TRIP_OPTION:
+        trip_days = int(state.trip_days_long)
+    else:
+        trip_days = TRIP_OPTION_DAYS[state.trip_option]
+
+    payment_persona = None
+    if "payment_persona" in input_features and state.get("payment_persona_ui"):
+        if "low" in state.payment_persona_ui: payment_persona = "low"
+        elif "high" in state.payment_persona_ui: payment_persona = "high"
+        else: payment_persona = "med"
+
+    return {
+        "gender": state.gender,
+        "age_grp": state.age_grp,
+        "trip_days": trip_days,
+        "act_ui": state.act_ui,
+        "act_type": ACT_UI_LABELS[state.act_ui],
+        "payment_persona": payment_persona,
+        "companions_num": state.get("companions_num_ui") if "TRAVEL_COMPANIONS_NUM" in input_features else None,
+        "season": state.get("season_ui") if "SEASON" in input_features else None,
+    }
+
+def nights_days_label(days: int) -> str:
+    if days <= 1: return "당일치기 (1일)"
+    return f"{days-1}박 {days}일"
+
+def render_preview(input_features, preview_slot):
+    """입력 정보 확인 카드를 preview_slot 자리에 다시 그림"""
+    inputs = collect_form_inputs(input_features)
+    extra_bits = []
+    if inputs["payment_persona"]:
+        extra_bits.append(f"소비성향: {inputs['payment_persona']}")
+
+    if inputs["companions_num"] is not None:
+        extra_bits.append(f"동반인원: {inputs['companions_num']}명")
+
+    if inputs["season"]:
+        extra_bits.append(f"계절: {inputs['season']}")
+    
+    extra_text = (" | " + " | ".join(extra_bits)) if extra_bits else ""
+
+    preview_slot.markdown(
+        f"""
+        <div class="form-preview-card">
+            <b>입력 정보 확인</b><br>
+            성별: {inputs['gender']} | 연령대: {inputs['age_grp']} | 여행기간: {nights_days_label(inputs['trip_days'])} | 활동: {inputs['act_ui']}{extra_text}
+        </div>
+        """, unsafe_allow_html=True
+    )
+
+def refresh_preview(input_features, preview_slot):
+    # fragment 단독 재실행일 때만 카드 갱신 (전체 실행 중에는 form_page 가 마지막에 그림)
+    if not st.session_state.get("_preview_deferred"):
+        render_preview(input_features, preview_slot)
+
+# -- 여행계절 -------------------------
+@st.fragment
+def season_fragment(input_features, preview_slot):
+    with track_render("form.season", fragment=True):
+        st.session_state.setdefault("season_ui", "봄")
+        season = st.radio(
+            "여행 계절",
+            ["봄", "여름", "가을", "겨울"],
+            horizontal=True,
+            key="season_ui"
+        )
+        render_season_clouds(
+            season=season,
+            count=5, top_range=(5, 80), size_range=(120, 240)
+        )
+        refresh_preview(input_features, preview_slot)
+
+# -- 성별&연령대 -------------------------
+@st.fragment
+def profile_fragment(input_features, preview_slot):
+    with track_render("form.profile", fragment=True):
+        st.radio(
+            "당신의 성별은 무엇인가요?",
+            ["남", "여"],
+            horizontal=True,
+            key="gender"
+        )
+        st.radio(
+            "당신의 연령대를 선택해주세요.",
+            ["10대", "20대", "30대", "40대", "50대 이상"],
+            horizontal=True,
+            key="age_grp"
+        )
+        refresh_preview(input_features, preview_slot)
+
+# -- 여행기간 -------------------------
+@st.fragment
+def trip_fragment(input_features, preview_slot):
+    with track_render("form.trip", fragment=True):
+        trip_option = st.radio(
+            "여행기간은 얼마나 되나요?"
+            , list(TRIP_OPTION_DAYS) + [LONG_TRIP_OPTION]
+            , horizontal=True
+            , key="trip_option"
+        )
+        if trip_option == LONG_TRIP_OPTION:
+            st.slider(
+                "여행 일수를 선택하세요(5~30일)",
+                min_value=5, max_value=30, step=1, key="trip_days_long"
+            )
+        refresh_preview(input_features, preview_slot)
+
+# -- 동반인원 -------------------------
+@st.fragment
+def companions_fragment(input_features, preview_slot):
+    with track_render("form.companions", fragment=True):
+        st.session_state.setdefault("companions_num_ui", 0)
+        st.slider(
+            "동반 인원수(본인 제외)",
+            min_value=0, max_value=10, step=1, key="companions_num_ui"
+        )
+        refresh_preview(input_features, preview_slot)
+
+# -- 활동유형 -------------------------
+@st.fragment
+def activity_fragment(input_features, preview_slot):
+    with track_render("form.activity", fragment=True):
+        st.radio(
+            "이번 여행에서 가장 많이 할 활동을 선택해주세요."
+            , list(ACT_UI_LABELS)
+            , horizontal=True
+            , key="act_ui"
+        )
+        refresh_preview(input_features, preview_slot)
+
+# -- 소비성향 -------------------------
+@st.fragment
+def payment_fragment(input_features, preview_slot):
+    with track_render("form.payment", fragment=True):
+        st.session_state.setdefault("payment_persona_ui", "낮음(low)")
+        st.radio(
+            "소비 성향",
+            ["낮음(low)", "중간(med)", "높음(high)"],
+            horizontal=True,
+            key="payment_persona_ui"
+        )
+        refresh_preview(input_features, preview_slot)
+
 #------------------------------
 # 결과 페이지
 #------------------------------
 def result_page():
 
-    load_css(str(STYLE_DIR / "base.css"))
-    load_css(str(STYLE_DIR / "result.css"))
+    load_css(str(STYLE_DIR / "base.css"), str(STYLE_DIR / "result.css"))
     render_clouds(str(ASSETS_DIR / "cloudy.png"), count=5, top_range=(5, 80), size_range=(120, 240))
 
     st.markdown("<h2 class='intro-title'>여행 운명 결과</h2>", unsafe_allow_html=True)
@@ -315,28 +397,8 @@ def result_page():
     fail_prob = st.session_state.result
     fail_percent = int(fail_prob * 100)
 
-    gauge_color = "#e63946" if fail_percent > 50 else "#06d6a0"
-    fig = go.Figure(
-        go.Indicator(
-            mode="gauge+number",
-            value=fail_percent,
-            title={"text": "망할 확률 (%)"},
-            gauge={
-                "axis": {"range": [0, 100]},
-                "bar": {"color": gauge_color},
-                "steps": [
-                    {"range": [0, 50], "color": "rgba(6,214,160,0.2)"},
-                    {"range": [50, 100], "color": "rgba(230,57,70,0.2)"}
-                ]
-            },
-            number={"suffix": "%"}
-        )
-    )
-    fig.update_layout(
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)"
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    render_gauge(fail_percent)
+    render_cohort(fail_percent)
 
     if fail_percent > 70:
         st.markdown(
@@ -346,7 +408,7 @@ def result_page():
             </div>
             """, unsafe_allow_html=True
         )       
-        st.audio(str(AUDIO_DIR/"king_fail.wav"), format="audio/wav", autoplay=True)
+        render_audio(AUDIO_DIR/"king_fail.wav", autoplay=True)
 
     elif fail_percent > 40:
         st.markdown(
@@ -357,7 +419,7 @@ def result_page():
             </div>
             """, unsafe_allow_html=True
         )
-        st.audio(str(AUDIO_DIR/"fail.wav"), format="audio/wav", autoplay=True)
+        render_audio(AUDIO_DIR/"fail.wav", autoplay=True)
    
     else:
         st.markdown(
@@ -368,8 +430,10 @@ def result_page():
             </div>
             """, unsafe_allow_html=True
         )
-        st.audio(str(AUDIO_DIR/"success.wav"), format="audio/wav", autoplay=True)
+        render_audio(AUDIO_DIR/"success.wav", autoplay=True)
     
+    render_plan_b(fail_percent)
+
     st.markdown("<br>", unsafe_allow_html=True)
 
     col1, _, col3 = st.columns([1, 1, 1])
@@ -380,12 +444,71 @@ def result_page():
         if st.button("다시 시도", key="retry", use_container_width=True):
             st.session_state.page = "form"
 
+# 모집단 큐브 축 → 화면 표기
+COHORT_AXIS_LABELS = {"GENDER": "성별", "AGE_GRP": "연령대", "ACTIVITY_TYPE_CD": "활동", "TRIP_BUCKET": "여행기간", "SEASON": "계절"}
+
+def render_cohort(fail_percent):
+    """모델 확률 옆에 학습 데이터 속 비슷한 여행자의 실제 실패율 표시 (사전 계산 큐브 조회)"""
+    X = st.session_state.get("result_input")
+    if X is None:
+        return
+    cohort = lookup_cohort(get_cohort_cube(), X.iloc[0])
+    if cohort is None:
+        return
+    basis = " · ".join(COHORT_AXIS_LABELS[axis] for axis in cohort["axes"]) or "전체 여행자"
+    st.markdown(
+        f"""
+        <div class="cohort-card">
+            📊 나와 비슷한 여행자 <b>{cohort['count']:,}건</b>의 실제 실패율 <b>{int(cohort['rate'] * 100)}%</b>
+            (모델 예측 {fail_percent}%)<br>
+            <span class="cohort-basis">기준: {basis}</span>
+        </div>
+        """, unsafe_allow_html=True
+    )
+
+def render_plan_b(fail_percent, top_n=5):
+    """제출한 계획을 활동/여행기간(/계절/동반인원)만 바꿔 본 대안 중 실패 확률이 낮은 Top N"""
+    X = st.session_state.get("result_input")
+    model_choice = st.session_state.get("result_model")
+    if X is None or model_choice is None:
+        return
+    model_path = MODEL_PATH / MODEL_FILES[model_choice]
+    input_features = MODEL_FEATURES[model_choice]
+    model = get_model(model_path)
+    if model is None:
+        return
+    table = get_lookup_table(model_path) if input_features == LITE_FEATURES else None
+    plans = sweep_plan_b(model, X, input_features, table=table, top_n=top_n)
+
+    with st.expander("🧭 플랜 B: 더 안전한 여행 계획 보기", expanded=fail_percent > 70):
+        if plans.empty:
+            st.caption("비교할 대안 계획이 없습니다.")
+            return
+        rows = []
+        for plan in plans.itertuples(index=False):
+            plan_percent = int(plan.FAIL_PROBA * 100)
+            row = {
+                "활동": ACT_CODE_TO_UI.get(plan.ACTIVITY_TYPE_CD, plan.ACTIVITY_TYPE_CD),
+                "여행기간": nights_days_label(int(plan.TRIP_DAYS)),
+            }
+            if "SEASON" in plans.columns:
+                row["계절"] = plan.SEASON
+            if "TRAVEL_COMPANIONS_NUM" in plans.columns:
+                row["동반인원"] = f"{plan.TRAVEL_COMPANIONS_NUM}명"
+            row["망할 확률"] = f"{plan_percent}%"
+            row["변화"] = f"{plan_percent - fail_percent:+d}%p"
+            rows.append(row)
+        st.caption("성별·연령대 등 나에 대한 정보는 그대로 두고, 계획만 바꿔 한 번에 예측한 결과입니다.")
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
 #------------------------------
 # 페이지 라우팅
 #------------------------------
-if st.session_state.page == "intro":
-    intro_page()
-elif st.session_state.page == "form":
-    form_page()
-elif st.session_state.page == "result":
-    result_page()
\ No newline at end of file
+render_metrics_sidebar()
+with track_render("app"):
+    if st.session_state.page == "intro":
+        intro_page()
+    elif st.session_state.page == "form":
+        form_page()
+    elif st.session_state.page == "result":
+        result_page()
@@ -0,0 +1,173 @@
+"""
+앱 배포 전 사전 생성 자산(asset) 빌드 스크립트
+
+실행 예시 (streamlit 폴더에서):
+    python build_assets.py lookup            # model_v1 예측 룩업 테이블 생성
+    python build_assets.py lookup --models model_v1 model_v2
+    python build_assets.py warmup            # 모델별 로드 시간/첫 예측 지연 측정
+    python build_assets.py models            # models/*.joblib → CatBoost 네이티브 .cbm 변환
+    python build_assets.py audio             # assets/audio/*.wav → mp3 (ffmpeg 필요)
+    python build_assets.py audio --format ogg --bitrate 48k
+    python build_assets.py cohort            # travel_insight.csv → 비슷한 여행자 실패율 큐브
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import time
+
+import joblib
+import pandas as pd
+
+from utils.cohort import (
+    COHORT_AXES,
+    COHORT_SOURCE_PATH,
+    TRAINING_DIR,
+    build_cohort_cube,
+    dominant_activity,
+    load_activity_history,
+    save_cohort_cube,
+)
+from utils.loader import AUDIO_DIR, AUDIO_MANIFEST_NAME, file_sha1
+from utils.services import (
+    LITE_FEATURES,
+    MODEL_FEATURES,
+    MODEL_DIR,
+    MODEL_FILES,
+    build_lookup_table,
+    get_model_path,
+    get_native_model_path,
+    load_model_file,
+    save_lookup_table,
+    warm_up_models,
+)
+
+
+def build_lookup(models):
+    """LITE_FEATURES 모델마다 입력 격자 전체를 예측해 룩업 테이블로 저장"""
+    for key in models:
+        if MODEL_FEATURES[key] != LITE_FEATURES:
+            print(f"Warning: {key}는 LITE_FEATURES 모델이 아니므로 룩업 테이블을 만들지 않습니다.")
+            continue
+        model_path = get_model_path(key)
+        start = time.perf_counter()
+        model = load_model_file(model_path)
+        proba = build_lookup_table(model)
+        out_path = save_lookup_table(model_path, proba)
+        print(f"  - {key}: {proba.size} combinations -> {out_path} ({time.perf_counter() - start:.2f}s)")
+
+
+def export_models(onnx=False):
+    """models 폴더의 모든 joblib 모델을 CatBoost 네이티브 포맷(.cbm, 선택적으로 .onnx)으로 저장"""
+    for joblib_path in sorted(MODEL_DIR.glob("*.joblib")):
+        model = joblib.load(joblib_path)
+        if not hasattr(model, "save_model"):
+            print(f"Warning: {joblib_path.name}는 CatBoost 모델이 아니므로 건너뜁니다.")
+            continue
+        native_path = get_native_model_path(joblib_path)
+        model.save_model(str(native_path))
+        print(f"  - {joblib_path.name} -> {native_path.name}")
+        if onnx:
+            # ONNX 내보내기는 범주형 피처(cat_features)가 있는 모델을 지원하지 않습니다.
+            onnx_path = joblib_path.with_suffix(".onnx")
+            try:
+                model.save_model(str(onnx_path), format="onnx")
+                print(f"  - {joblib_path.name} -> {onnx_path.name}")
+            except Exception as e:
+                onnx_path.unlink(missing_ok=True)  # 실패 시 남는 불완전한 파일 제거
+                print(f"Warning: ONNX 내보내기 실패 ({joblib_path.name}): {e}")
+
+
+# 출력 포맷별 ffmpeg 인코더
+AUDIO_CODECS = {"mp3": "libmp3lame", "ogg": "libopus"}
+
+
+def build_audio(fmt="mp3", bitrate="64k"):
+    """assets/audio 의 wav 를 압축 포맷으로 변환하고 원본 해시를 manifest.json 에 기록"""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        print("Warning: ffmpeg를 찾을 수 없어 오디오 변환을 건너뜁니다. (PATH에 ffmpeg 설치 필요)")
+        return
+    manifest = {}
+    for wav_path in sorted(AUDIO_DIR.glob("*.wav")):
+        out_path = wav_path.with_suffix(f".{fmt}")
+        command = [
+            ffmpeg, "-y", "-loglevel", "error", "-i", str(wav_path),
+            "-vn", "-map_metadata", "-1", "-c:a", AUDIO_CODECS[fmt], "-b:a", bitrate, str(out_path),
+        ]
+        try:
+            subprocess.run(command, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            out_path.unlink(missing_ok=True)  # 실패 시 남는 불완전한 파일 제거
+            print(f"Warning: 오디오 변환 실패 ({wav_path.name}): {e.stderr.strip()}")
+            continue
+        manifest[wav_path.name] = {
+            "file": out_path.name,
+            "bitrate": bitrate,
+            "source_sha1": file_sha1(wav_path),
+        }
+        before, after = wav_path.stat().st_size, out_path.stat().st_size
+        print(f"  - {wav_path.name} -> {out_path.name} ({before / 1024:.0f} KB -> {after / 1024:.0f} KB)")
+    with open(AUDIO_DIR / AUDIO_MANIFEST_NAME, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, ensure_ascii=False, indent=2)
+
+
+def build_cohort(source=COHORT_SOURCE_PATH, training_dir=TRAINING_DIR):
+    """학습 데이터의 실패율/건수를 모든 축 조합과 롤업까지 미리 집계해 저장"""
+    start = time.perf_counter()
+    travel = pd.read_csv(source, low_memory=False)
+    activity = dominant_activity(load_activity_history(training_dir))
+    missing = (~travel["TRAVEL_ID"].isin(activity.index)).sum()
+    if missing:
+        print(f"Warning: {missing}건의 여행은 activity_history 가 없어 주 활동을 '없음'(99)으로 둡니다.")
+    failed, count = build_cohort_cube(travel, activity)
+    out_path = save_cohort_cube(failed, count, source_path=source)
+    print(f"  - {len(travel)} trips x {len(COHORT_AXES)} axes -> {count.size} cells -> {out_path} "
+          f"({out_path.stat().st_size / 1024:.1f} KB, {time.perf_counter() - start:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build precomputed assets for the Streamlit app.")
+    subparsers = parser.add_subparsers(dest="task", required=True)
+
+    p_lookup = subparsers.add_parser("lookup", help="Precompute the prediction lookup table for LITE_FEATURES models.")
+    p_lookup.add_argument("--models", nargs="+", default=["model_v1"], choices=list(MODEL_FILES),
+                          help="룩업 테이블을 만들 모델 버전 (기본: model_v1)")
+
+    p_warmup = subparsers.add_parser("warmup", help="Load every model once and report load / first-predict latency.")
+    p_warmup.add_argument("--models", nargs="+", default=list(MODEL_FILES), choices=list(MODEL_FILES),
+                          help="측정할 모델 버전 (기본: 전체)")
+
+    p_models = subparsers.add_parser("models", help="Export every models/*.joblib to CatBoost's native .cbm format.")
+    p_models.add_argument("--onnx", action="store_true", help="ONNX 포맷도 함께 내보내기 (범주형 피처가 없는 모델만)")
+
+    p_audio = subparsers.add_parser("audio", help="Transcode assets/audio/*.wav to a compressed format with ffmpeg.")
+    p_audio.add_argument("--format", dest="fmt", choices=list(AUDIO_CODECS), default="mp3",
+                         help="출력 포맷 (기본: mp3, 모든 브라우저에서 재생 가능)")
+    p_audio.add_argument("--bitrate", default="64k", help="ffmpeg 오디오 비트레이트 (기본: 64k)")
+
+    p_cohort = subparsers.add_parser("cohort", help="Precompute empirical failure rates per traveller cohort.")
+    p_cohort.add_argument("--source", default=str(COHORT_SOURCE_PATH), help="집계할 학습 데이터 (기본: data/training/final/travel_insight.csv)")
+    p_cohort.add_argument("--training-dir", default=str(TRAINING_DIR), help="연도별 activity_history 를 찾을 폴더")
+
+    args = parser.parse_args()
+
+    if args.task == "lookup":
+        print("Building prediction lookup tables...")
+        build_lookup(args.models)
+    elif args.task == "warmup":
+        print("Warming up models...")
+        warm_up_models({key: get_model_path(key) for key in args.models})
+    elif args.task == "models":
+        print("Exporting native CatBoost models...")
+        export_models(onnx=args.onnx)
+    elif args.task == "audio":
+        print("Transcoding audio assets...")
+        build_audio(fmt=args.fmt, bitrate=args.bitrate)
+    elif args.task == "cohort":
+        print("Building traveller cohort cube...")
+        build_cohort(source=args.source, training_dir=args.training_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+One Trip, Two Fates 예측 서버
+- MODEL_FEATURES 에 등록된 모델을 한 번만 로드하고 HTTP로 예측을 제공합니다.
+- 동시에 들어온 요청은 짧은 시간 창(window) 안에서 모아 한 번의 predict_proba 로 처리합니다.
+
+실행 예시 (streamlit 폴더에서):
+    python predict_server.py --port 8502 --window-ms 5 --max-batch 256
+
+POST /predict
+    {"model": "model_v1", "inputs": {"trip_days": 3, "gender": "여", "age_grp": "20대", "activity_type_cd": "쇼핑"}}
+    {"model": "model_v2", "inputs": [{...}, {...}], "threshold": 0.5}
+GET /health
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from utils.services import (
+    MODEL_FEATURES,
+    MODEL_FILES,
+    build_input_df_dynamic,
+    get_model_path,
+    load_model_file,
+)
+
+# build_input_df_dynamic 이 받는 입력 키
+INPUT_KEYS = [
+    "trip_days", "gender", "age_grp", "activity_type_cd",
+    "payment_persona", "companions_num", "season",
+]
+
+
+class MicroBatcher:
+    """
+    모델 하나에 대한 마이크로 배치 처리기
+    - submit() 으로 들어온 입력 DataFrame 들을 window_ms 동안(또는 max_batch 행까지) 모아
+      한 번의 predict_proba 로 계산한 뒤 각 요청에 결과를 나눠 돌려줍니다.
+    """
+
+    def __init__(self, model, features, window_ms=5.0, max_batch=256):
+        self.model = model
+        self.features = features
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.rows = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, X: pd.DataFrame) -> Future:
+        future = Future()
+        self.requests.put((X, future))
+        return future
+
+    def _collect(self):
+        """첫 요청을 기다린 뒤 시간 창이 끝나거나 max_batch 에 도달할 때까지 요청을 모읍니다."""
+        batch = [self.requests.get()]
+        n_rows = len(batch[0][0])
+        deadline = time.perf_counter() + self.window
+        while n_rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                X = pd.concat([X for X, _ in batch], ignore_index=True)
+                proba = np.asarray(self.model.predict_proba(X[self.features])[:, 1], dtype=float)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(X)
+            # 요청별로 결과 분배
+            start = 0
+            for X_part, future in batch:
+                end = start + len(X_part)
+                future.set_result(proba[start:end])
+                start = end
+
+
+def parse_inputs(features, inputs):
+    """JSON 입력(dict 또는 dict 리스트) → 모델 입력 DataFrame"""
+    records = [inputs] if isinstance(inputs, dict) else list(inputs)
+    if not records:
+        raise ValueError("inputs 가 비어 있습니다.")
+    columns = {key: [record.get(key) for record in records] for key in INPUT_KEYS}
+    # 누락된 값은 정규화 함수의 기본값을 사용 (여행일수만 기본 1일로 채움)
+    columns["trip_days"] = [1 if v is None else v for v in columns["trip_days"]]
+    return build_input_df_dynamic(features, **columns)
+
+
+class PredictServer(ThreadingHTTPServer):
+    # 동시 접속이 몰려도 연결이 거절되지 않도록 listen 대기열을 늘림 (기본 5)
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def make_handler(batchers, timeout=10.0):
+    class PredictHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self._send_json(404, {"error": "not found"})
+                return
+            self._send_json(200, {
+                "status": "ok",
+                "models": {
+                    key: {"batches": b.batches, "rows": b.rows}
+                    for key, b in batchers.items()
+                },
+            })
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                model_key = payload.get("model", "model_v1")
+                if model_key not in batchers:
+                    raise ValueError(f"알 수 없는 모델입니다: {model_key}")
+                threshold = float(payload.get("threshold", 0.5))
+                X = parse_inputs(MODEL_FEATURES[model_key], payload.get("inputs", {}))
+            except Exception as e:
+                self._send_json(400, {"error": str(e)})
+                return
+
+            try:
+                proba = batchers[model_key].submit(X).result(timeout=timeout)
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+                return
+
+            self._send_json(200, {
+                "model": model_key,
+                "predictions": [
+                    {"class_1_proba": float(p), "pred_label": int(p >= threshold)}
+                    for p in proba
+                ],
+            })
+
+        def log_message(self, format, *args):
+            # 요청마다 출력하지 않음
+            pass
+
+    return PredictHandler
+
+
+def load_batchers(models, window_ms, max_batch):
+    """모델을 한 번씩 로드하고 모델별 MicroBatcher 를 생성합니다."""
+    batchers = {}
+    for key in models:
+        path = get_model_path(key)
+        start = time.perf_counter()
+        try:
+            model = load_model_file(path)
+        except Exception as e:
+            print(f"Warning: 모델 로드 실패 ({key}, {path}): {e}")
+            continue
+        print(f"  - {key}: {path.name} ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        batchers[key] = MicroBatcher(model, MODEL_FEATURES[key], window_ms=window_ms, max_batch=max_batch)
+    return batchers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="One Trip, Two Fates prediction server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--models", nargs="+", default=list(MODEL_FILES), choices=list(MODEL_FILES),
+                        help="로드할 모델 버전 (기본: 전체)")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="마이크로 배치 수집 시간 창 (ms)")
+    parser.add_argument("--max-batch", type=int, default=256, help="한 번에 예측할 최대 행 수")
+    parser.add_argument("--timeout", type=float, default=10.0, help="요청당 예측 대기 시간 (초)")
+    args = parser.parse_args()
+
+    print("Loading models...")
+    batchers = load_batchers(args.models, args.window_ms, args.max_batch)
+    if not batchers:
+        raise SystemExit("로드된 모델이 없습니다.")
+
+    server = PredictServer((args.host, args.port), make_handler(batchers, timeout=args.timeout))
+    print(f"Serving on http://{args.host}:{args.port} (window={args.window_ms}ms, max_batch={args.max_batch})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
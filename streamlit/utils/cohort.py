@@ -0,0 +1,204 @@
+import hashlib
+import itertools
+import pathlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.services import LOOKUP_ACTIVITY_CODES, LOOKUP_AGE_GRPS, LOOKUP_GENDERS
+
+# ------------------------------
+# "나와 비슷한 여행자" 모집단 큐브
+# - 학습 데이터(travel_insight.csv)의 실패율/건수를 성별 × 연령대 × 주 활동 × 여행기간 구간 × 계절
+#   모든 칸과, 각 축을 전체(ALL)로 묶은 모든 롤업까지 미리 계산해 npz 한 개로 저장합니다.
+# - build_assets.py cohort 로 생성하고, 앱은 배열 인덱싱만으로 조회합니다. (요청 시 CSV 를 읽지 않음)
+# ------------------------------
+BASE_DIR = pathlib.Path(__file__).resolve().parent.parent
+COHORT_CUBE_PATH = BASE_DIR / "assets" / "cohort_cube.npz"
+TRAINING_DIR = BASE_DIR.parent / "data" / "training"
+COHORT_SOURCE_PATH = TRAINING_DIR / "final" / "travel_insight.csv"
+
+COHORT_TRIP_BUCKETS = ["1일", "2일", "3일", "4일", "5일 이상"]
+COHORT_SEASONS = ["봄", "여름", "가을", "겨울"]
+# 축 순서 = 큐브 배열의 차원 순서. 각 축의 마지막 칸(len(values))이 전체(ALL) 롤업입니다.
+COHORT_AXES = {
+    "GENDER": LOOKUP_GENDERS,
+    "AGE_GRP": LOOKUP_AGE_GRPS,
+    "ACTIVITY_TYPE_CD": LOOKUP_ACTIVITY_CODES,
+    "TRIP_BUCKET": COHORT_TRIP_BUCKETS,
+    "SEASON": COHORT_SEASONS,
+}
+# 표본이 작을 때 전체로 묶어 나갈 축 순서 (덜 중요한 조건부터)
+COHORT_BACKOFF = ["SEASON", "TRIP_BUCKET", "ACTIVITY_TYPE_CD", "AGE_GRP", "GENDER"]
+MIN_COHORT_SIZE = 30
+
+_SEASON_COLUMNS = {"SEASON_Spring": "봄", "SEASON_Summer": "여름", "SEASON_Fall": "가을"}
+
+
+def trip_bucket_index(trip_days) -> int:
+    """여행일수 → 구간 위치 (1~4일은 그대로, 5일 이상은 한 구간)"""
+    return min(max(int(trip_days), 1), len(COHORT_TRIP_BUCKETS)) - 1
+
+
+def dominant_activity(history: pd.DataFrame) -> pd.Series:
+    """TRAVEL_ID → 가장 많이 한 활동코드 (동률이면 작은 코드)"""
+    history = history.dropna(subset=["TRAVEL_ID", "ACTIVITY_TYPE_CD"])
+    codes = pd.to_numeric(history["ACTIVITY_TYPE_CD"], errors="coerce")
+    counts = (
+        history.assign(ACTIVITY_TYPE_CD=codes).dropna(subset=["ACTIVITY_TYPE_CD"])
+        .groupby(["TRAVEL_ID", "ACTIVITY_TYPE_CD"]).size().reset_index(name="n")
+        .sort_values(["TRAVEL_ID", "n", "ACTIVITY_TYPE_CD"], ascending=[True, False, True])
+        .drop_duplicates("TRAVEL_ID")
+    )
+    return counts.set_index("TRAVEL_ID")["ACTIVITY_TYPE_CD"].astype(int).astype(str)
+
+
+def load_activity_history(training_dir=TRAINING_DIR) -> pd.DataFrame:
+    """연도별 전처리된 activity_history 의 TRAVEL_ID/ACTIVITY_TYPE_CD 만 읽어 합침"""
+    frames = [
+        pd.read_csv(path, usecols=["TRAVEL_ID", "ACTIVITY_TYPE_CD"], low_memory=False)
+        for path in sorted(pathlib.Path(training_dir).glob("*/preprocessing/activity_history.csv"))
+    ]
+    if not frames:
+        print(f"Warning: {training_dir} 에 activity_history.csv 가 없어 주 활동을 모두 '없음'(99)으로 둡니다.")
+        return pd.DataFrame(columns=["TRAVEL_ID", "ACTIVITY_TYPE_CD"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def cohort_codes(travel: pd.DataFrame, activity: pd.Series) -> np.ndarray:
+    """
+    여행 테이블 → 축별 위치 배열 (n_axes, n_rows), 알 수 없는 값은 -1
+    - GENDER 남/여 → 1/2, AGE_GRP 60 이상 → 50 (앱의 '50대 이상')
+    - SEASON 은 원-핫 컬럼에서 복원 (봄/여름/가을이 모두 False 면 겨울, SEASON_nan 이면 -1)
+    """
+    gender = travel["GENDER"].astype(str).str.strip().map({"남": 1, "여": 2, "1": 1, "2": 2, "1.0": 1, "2.0": 2})
+    age = pd.to_numeric(travel["AGE_GRP"], errors="coerce").clip(upper=max(LOOKUP_AGE_GRPS))
+    act = travel["TRAVEL_ID"].map(activity).fillna("99")
+    trip_days = pd.to_numeric(travel["TRAVEL_LENGTH"], errors="coerce")
+
+    season = pd.Series("겨울", index=travel.index, dtype=object)
+    for column, label in _SEASON_COLUMNS.items():
+        if column in travel.columns:
+            season = season.mask(travel[column].astype(bool), label)
+    if "SEASON_nan" in travel.columns:
+        season = season.mask(travel["SEASON_nan"].astype(bool), None)
+
+    def positions(values: pd.Series, axis_values) -> np.ndarray:
+        lookup = {v: i for i, v in enumerate(axis_values)}
+        return np.fromiter((lookup.get(v, -1) for v in values.tolist()), dtype=np.intp, count=len(values))
+
+    bucket = np.where(trip_days.notna(), np.minimum(np.maximum(trip_days.fillna(1), 1), len(COHORT_TRIP_BUCKETS)) - 1, -1)
+    return np.stack([
+        positions(gender, LOOKUP_GENDERS),
+        positions(age, LOOKUP_AGE_GRPS),
+        positions(act, LOOKUP_ACTIVITY_CODES),
+        bucket.astype(np.intp),
+        positions(season, COHORT_SEASONS),
+    ])
+
+
+def build_cohort_cube(travel: pd.DataFrame, activity: pd.Series):
+    """
+    (failed, count) 큐브 계산
+    - 모든 축 부분집합(2^5)마다, 포함한 축의 값이 알려진 행만 모아 해당 칸에 더하고 나머지 축은 ALL 칸에 둡니다.
+    """
+    codes = cohort_codes(travel, activity)
+    failed_flag = pd.to_numeric(travel["IS_FAILED_TRIP"], errors="coerce")
+    valid_target = failed_flag.notna().to_numpy()
+    failed_flag = failed_flag.fillna(0).to_numpy()
+
+    sizes = [len(values) for values in COHORT_AXES.values()]
+    shape = tuple(size + 1 for size in sizes)
+    failed = np.zeros(shape, dtype=np.int32)
+    count = np.zeros(shape, dtype=np.int32)
+    for keep in itertools.product([True, False], repeat=len(sizes)):
+        rows = valid_target.copy()
+        for axis, kept in enumerate(keep):
+            if kept:
+                rows &= codes[axis] >= 0
+        index = tuple(
+            codes[axis][rows] if kept else np.full(rows.sum(), sizes[axis], dtype=np.intp)
+            for axis, kept in enumerate(keep)
+        )
+        np.add.at(count, index, 1)
+        np.add.at(failed, index, failed_flag[rows].astype(np.int32))
+    return failed, count
+
+
+def save_cohort_cube(failed, count, source_path=COHORT_SOURCE_PATH, out_path=COHORT_CUBE_PATH) -> pathlib.Path:
+    """큐브 저장 (원본 CSV 의 sha1 을 함께 기록)"""
+    out_path = pathlib.Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(out_path, failed=failed, count=count, source_sha1=np.array(source_sha1(source_path)))
+    return out_path
+
+
+def source_sha1(source_path=COHORT_SOURCE_PATH) -> str:
+    return hashlib.sha1(pathlib.Path(source_path).read_bytes()).hexdigest()
+
+
+def load_cohort_cube(path=COHORT_CUBE_PATH, source_path=COHORT_SOURCE_PATH):
+    """
+    큐브 로드 (없거나 형태가 맞지 않으면 None)
+    - 원본 CSV 가 있으면 저장된 sha1 과 비교해, 학습 데이터가 바뀐 뒤 만든 큐브가 아니면 경고합니다. (큐브는 그대로 사용)
+    """
+    path = pathlib.Path(path)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as data:
+            failed, count = data["failed"], data["count"]
+            stored_sha1 = str(data["source_sha1"]) if "source_sha1" in data.files else None
+    except Exception as e:
+        print(f"Warning: 모집단 큐브 로드 실패 ({path}): {e}")
+        return None
+    expected = tuple(len(values) + 1 for values in COHORT_AXES.values())
+    if count.shape != expected:
+        print(f"Warning: 모집단 큐브 축이 코드와 맞지 않습니다. 다시 생성하세요: {path}")
+        return None
+    source_path = pathlib.Path(source_path)
+    if source_path.exists() and stored_sha1 != source_sha1(source_path):
+        print(f"Warning: {source_path.name} 가 모집단 큐브를 만든 뒤 바뀌었습니다. "
+              f"'python build_assets.py cohort' 로 다시 생성하세요: {path}")
+    return failed, count
+
+
+@st.cache_resource
+def get_cohort_cube():
+    return load_cohort_cube()
+
+
+def lookup_cohort(cube, row: pd.Series, min_count: int = MIN_COHORT_SIZE):
+    """
+    모델 입력 1행 → 비슷한 여행자의 실제 실패율
+    - 표본이 min_count 보다 작으면 COHORT_BACKOFF 순서로 축을 ALL 로 묶습니다. (최대 6번의 배열 조회)
+    - 반환: {"rate", "count", "axes": 조건으로 남은 축 목록} / 큐브가 없거나 데이터가 없으면 None
+    """
+    if cube is None:
+        return None
+    failed, count = cube
+    age = min(max(int(row["AGE_GRP"]), min(LOOKUP_AGE_GRPS)), max(LOOKUP_AGE_GRPS))
+    values = {
+        "GENDER": row["GENDER"],
+        "AGE_GRP": age - age % 10,
+        "ACTIVITY_TYPE_CD": row["ACTIVITY_TYPE_CD"],
+        "TRIP_BUCKET": COHORT_TRIP_BUCKETS[trip_bucket_index(row["TRIP_DAYS"])],
+        "SEASON": row.get("SEASON"),
+    }
+    index = {}
+    for axis, axis_values in COHORT_AXES.items():
+        value = values[axis]
+        index[axis] = axis_values.index(value) if value in axis_values else len(axis_values)
+
+    for step in range(len(COHORT_BACKOFF) + 1):
+        position = tuple(index.values())
+        n = int(count[position])
+        if n >= min_count or step == len(COHORT_BACKOFF):
+            break
+        axis = COHORT_BACKOFF[step]
+        index[axis] = len(COHORT_AXES[axis])
+    if n == 0:
+        return None
+    axes = [axis for axis, i in index.items() if i < len(COHORT_AXES[axis])]
+    return {"rate": failed[position] / n, "count": n, "axes": axes}
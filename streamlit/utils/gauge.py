@@ -0,0 +1,92 @@
+import os
+from functools import lru_cache
+
+import streamlit as st
+
+# ------------------------------
+# 결과 게이지 렌더러
+# - svg(기본): 퍼센트/색상만 채운 SVG 템플릿. 정수 퍼센트(0~100)별로 문자열을 캐시해 재사용합니다.
+# - plotly: 기존 go.Indicator 게이지 (OTTF_GAUGE=plotly 로 선택)
+# ------------------------------
+GAUGE_RENDERERS = ("svg", "plotly")
+DEFAULT_GAUGE_RENDERER = "svg"
+
+GAUGE_TITLE = "망할 확률 (%)"
+FAIL_COLOR = "#e63946"
+SAFE_COLOR = "#06d6a0"
+
+# 반원(중심 120,135 / 반지름 90)을 pathLength=100 으로 두면 stroke-dasharray 가 곧 퍼센트입니다.
+_SVG_TEMPLATE = """<div class="result-gauge">
+<svg viewBox="0 0 240 170" xmlns="http://www.w3.org/2000/svg" role="img" aria-label="{title} {percent}%">
+  <text x="120" y="16" text-anchor="middle" font-size="14" fill="currentColor">{title}</text>
+  <path d="M 30 135 A 90 90 0 0 1 120 45" fill="none" stroke="rgba(6,214,160,0.2)" stroke-width="26"/>
+  <path d="M 120 45 A 90 90 0 0 1 210 135" fill="none" stroke="rgba(230,57,70,0.2)" stroke-width="26"/>
+  <path d="M 30 135 A 90 90 0 0 1 210 135" fill="none" stroke="{color}" stroke-width="14"
+        pathLength="100" stroke-dasharray="{percent} 100"/>
+  <text x="120" y="130" text-anchor="middle" font-size="36" font-weight="700" fill="currentColor">{percent}%</text>
+  <text x="30" y="160" text-anchor="middle" font-size="11" fill="currentColor" opacity="0.6">0</text>
+  <text x="210" y="160" text-anchor="middle" font-size="11" fill="currentColor" opacity="0.6">100</text>
+</svg>
+</div>"""
+
+
+def gauge_renderer() -> str:
+    """환경변수 OTTF_GAUGE(svg|plotly)로 게이지 렌더러 선택"""
+    renderer = os.environ.get("OTTF_GAUGE", DEFAULT_GAUGE_RENDERER).strip().lower()
+    if renderer not in GAUGE_RENDERERS:
+        print(f"Warning: unknown OTTF_GAUGE '{renderer}', using '{DEFAULT_GAUGE_RENDERER}'. Choose from {GAUGE_RENDERERS}.")
+        return DEFAULT_GAUGE_RENDERER
+    return renderer
+
+
+def gauge_color(percent: int) -> str:
+    return FAIL_COLOR if percent > 50 else SAFE_COLOR
+
+
+def _clamp_percent(percent) -> int:
+    return min(max(int(percent), 0), 100)
+
+
+@lru_cache(maxsize=101)
+def svg_gauge(percent: int) -> str:
+    """퍼센트(0~100) → 게이지 SVG 마크업 (퍼센트별 캐시)"""
+    svg = _SVG_TEMPLATE.format(title=GAUGE_TITLE, percent=percent, color=gauge_color(percent))
+    # 들여쓴 줄이 markdown 코드 블록으로 해석되지 않도록 한 줄로 합칩니다.
+    return " ".join(line.strip() for line in svg.splitlines())
+
+
+def plotly_gauge(percent: int):
+    # plotly 는 이 렌더러를 쓸 때만 import 합니다.
+    import plotly.graph_objects as go
+
+    fig = go.Figure(
+        go.Indicator(
+            mode="gauge+number",
+            value=percent,
+            title={"text": GAUGE_TITLE},
+            gauge={
+                "axis": {"range": [0, 100]},
+                "bar": {"color": gauge_color(percent)},
+                "steps": [
+                    {"range": [0, 50], "color": "rgba(6,214,160,0.2)"},
+                    {"range": [50, 100], "color": "rgba(230,57,70,0.2)"}
+                ]
+            },
+            number={"suffix": "%"}
+        )
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig
+
+
+def render_gauge(percent, renderer=None):
+    """결과 게이지 표시 (renderer 미지정 시 OTTF_GAUGE 설정을 따름)"""
+    percent = _clamp_percent(percent)
+    renderer = renderer or gauge_renderer()
+    if renderer == "svg":
+        st.markdown(svg_gauge(percent), unsafe_allow_html=True)
+    else:
+        st.plotly_chart(plotly_gauge(percent), use_container_width=True)
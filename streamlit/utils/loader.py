@@ -1,24 +1,50 @@
 import random
 import streamlit as st
 from pathlib import Path
+from functools import lru_cache
 import base64
+import hashlib
+import json
+import os
 import streamlit.components.v1 as components
 import pathlib
 
-def load_css(file_name: str):
+# ------------------------------
+# 정적 자산 캐시
+# - (경로, 수정시각) 을 키로 파일 내용/base64 인코딩 결과를 프로세스 메모리에 보관합니다.
+# - 파일이 수정되면 수정시각이 바뀌어 자동으로 다시 읽습니다.
+# ------------------------------
+def _mtime_ns(path) -> int:
+    return os.stat(path).st_mtime_ns
+
+@lru_cache(maxsize=32)
+def _read_text_cached(path: str, mtime_ns: int) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+@lru_cache(maxsize=64)
+def _read_base64_cached(path: str, mtime_ns: int) -> str:
+    return base64.b64encode(Path(path).read_bytes()).decode()
+
+@lru_cache(maxsize=16)
+def _concat_css_cached(paths_and_mtimes: tuple) -> str:
+    return "\n".join(_read_text_cached(path, mtime_ns) for path, mtime_ns in paths_and_mtimes)
+
+def load_css(*file_names: str):
     """
     page에 적용되는 css 로드
+    - 여러 파일을 주면 하나의 <style> 블록으로 합쳐서 출력
     """
-    css_path = Path("style") / file_name
-    
-    with open(css_path, "r", encoding="utf-8") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    css_paths = [str(Path("style") / file_name) for file_name in file_names]
+    css = _concat_css_cached(tuple((path, _mtime_ns(path)) for path in css_paths))
+    st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
 
 def img_to_base64(path: str) -> str:
     """
-    base64로 이미지 변환
+    base64로 이미지 변환 (캐시됨)
     """
-    return base64.b64encode(Path(path).read_bytes()).decode()
+    path = str(path)
+    return _read_base64_cached(path, _mtime_ns(path))
 
 def render_image(image_path: str, css_class: str = "", width=None, alt=None):
     """
@@ -71,8 +97,61 @@ def render_season_clouds(season: str, count=5, top_range=(5, 80), size_range=(12
     path = SEASON_IMAGES[season]
     render_clouds(path, count=count, top_range=top_range, size_range=size_range)
 
-def audio_to_base64(path):
+# ------------------------------
+# 오디오 자산
+# - build_assets.py audio 로 만든 압축 파일(mp3/ogg)이 있으면 원본 wav 대신 사용합니다.
+# - manifest.json 에 기록된 원본 wav 해시가 현재 파일과 다르면 압축본이 오래된 것으로 보고 wav를 씁니다.
+# - 파일 내용(bytes)은 프로세스 메모리에 캐시해 rerun 마다 디스크를 다시 읽지 않습니다.
+# ------------------------------
+AUDIO_DIR = BASE_DIR / "assets" / "audio"
+AUDIO_MANIFEST_NAME = "manifest.json"
+AUDIO_MIME_TYPES = {".wav": "audio/wav", ".mp3": "audio/mpeg", ".ogg": "audio/ogg"}
+
+@lru_cache(maxsize=32)
+def _read_bytes_cached(path: str, mtime_ns: int) -> bytes:
+    return Path(path).read_bytes()
+
+@lru_cache(maxsize=32)
+def _sha1_cached(path: str, mtime_ns: int) -> str:
+    digest = hashlib.sha1()
     with open(path, "rb") as f:
-        data = f.read()
-    b64 = base64.b64encode(data).decode("utf-8")
-    return f"data:audio/wav;base64,{b64}"
\ No newline at end of file
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_sha1(path) -> str:
+    """파일 내용의 sha1 (경로, 수정시각 기준으로 캐시)"""
+    path = str(path)
+    return _sha1_cached(path, _mtime_ns(path))
+
+def load_audio_manifest(audio_dir=AUDIO_DIR) -> dict:
+    manifest_path = Path(audio_dir) / AUDIO_MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    return json.loads(_read_text_cached(str(manifest_path), _mtime_ns(manifest_path)))
+
+def resolve_audio_path(path) -> Path:
+    """원본 wav 경로 → 최신 압축본이 있으면 그 경로, 없으면 원본 경로"""
+    path = Path(path)
+    entry = load_audio_manifest(path.parent).get(path.name)
+    if entry:
+        compressed = path.parent / entry["file"]
+        if compressed.exists() and entry.get("source_sha1") == file_sha1(path):
+            return compressed
+    return path
+
+def load_audio(path):
+    """재생할 오디오의 (bytes, mime type) 반환 (압축본 우선, 메모리 캐시)"""
+    resolved = resolve_audio_path(path)
+    data = _read_bytes_cached(str(resolved), _mtime_ns(resolved))
+    return data, AUDIO_MIME_TYPES.get(resolved.suffix.lower(), "audio/wav")
+
+def render_audio(path, **kwargs):
+    """st.audio 에 캐시된 bytes 를 넘겨 재생 (kwargs 는 st.audio 로 전달)"""
+    data, mime = load_audio(path)
+    st.audio(data, format=mime, **kwargs)
+
+def audio_to_base64(path):
+    resolved = resolve_audio_path(path)
+    b64 = _read_base64_cached(str(resolved), _mtime_ns(resolved))
+    return f"data:{AUDIO_MIME_TYPES.get(resolved.suffix.lower(), 'audio/wav')};base64,{b64}"
\ No newline at end of file
@@ -0,0 +1,80 @@
+import os
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+# ------------------------------
+# 렌더링 계측 (디버그용)
+# - 스크립트 전체 실행(app)과 fragment 단독 재실행마다 횟수/소요 시간을 세션별로 기록합니다.
+# - 전체 실행 중에 함께 그려지는 fragment 는 app 시간에 포함되므로 form.* 로 따로 세지 않습니다.
+# - OTTF_DEBUG=1 환경변수 또는 URL 에 ?debug=1 을 붙이면 사이드바와 서버 콘솔에 표시됩니다.
+#   사이드바 표는 자리(slot)만 전체 실행 때 만들고, 매 계측이 끝날 때 제자리에서 다시 그립니다.
+# ------------------------------
+METRICS_KEY = "_render_metrics"
+METRICS_SLOT_KEY = "_render_metrics_slot"
+FULL_RUN_KEY = "_render_full_run"
+
+
+def is_debug() -> bool:
+    return os.environ.get("OTTF_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+
+@contextmanager
+def track_render(name: str, fragment: bool = False):
+    """
+    with 블록 하나의 실행 횟수와 시간(ms)을 기록
+    - fragment=True 인 블록은 fragment 단독 재실행일 때만 기록 (전체 실행 중이면 건너뜀)
+    """
+    if fragment and st.session_state.get(FULL_RUN_KEY):
+        yield
+        return
+    if not fragment:
+        st.session_state[FULL_RUN_KEY] = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if not fragment:
+            st.session_state[FULL_RUN_KEY] = False
+        metrics = st.session_state.setdefault(METRICS_KEY, {})
+        entry = metrics.setdefault(name, {"runs": 0, "total_ms": 0.0, "last_ms": 0.0})
+        entry["runs"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["last_ms"] = elapsed_ms
+        if is_debug():
+            print(f"[metrics] {name} run #{entry['runs']}: {elapsed_ms:.1f} ms")
+            refresh_metrics_sidebar()
+
+
+def get_metrics() -> dict:
+    return st.session_state.get(METRICS_KEY, {})
+
+
+def render_metrics_sidebar():
+    """디버그 모드일 때 사이드바에 계측 표 자리를 만듦 (전체 실행마다 페이지를 그리기 전에 호출)"""
+    if not is_debug():
+        return
+    with st.sidebar:
+        st.markdown("**Render metrics**")
+        st.caption("app = 전체 스크립트 실행, form.* = fragment 단독 재실행")
+        st.session_state[METRICS_SLOT_KEY] = st.empty()
+    refresh_metrics_sidebar()
+
+
+def refresh_metrics_sidebar():
+    """scope별 실행 횟수/평균·최근 시간 표를 사이드바 자리에 다시 그림 (fragment 재실행 중에도 갱신됨)"""
+    slot = st.session_state.get(METRICS_SLOT_KEY)
+    if slot is None:
+        return
+    rows = [
+        {
+            "scope": name,
+            "runs": entry["runs"],
+            "last ms": round(entry["last_ms"], 1),
+            "avg ms": round(entry["total_ms"] / entry["runs"], 1),
+        }
+        for name, entry in get_metrics().items()
+    ]
+    slot.dataframe(rows, hide_index=True, use_container_width=True)
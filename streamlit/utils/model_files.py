@@ -0,0 +1,30 @@
+import pathlib
+
+import joblib
+
+# ------------------------------
+# 모델 파일 로드
+# - streamlit 에 의존하지 않으므로 앱(services), 예측 서버, 루트의 model_test.py 가 같은 구현을 씁니다.
+# ------------------------------
+
+def get_native_model_path(path) -> pathlib.Path:
+    """joblib 모델 경로 → CatBoost 네이티브(.cbm) 모델 경로"""
+    return pathlib.Path(path).with_suffix(".cbm")
+
+def load_model_file(path):
+    """
+    모델 파일 로드 (Streamlit 런타임 없이 사용 가능)
+    - 같은 이름의 .cbm 파일이 joblib 파일보다 최신이면 CatBoost 네이티브 포맷으로 로드하고,
+      없거나 로드에 실패하면 joblib 으로 대체합니다. (build_assets.py models 로 생성)
+    """
+    path = pathlib.Path(path)
+    native_path = get_native_model_path(path)
+    if path.suffix == ".joblib" and native_path.exists() and native_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        try:
+            from catboost import CatBoostClassifier
+            model = CatBoostClassifier()
+            model.load_model(str(native_path))
+            return model
+        except Exception as e:
+            print(f"Warning: 네이티브 모델 로드 실패, joblib 으로 대체합니다 ({native_path}): {e}")
+    return joblib.load(path)
@@ -0,0 +1,108 @@
+import pandas as pd
+
+# ------------------------------
+# 입력 정규화 (Series 단위)
+# - 앱(services.build_input_df_dynamic, predict_server)과 배치 채점(model_test.py score)이 같은 구현을 씁니다.
+# - streamlit 에 의존하지 않으므로 루트의 model_test.py 에서도 import 할 수 있습니다.
+# - CSV 에서 읽은 열처럼 숫자(2, 30.0, '1')로 들어온 값은 유효한 범위일 때만 그 숫자를 코드로 씁니다.
+# ------------------------------
+
+# 활동유형 매핑
+ACT_LABEL_TO_CODE = {
+    "취식": "1",
+    "쇼핑": "2",
+    "쇼핑/구매": "2",
+    "체험": "3",
+    "체험 활동": "3",
+    "입장": "3",
+    "관람": "3",
+    "산책": "4",
+    "단순 구경": "4",
+    "걷기": "4",
+    "휴식": "5",
+    "기타": "6",
+    "이동": "7",  # 환승/경유 의미
+    "환승": "7",
+    "경유": "7",
+    "없음": "99",
+}
+
+# 정규화용 룩업 테이블 (모듈 로드 시 한 번만 생성)
+GENDER_TO_CODE = {"m": 1, "남": 1, "남자": 1, "male": 1,
+                  "f": 2, "여": 2, "여자": 2, "female": 2}
+# 공백/슬래시를 제거한 활동 라벨 → 코드 (같은 키는 먼저 정의된 라벨이 우선)
+ACT_KEY_TO_CODE = {}
+for _label, _code in ACT_LABEL_TO_CODE.items():
+    ACT_KEY_TO_CODE.setdefault(_label.replace(" ", "").replace("/", ""), _code)
+
+GENDER_CODES = (1, 2)
+AGE_GRP_LIMIT = 200  # 이 이상은 나이로 보지 않음
+ACTIVITY_CODE_LIMIT = 1000  # 실제 활동코드는 두 자리 이하
+
+def _as_text(s: pd.Series) -> pd.Series:
+    """None/NaN을 스칼라 함수의 str(None)과 같은 'None' 문자열로 맞춘 뒤 공백 제거"""
+    return s.astype(object).where(s.notna(), None).astype(str).str.strip()
+
+def _finite_numbers(text: pd.Series) -> pd.Series:
+    """숫자로 읽히는 유한한 값만 남김 (inf/-inf/문자는 NaN)"""
+    numbers = pd.to_numeric(text, errors="coerce")
+    return numbers.where(numbers.abs() < float("inf"))
+
+# ------------------------------
+# parse_*: 알아볼 수 없는 값은 NaN 으로 남김 (배치 채점에서 잘못된 행을 찾는 데 사용)
+# normalize_*: parse_* 결과의 NaN 을 기본값(성별 1, 연령대 30, 활동 '99')으로 채움
+# ------------------------------
+def parse_gender_series(s: pd.Series) -> pd.Series:
+    """성별 Series → 1(남)/2(여), 숫자는 1/2 만 인정"""
+    text = _as_text(s)
+    codes = text.str.lower().map(GENDER_TO_CODE)
+    numbers = _finite_numbers(text)
+    return codes.fillna(numbers.where(numbers.isin(GENDER_CODES)))
+
+def parse_age_grp_series(s: pd.Series) -> pd.Series:
+    """나이대 Series: 0 이상의 숫자는 그대로(소수점 이하 버림), 그 밖에는 숫자만 골라 '30대' → 30"""
+    text = _as_text(s)
+    numbers = _finite_numbers(text)
+    digits = text.str.replace(r"\D", "", regex=True)
+    parsed = pd.to_numeric(digits.where(digits != ""), errors="coerce")
+    ages = numbers.where(numbers >= 0).floordiv(1).fillna(parsed)
+    return ages.where(ages < AGE_GRP_LIMIT)
+
+def parse_activity_type_series(s: pd.Series) -> pd.Series:
+    """활동유형 라벨/코드('3', 3.0, 'A03') Series → 코드 문자열 Series"""
+    text = _as_text(s)
+    codes = text.map(ACT_LABEL_TO_CODE)
+    codes = codes.where(codes.notna(), text.str.replace(" ", "").str.replace("/", "").map(ACT_KEY_TO_CODE))
+    # 0 이상의 정수 코드(1.0, '01' 등)와 'A03' 형태의 코드를 정수 문자열로 맞춥니다. (2.7, -1, 1e30 은 인정하지 않음)
+    numbers = _finite_numbers(text)
+    numbers = numbers.where((numbers >= 0) & (numbers < ACTIVITY_CODE_LIMIT) & (numbers % 1 == 0))
+    a_codes = text.str.extract(r"^[Aa](\d+)$", expand=False)
+    numbers = numbers.fillna(pd.to_numeric(a_codes, errors="coerce"))
+    numeric_codes = numbers.map("{:.0f}".format, na_action="ignore")
+    return codes.where(codes.notna(), numeric_codes)
+
+def normalize_gender_series(s: pd.Series) -> pd.Series:
+    """성별 Series → 1(남)/2(여), 알 수 없으면 1"""
+    return parse_gender_series(s).fillna(1).astype(int)
+
+def normalize_age_grp_series(s: pd.Series) -> pd.Series:
+    """나이대 Series: '30대' → 30, 숫자가 없으면 30"""
+    return parse_age_grp_series(s).fillna(30).astype(int)
+
+def normalize_activity_type_series(s: pd.Series) -> pd.Series:
+    """활동유형 Series → 코드 문자열 Series, 알 수 없으면 '99'"""
+    codes = parse_activity_type_series(s)
+    return codes.where(codes.notna(), "99").astype(str)
+
+# 스칼라 버전 (1건 입력용) - Series 버전과 같은 규칙
+def normalize_gender(v) -> int:
+    """성별을 1(남)/2(여)로 변환"""
+    return int(normalize_gender_series(pd.Series([v], dtype=object)).iloc[0])
+
+def normalize_age_grp(v) -> int:
+    """나이대: '30대' → 30, '30' → 30"""
+    return int(normalize_age_grp_series(pd.Series([v], dtype=object)).iloc[0])
+
+def normalize_activity_type(v) -> str:
+    """활동유형 라벨 → 코드 변환"""
+    return str(normalize_activity_type_series(pd.Series([v], dtype=object)).iloc[0])
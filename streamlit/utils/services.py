@@ -2,10 +2,24 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import pathlib
-import joblib
+import hashlib
 import time
 import os
 
+from utils.model_files import get_native_model_path, load_model_file
+from utils.normalize import (
+    ACT_KEY_TO_CODE,
+    ACT_LABEL_TO_CODE,
+    GENDER_TO_CODE,
+    _as_text,
+    normalize_activity_type,
+    normalize_activity_type_series,
+    normalize_age_grp,
+    normalize_age_grp_series,
+    normalize_gender,
+    normalize_gender_series,
+)
+
 # ------------------------------
 # Catboost Lite Model 
 # ------------------------------
@@ -35,68 +49,38 @@ MODEL_FEATURES = {
     "model_v2": LITE_FEATURES_V2,
 }
 
-# 활동유형 매핑
-ACT_LABEL_TO_CODE = {
-    "취식": "1",
-    "쇼핑": "2",
-    "쇼핑/구매": "2",
-    "체험": "3",
-    "체험 활동": "3",
-    "입장": "3",
-    "관람": "3",
-    "산책": "4",
-    "단순 구경": "4",
-    "걷기": "4",
-    "휴식": "5",
-    "기타": "6",
-    "이동": "7",  # 환승/경유 의미
-    "환승": "7",
-    "경유": "7",
-    "없음": "99",
+# 모델 파일 위치 (버전 키 → 파일명)
+MODEL_DIR = pathlib.Path(__file__).resolve().parent.parent / "models"
+MODEL_FILES = {
+    "model_v1": "catboost_best_model_lite.joblib",
+    "model_v2": "catboost_best_model_lite_v2.joblib",
 }
 
+def get_model_path(version: str) -> pathlib.Path:
+    """모델 버전 키 → 모델 파일 경로"""
+    return MODEL_DIR / MODEL_FILES[version]
+
 @st.cache_resource
 def get_model(path):
     try:
-        model = joblib.load(path)
+        model = load_model_file(path)
         return model
     except Exception as e:
         st.warning(f"모델 로드 실패: {e}")
         return None
 
-def normalize_gender(v) -> int:
-    """성별을 1(남)/2(여)로 변환"""
-    if v is None:
-        return 1
-    v = str(v).strip().lower()
-    mapping = {"m": 1, "남": 1, "남자": 1, "male": 1,
-               "f": 2, "여": 2, "여자": 2, "female": 2}
-    return mapping.get(v, 1)
-
-def normalize_age_grp(v) -> int:
-    """나이대: '30대' → 30, '30' → 30"""
-    if v is None:
-        return 30
-    v = str(v)
-    digits = "".join(ch for ch in v if ch.isdigit())
-    return int(digits) if digits else 30
-
-def normalize_activity_type(v) -> str:
-    """활동유형 라벨 → 코드 변환"""
-    if v is None:
-        return "99"
-    v = str(v).strip()
-    if v in ACT_LABEL_TO_CODE:
-        return ACT_LABEL_TO_CODE[v]
-    vv = v.replace(" ", "").replace("/", "")
-    for k, code in ACT_LABEL_TO_CODE.items():
-        if vv == k.replace(" ", "").replace("/", ""):
-            return code
-    if v.isdigit():
-        return v
-    if (len(v) >= 2) and (v[0] in ("A", "a")) and v[1:].isdigit():
-        return str(int(v[1:]))
-    return "99"
+# 정규화용 룩업 테이블 (모듈 로드 시 한 번만 생성)
+PAYMENT_PERSONA_TO_CODE = {
+    "low": "low", "낮음": "low", "하": "low", "lo": "low",
+    "medium": "med", "med": "med", "중간": "med", "중": "med",
+    "high": "high", "높음": "high", "상": "high", "hi": "high",
+    "높": "high", "낮": "low",
+}
+SEASON_TO_LABEL = {
+    "spring": "봄", "summer": "여름", "fall": "가을", "autumn": "가을", "winter": "겨울",
+    "1": "봄", "2": "여름", "3": "가을", "4": "겨울",
+    "봄": "봄", "여름": "여름", "가을": "가을", "겨울": "겨울",
+}
 
 def build_input_df(trip_days, gender, age_grp, activity_type_cd):
     """사용자 입력값 → 모델 입력 DataFrame 생성"""
@@ -113,18 +97,155 @@ def predict_failure(model, X, threshold=0.5):
     proba = float(model.predict_proba(X)[:, 1][0])
     return proba, int(proba >= threshold)
 
+def predict_failure_batch(model, X, threshold=0.5):
+    """N행 입력의 예측 확률 배열 및 라벨 배열 반환"""
+    proba = np.asarray(model.predict_proba(X)[:, 1], dtype=float)
+    return proba, (proba >= threshold).astype(int)
+
+# ------------------------------
+# LITE_FEATURES 사전 계산 룩업 테이블
+# - 폼에서 선택 가능한 (성별 × 연령대 × 여행일수 × 활동코드) 전체 격자를 미리 예측해 둡니다.
+# - build_assets.py lookup 으로 생성: models/<모델파일명>_lookup.npz
+# ------------------------------
+LOOKUP_GENDERS = [1, 2]
+LOOKUP_AGE_GRPS = [10, 20, 30, 40, 50]
+LOOKUP_TRIP_DAYS = list(range(1, 31))
+LOOKUP_ACTIVITY_CODES = ["1", "2", "3", "4", "5", "6", "7", "99"]
+
+def get_lookup_path(model_path) -> pathlib.Path:
+    """모델 파일 경로 → 룩업 테이블 경로"""
+    model_path = pathlib.Path(model_path)
+    return model_path.with_name(f"{model_path.stem}_lookup.npz")
+
+def build_lookup_grid() -> pd.DataFrame:
+    """룩업 격자 전체를 LITE_FEATURES 입력 DataFrame 으로 생성 (C 순서: 성별→연령→일수→활동)"""
+    g, a, d, c = np.meshgrid(
+        LOOKUP_GENDERS, LOOKUP_AGE_GRPS, LOOKUP_TRIP_DAYS, np.arange(len(LOOKUP_ACTIVITY_CODES)),
+        indexing="ij",
+    )
+    return pd.DataFrame({
+        "TRIP_DAYS": d.ravel().astype(float),
+        "GENDER": g.ravel(),
+        "AGE_GRP": a.ravel(),
+        "ACTIVITY_TYPE_CD": np.array(LOOKUP_ACTIVITY_CODES, dtype=object)[c.ravel()],
+    }, columns=LITE_FEATURES)
+
+def build_lookup_table(model) -> np.ndarray:
+    """격자 전체를 한 번의 predict_proba 로 계산해 4차원 확률 배열로 반환"""
+    X = build_lookup_grid()
+    proba = np.asarray(model.predict_proba(X)[:, 1], dtype=np.float32)
+    shape = (len(LOOKUP_GENDERS), len(LOOKUP_AGE_GRPS), len(LOOKUP_TRIP_DAYS), len(LOOKUP_ACTIVITY_CODES))
+    return proba.reshape(shape)
+
+def _file_sha1(path) -> str:
+    """파일 내용 sha1 (git checkout 으로 수정시각이 바뀌어도 같은 모델로 판단)"""
+    return hashlib.sha1(pathlib.Path(path).read_bytes()).hexdigest()
+
+def save_lookup_table(model_path, proba: np.ndarray) -> pathlib.Path:
+    """룩업 테이블 저장 (모델 파일의 sha1 을 함께 기록해 갱신 여부를 판단)"""
+    out_path = get_lookup_path(model_path)
+    np.savez_compressed(out_path, proba=proba, source_sha1=np.array(_file_sha1(model_path)))
+    return out_path
+
+def load_lookup_table(model_path):
+    """
+    룩업 테이블 로드
+    - 파일이 없거나 모델 파일이 바뀌었으면 None (모델 직접 예측으로 대체)
+    """
+    lookup_path = get_lookup_path(model_path)
+    if not lookup_path.exists():
+        return None
+    try:
+        with np.load(lookup_path) as data:
+            if str(data["source_sha1"]) != _file_sha1(model_path):
+                print(f"Warning: 룩업 테이블이 모델 파일과 맞지 않습니다. 다시 생성하세요: {lookup_path}")
+                return None
+            return data["proba"]
+    except Exception as e:
+        print(f"Warning: 룩업 테이블 로드 실패 ({lookup_path}): {e}")
+        return None
+
+# 축 값 → 위치 (1행 예측에서도 pandas 오버헤드 없이 조회하도록 dict 사용)
+_LOOKUP_AXES = [
+    ("GENDER", {v: i for i, v in enumerate(LOOKUP_GENDERS)}),
+    ("AGE_GRP", {v: i for i, v in enumerate(LOOKUP_AGE_GRPS)}),
+    ("TRIP_DAYS", {v: i for i, v in enumerate(LOOKUP_TRIP_DAYS)}),  # 3.0 == 3 이므로 정수 일수만 매칭
+    ("ACTIVITY_TYPE_CD", {v: i for i, v in enumerate(LOOKUP_ACTIVITY_CODES)}),
+]
+
+def predict_with_lookup(model, X: pd.DataFrame, table=None) -> np.ndarray:
+    """
+    LITE_FEATURES 입력의 실패 확률 배열 반환
+    - 격자 안의 행은 룩업 테이블에서 바로 읽고, 격자 밖의 행만 predict_proba 로 계산합니다.
+    """
+    if table is None:
+        return np.asarray(model.predict_proba(X)[:, 1], dtype=float)
+
+    pos = tuple(
+        np.fromiter((axis.get(v, -1) for v in X[col].tolist()), dtype=np.intp, count=len(X))
+        for col, axis in _LOOKUP_AXES
+    )
+    in_grid = np.logical_and.reduce([p >= 0 for p in pos])
+    if in_grid.all():
+        return table[pos].astype(float)
+
+    proba = np.empty(len(X), dtype=float)
+    if in_grid.any():
+        proba[in_grid] = table[tuple(p[in_grid] for p in pos)]
+    proba[~in_grid] = model.predict_proba(X[~in_grid])[:, 1]
+    return proba
+
+@st.cache_resource
+def get_lookup_table(model_path):
+    return load_lookup_table(model_path)
+
+# ------------------------------
+# 모델 워밍업
+# - 첫 사용자가 역직렬화/첫 예측 지연을 겪지 않도록 앱 시작 시 모든 모델을 미리 로드하고 한 번 예측합니다.
+# ------------------------------
+def warm_up_models(model_paths: dict = None, loader=load_model_file) -> dict:
+    """
+    모델 버전별 로드 시간/첫 예측 지연(ms) 측정
+    - model_paths: {모델 버전: 경로} (기본: MODEL_FILES 전체)
+    - loader: 모델 로드 함수 (앱에서는 get_model 을 넘겨 캐시까지 채움)
+    """
+    if model_paths is None:
+        model_paths = {key: get_model_path(key) for key in MODEL_FILES}
+
+    stats = {}
+    for key, path in model_paths.items():
+        start = time.perf_counter()
+        try:
+            model = loader(path)
+        except Exception as e:
+            print(f"Warning: 모델 워밍업 실패 ({key}, {path}): {e}")
+            model = None
+        load_ms = (time.perf_counter() - start) * 1000
+        if model is None:
+            stats[key] = {"path": str(path), "load_ms": load_ms, "first_predict_ms": None}
+            continue
+
+        # 기본값으로 채운 1행 입력으로 첫 예측 (내부 버퍼 초기화)
+        X = build_input_df_dynamic(MODEL_FEATURES[key])
+        start = time.perf_counter()
+        model.predict_proba(X)
+        first_predict_ms = (time.perf_counter() - start) * 1000
+        stats[key] = {"path": str(path), "load_ms": load_ms, "first_predict_ms": first_predict_ms}
+        print(f"[warmup] {key}: load {load_ms:.1f} ms, first predict {first_predict_ms:.1f} ms")
+
+    # 폴더에 새로 추가됐지만 MODEL_FILES 에 등록되지 않은 경량 모델 알림
+    registered = set(MODEL_FILES.values())
+    for path in sorted(MODEL_DIR.glob("catboost_best_model_lite*.joblib")):
+        if path.name not in registered:
+            print(f"Warning: {path.name} 이(가) MODEL_FILES 에 등록되지 않아 워밍업하지 않았습니다.")
+    return stats
+
 def normalize_payment_persona(v: str) -> str:
     """payment_persona 정규화"""
     if v is None:
         return "med"
-    m = {
-        "low": "low", "낮음": "low", "하": "low", "lo": "low",
-        "medium": "med", "med": "med", "중간": "med", "중": "med",
-        "high": "high", "높음": "high", "상": "high", "hi": "high",
-        "높": "high", "낮": "low",
-    }
     key = str(v).strip().lower()
-    return m.get(key, "med")
+    return PAYMENT_PERSONA_TO_CODE.get(key, "med")
 
 def normalize_companions_num(v) -> int:
     """동반인원 정규화"""
@@ -139,32 +260,128 @@ def normalize_season(v: str) -> str:
     if v is None:
         return "봄"
     key = str(v).strip().lower()
-    m = {
-        "spring": "봄", "summer": "여름", "fall": "가을", "autumn": "가을", "winter": "겨울",
-        "1": "봄", "2": "여름", "3": "가을", "4": "겨울",
-        "봄": "봄", "여름": "여름", "가을": "가을", "겨울": "겨울",
-    }
-    return m.get(key, "봄")
+    return SEASON_TO_LABEL.get(key, "봄")
+
+# ------------------------------
+# Series 단위 정규화 (배치/API 예측용)
+# - 각 함수는 위 스칼라 함수와 같은 규칙을 열 전체에 한 번에 적용합니다.
+# - 성별/연령대/활동유형은 model_test.py 와 함께 쓰는 utils.normalize 의 구현(스칼라 버전 포함)을 사용합니다.
+#   (CSV/JSON 에서 숫자로 들어온 코드는 유효할 때만 받습니다: 성별 2 → 2, 성별 5 → 1, 활동 3.0 → '3')
+# ------------------------------
+def normalize_payment_persona_series(s: pd.Series) -> pd.Series:
+    """payment_persona Series 정규화"""
+    codes = _as_text(s).str.lower().map(PAYMENT_PERSONA_TO_CODE)
+    return codes.where(codes.notna(), "med").astype(str)
+
+def normalize_companions_num_series(s: pd.Series) -> pd.Series:
+    """동반인원 Series 정규화 (소수점 이하 버림, 음수/오류는 0)"""
+    n = pd.to_numeric(_as_text(s), errors="coerce").replace([np.inf, -np.inf], np.nan)
+    return np.trunc(n).fillna(0).clip(lower=0).astype(int)
+
+def normalize_season_series(s: pd.Series) -> pd.Series:
+    """시즌 Series 정규화"""
+    labels = _as_text(s).str.lower().map(SEASON_TO_LABEL)
+    return labels.where(labels.notna(), "봄").astype(str)
+
+def _broadcast(value, n: int) -> pd.Series:
+    """스칼라는 n행으로 복제하고, 리스트/배열/Series는 그대로 Series로 변환"""
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+        return pd.Series(list(value), dtype=object)
+    return pd.Series([value] * n, dtype=object)
 
 def build_input_df_dynamic(features: list, **kwargs):
-    row = {}
+    """
+    모델 버전별 입력 DataFrame 생성
+    - 각 입력값은 스칼라 또는 리스트/배열이며, 리스트를 주면 길이만큼의 N행 DataFrame을 만듭니다.
+    - 스칼라 입력은 모든 행에 동일하게 적용됩니다.
+    """
+    lengths = {
+        len(v) for v in kwargs.values()
+        if isinstance(v, (list, tuple, np.ndarray, pd.Series, pd.Index))
+    }
+    if len(lengths) > 1:
+        raise ValueError(f"입력 리스트의 길이가 서로 다릅니다: {sorted(lengths)}")
+    n = lengths.pop() if lengths else 1
+
+    cols = {}
     # 공통
     if "TRIP_DAYS" in features:
-        row["TRIP_DAYS"] = float(kwargs.get("trip_days", 1))
+        cols["TRIP_DAYS"] = pd.to_numeric(_broadcast(kwargs.get("trip_days", 1), n)).astype(float)
     if "GENDER" in features:
-        row["GENDER"] = normalize_gender(kwargs.get("gender"))
+        cols["GENDER"] = normalize_gender_series(_broadcast(kwargs.get("gender"), n))
     if "AGE_GRP" in features:
-        row["AGE_GRP"] = normalize_age_grp(kwargs.get("age_grp"))
+        cols["AGE_GRP"] = normalize_age_grp_series(_broadcast(kwargs.get("age_grp"), n))
     if "ACTIVITY_TYPE_CD" in features:
-        row["ACTIVITY_TYPE_CD"] = normalize_activity_type(kwargs.get("activity_type_cd"))
+        cols["ACTIVITY_TYPE_CD"] = normalize_activity_type_series(_broadcast(kwargs.get("activity_type_cd"), n))
     # v2 전용
     if "payment_persona" in features:
-        row["payment_persona"] = normalize_payment_persona(kwargs.get("payment_persona"))
+        cols["payment_persona"] = normalize_payment_persona_series(_broadcast(kwargs.get("payment_persona"), n))
     if "TRAVEL_STATUS_ACCOMPANY" in features:
-        row["TRAVEL_STATUS_ACCOMPANY"] = "정보없음"  # UI 미노출 고정 값
+        cols["TRAVEL_STATUS_ACCOMPANY"] = pd.Series(["정보없음"] * n, dtype=object)  # UI 미노출 고정 값
     if "TRAVEL_COMPANIONS_NUM" in features:
-        row["TRAVEL_COMPANIONS_NUM"] = normalize_companions_num(kwargs.get("companions_num"))
+        cols["TRAVEL_COMPANIONS_NUM"] = normalize_companions_num_series(_broadcast(kwargs.get("companions_num"), n))
+    if "SEASON" in features:
+        cols["SEASON"] = normalize_season_series(_broadcast(kwargs.get("season"), n))
+
+    return pd.DataFrame(cols, columns=features)
+
+# ------------------------------
+# 플랜 B (what-if) 스윕
+# - 제출한 1행 입력을 활동 × 여행일수 (× v2: 계절 × 동반인원) 조합으로 펼쳐
+#   한 번의 predict_proba(간단한계획은 룩업 테이블)로 모두 평가합니다.
+# - 성별/연령대/소비성향처럼 사람에 대한 값은 바꾸지 않습니다.
+# ------------------------------
+PLAN_B_TRIP_DAYS = [1, 2, 3, 4, 5]
+PLAN_B_SEASONS = ["봄", "여름", "가을", "겨울"]
+
+def plan_b_axes(row: pd.Series, features: list) -> dict:
+    """스윕할 컬럼 → 후보 값 (제출한 값은 항상 포함, v2 는 수백 행 이내가 되도록 동반인원은 ±1 만)"""
+    axes = {}
+    if "ACTIVITY_TYPE_CD" in features:
+        axes["ACTIVITY_TYPE_CD"] = list(LOOKUP_ACTIVITY_CODES)
+    if "TRIP_DAYS" in features:
+        axes["TRIP_DAYS"] = sorted(set(PLAN_B_TRIP_DAYS) | {int(row["TRIP_DAYS"])})
     if "SEASON" in features:
-        row["SEASON"] = normalize_season(kwargs.get("season"))
+        axes["SEASON"] = list(PLAN_B_SEASONS)
+    if "TRAVEL_COMPANIONS_NUM" in features:
+        n = int(row["TRAVEL_COMPANIONS_NUM"])
+        axes["TRAVEL_COMPANIONS_NUM"] = sorted({max(n - 1, 0), n, n + 1})
+    return axes
+
+def build_plan_b_grid(X: pd.DataFrame, features: list) -> pd.DataFrame:
+    """제출 입력(1행) → 후보 조합 전체 DataFrame (스윕하지 않는 컬럼은 제출 값 그대로)"""
+    row = X.iloc[0]
+    axes = plan_b_axes(row, features)
+    # 카테시안 곱의 각 축 위치 (C 순서)
+    index = np.indices([len(values) for values in axes.values()]).reshape(len(axes), -1)
+    n = index.shape[1]
+
+    # 컬럼마다 제출 입력과 같은 dtype 으로 바로 만들어 astype 을 거치지 않습니다.
+    cols = {}
+    for col in features:
+        if col in axes:
+            cols[col] = np.asarray(axes[col], dtype=X[col].dtype)[index[list(axes).index(col)]]
+        else:
+            cols[col] = np.repeat(X[col].to_numpy(), n)
+    return pd.DataFrame(cols, columns=features)
+
+def sweep_plan_b(model, X: pd.DataFrame, features: list, table=None, top_n: int = 5) -> pd.DataFrame:
+    """
+    제출 입력보다 실패 확률이 낮은 대안 계획 Top N
+    - 반환: 스윕한 컬럼 + FAIL_PROBA, 실패 확률 오름차순 (제출한 계획 자체는 제외)
+    """
+    grid = build_plan_b_grid(X, features)
+    if features == LITE_FEATURES:
+        proba = predict_with_lookup(model, grid, table)
+    else:
+        proba = predict_failure_batch(model, grid)[0]
 
-    return pd.DataFrame([row], columns=features)
\ No newline at end of file
+    # 후처리도 numpy 로: 제출한 계획 제외 → 확률 오름차순 상위 N 행만 DataFrame 으로
+    row = X.iloc[0]
+    swept = list(plan_b_axes(row, features))
+    is_current = np.logical_and.reduce([grid[col].to_numpy() == row[col] for col in swept])
+    order = np.argsort(proba, kind="stable")
+    top = order[~is_current[order]][:top_n]
+    result = grid.iloc[top][swept].reset_index(drop=True)
+    result["FAIL_PROBA"] = proba[top]
+    return result
@@ -0,0 +1,46 @@
+"""Input normalisers shared by the app and model_test.py: numeric codes are accepted only
+when they are finite and in range, and the scalar helpers follow the Series rules."""
+import pathlib
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "streamlit"))
+
+from utils import normalize
+
+CASES = {
+    "gender": [
+        ("남", 1), ("여", 2), ("F", 2), ("male", 1), ("2", 2), (2.0, 2), (1, 1),
+        (5, 1), (0, 1), (-1, 1), ("1.5", 1), ("inf", 1), (float("-inf"), 1), (None, 1), ("x", 1),
+    ],
+    "age_grp": [
+        ("30대", 30), ("30", 30), ("30.0", 30), (40.0, 40), ("50대 이상", 50),
+        ("-10", 10), ("inf", 30), (float("nan"), 30), (None, 30), ("1e30", 30), ("x", 30),
+    ],
+    "activity_type": [
+        ("취식", "1"), ("쇼핑 / 구매", "2"), ("3", "3"), (3.0, "3"), ("01", "1"), ("A03", "3"), ("없음", "99"),
+        ("2.7", "99"), ("-1", "99"), ("inf", "99"), ("1e30", "99"), (None, "99"), ("x", "99"),
+    ],
+}
+
+
+@pytest.mark.parametrize("field", sorted(CASES))
+def test_series_normalizers(field):
+    values, expected = zip(*CASES[field])
+    series = getattr(normalize, f"normalize_{field}_series")(pd.Series(values, dtype=object))
+    assert series.tolist() == list(expected)
+
+
+@pytest.mark.parametrize("field", sorted(CASES))
+def test_scalar_normalizers_follow_series_rules(field):
+    scalar = getattr(normalize, f"normalize_{field}")
+    assert [scalar(value) for value, _ in CASES[field]] == [expected for _, expected in CASES[field]]
+
+
+def test_parsers_leave_unrecognised_values_missing():
+    s = pd.Series(["여", 5, "inf", None], dtype=object)
+    assert normalize.parse_gender_series(s).isna().tolist() == [False, True, True, True]
+    assert normalize.parse_activity_type_series(pd.Series(["2.7", "A03"])).tolist()[1] == "3"
+    assert pd.isna(normalize.parse_activity_type_series(pd.Series(["2.7"])).iloc[0])
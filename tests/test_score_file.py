@@ -0,0 +1,98 @@
+"""Regression tests for model_test.score_file: one Parquet schema across chunks whose pandas
+dtypes differ, and rows with unusable inputs flagged in input_error instead of being scored."""
+import numpy as np
+import pandas as pd
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+import model_test
+
+
+class TripDaysModel:
+    """predict_proba stand-in: failure probability grows with TRIP_DAYS."""
+
+    def predict_proba(self, X):
+        p = (X["TRIP_DAYS"].fillna(0).to_numpy() / 10).clip(0, 1)
+        return np.column_stack([1 - p, p])
+
+
+# 첫 청크(4행)는 모두 숫자, 뒤 청크에는 빈 값과 라벨, 잘못된 값이 섞여 있습니다.
+INPUT_CSV = """\
+TRIP_ID,TRIP_DAYS,GENDER,AGE_GRP,ACTIVITY_TYPE_CD,NOTE
+t1,1,1,20,1,
+t2,2,2,30,2,
+t3,3,1,40,3,
+t4,4,2,50,4,
+t5,3,여,30대,쇼핑,memo
+t6,5,,,A03,
+t7,6,M,60,5.0,memo
+t8,4,5,0,2.7,
+t9,3,inf,30,1,
+"""
+REJECTED = {
+    "t6": "GENDER missing, AGE_GRP missing",
+    "t8": "GENDER=5, AGE_GRP=0, ACTIVITY_TYPE_CD=2.7",
+    "t9": "GENDER=inf",
+}
+
+
+@pytest.mark.parametrize("source", ["csv", "parquet"])
+def test_score_file_writes_parquet_across_mixed_chunks(tmp_path, source):
+    input_path = tmp_path / "trips.csv"
+    input_path.write_text(INPUT_CSV, encoding="utf-8")
+    if source == "parquet":
+        frame = pd.read_csv(input_path)
+        input_path = tmp_path / "trips.parquet"
+        frame.to_parquet(input_path, index=False)
+    output_path = tmp_path / "scored.parquet"
+
+    rows, _ = model_test.score_file(TripDaysModel(), str(input_path), str(output_path), chunksize=4)
+
+    scored = pq.read_table(output_path)
+    assert rows == scored.num_rows == 9
+    assert scored.schema.equals(model_test.output_schema(str(input_path)))
+    scored = scored.to_pandas().set_index("TRIP_ID")
+    valid = ~scored.index.isin(list(REJECTED))
+    trip_days = pd.to_numeric(scored["TRIP_DAYS"])
+    np.testing.assert_allclose(scored.loc[valid, "class_1_proba"], trip_days[valid] / 10)
+    assert scored.loc[valid, "input_error"].isna().all()
+
+
+@pytest.mark.parametrize("output_name", ["scored.csv", "scored.parquet"])
+def test_score_file_flags_invalid_rows_instead_of_scoring_them(tmp_path, capsys, output_name):
+    input_path = tmp_path / "trips.csv"
+    input_path.write_text(INPUT_CSV, encoding="utf-8")
+    output_path = tmp_path / output_name
+
+    model_test.score_file(TripDaysModel(), str(input_path), str(output_path), chunksize=4)
+
+    if output_name.endswith(".csv"):
+        scored = pd.read_csv(output_path, dtype={"TRIP_ID": str}).set_index("TRIP_ID")
+    else:
+        scored = pd.read_parquet(output_path).set_index("TRIP_ID")
+    rejected = scored.loc[list(REJECTED)]
+    assert rejected["input_error"].tolist() == list(REJECTED.values())
+    assert rejected["class_1_proba"].isna().all() and rejected["pred_label"].isna().all()
+    assert "3 of 9 rows have missing or invalid inputs" in capsys.readouterr().err
+
+
+def test_score_file_reports_missing_columns(tmp_path):
+    input_path = tmp_path / "trips.csv"
+    input_path.write_text("TRIP_DAYS,GENDER\n1,1\n", encoding="utf-8")
+    with pytest.raises(KeyError, match="AGE_GRP"):
+        model_test.score_file(TripDaysModel(), str(input_path), str(tmp_path / "scored.csv"))
+
+
+def test_build_input_frame_normalizes_labels_and_numbers():
+    raw = pd.DataFrame({
+        "TRIP_DAYS": ["3", 2.0],
+        "GENDER": ["여", 2.0],
+        "AGE_GRP": ["30대", 40.0],
+        "ACTIVITY_TYPE_CD": ["쇼핑/구매", 3.0],
+    })
+    X = model_test.build_input_frame(raw)
+    assert X["GENDER"].tolist() == [2, 2]
+    assert X["AGE_GRP"].tolist() == [30, 40]
+    assert X["ACTIVITY_TYPE_CD"].tolist() == ["2", "3"]
+    assert X.dtypes.astype(str).tolist() == ["float64", "int64", "int64", "object"]
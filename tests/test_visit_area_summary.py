@@ -0,0 +1,126 @@
+"""Regression test: visit_area_summary from the grouped min/max aggregation must equal
+the original per-trip lambda implementation (TRIP_DAYS, MOVE_CNT and the rest)."""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing import preprocessing as pp
+
+# 여행별 경계 사례
+# - a: 여러 방문지, 날짜 순서가 뒤섞임 / b: 방문지 1개, 당일
+# - c: 제외 코드(21)만 있는 여행 / d: 시작일 일부 결측, 방문지명 결측
+# - e: 시작일·종료일 모두 결측 (TRIP_DAYS = NaN) / f: 종료일만 결측
+VISIT_AREA_CSV = """\
+VISIT_AREA_ID,TRAVEL_ID,VISIT_ORDER,VISIT_AREA_NM,VISIT_START_YMD,VISIT_END_YMD,ROAD_NM_ADDR,VISIT_AREA_TYPE_CD,REVISIT_YN,VISIT_CHC_REASON_CD,DGSTFN,REVISIT_INTENTION,RCMDTN_INTENTION
+1,a_0001,1,집,2022-08-03,2022-08-03,서울,21,N,1,,,
+2,a_0001,2,해변,2022-08-04,2022-08-05,부산,1,N,2,5,4,5
+3,a_0001,3,시장,2022-08-03,2022-08-03,부산,2,Y,3,2,3,3
+4,a_0001,4,카페,2022-08-06,2022-08-07,부산,6,N,1,4,5,4
+5,a_0002,1,공원,2022-09-10,2022-09-10,대구,1,N,1,5,5,5
+6,a_0003,1,집,2022-10-01,2022-10-01,대전,21,N,1,,,
+7,a_0003,2,역,2022-10-01,2022-10-02,대전,22,N,1,,,
+8,a_0004,1,,,2022-07-02,광주,3,N,1,3,2,4
+9,a_0004,2,박물관,2022-06-28,2022-06-30,광주,3,Y,2,5,5,4
+10,a_0005,1,산,,,강원,1,N,1,4,4,4
+11,a_0005,2,호수,,,강원,1,N,1,1,1,1
+12,a_0006,1,섬,2022-05-05,,제주,1,N,1,5,4,3
+"""
+
+
+def _legacy_visit_area_summary(df, exclude_codes=(21, 22, 23)):
+    """Baseline preprocess_visit_area_info (per-trip lambda for TRIP_DAYS), applied to a loaded frame."""
+    default_drop = [
+        "ROAD_NM_ADDR", "LOTNO_ADDR", "X_COORD", "Y_COORD", "ROAD_NM_CD",
+        "LOTNO_CD", "POI_ID", "POI_NM", "RESIDENCE_TIME_MIN",
+        "LODGING_TYPE_CD", "SGG_CD",
+    ]
+    df = df.drop(columns=default_drop, errors="ignore")
+    for column in ["VISIT_START_YMD", "VISIT_END_YMD"]:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+
+    low_dgstfn = (df['DGSTFN'] <= 3)
+    low_revisit = (df['REVISIT_INTENTION'] <= 3)
+    low_rcmdtn = (df['RCMDTN_INTENTION'] <= 3)
+    fail_visit_condition = (low_dgstfn + low_revisit + low_rcmdtn) >= 1
+    df['IS_FAILED_VISIT'] = np.where(fail_visit_condition, 1, 0)
+    if "VISIT_AREA_TYPE_CD" in df.columns:
+        df.loc[df['VISIT_AREA_TYPE_CD'].isin(set(exclude_codes)), 'IS_FAILED_VISIT'] = np.nan
+
+    parts = []
+    filtered = df[~df["VISIT_AREA_TYPE_CD"].isin(set(exclude_codes))].copy()
+    if not filtered.empty:
+        parts.append(filtered.groupby("TRAVEL_ID")["DGSTFN"].mean().rename("DGSTFN_AVG"))
+        parts.append(filtered.groupby("TRAVEL_ID")["REVISIT_INTENTION"].mean().rename("REVISIT_AVG"))
+        parts.append(filtered.groupby("TRAVEL_ID")["RCMDTN_INTENTION"].mean().rename("RCMDTN_AVG"))
+
+    valid_visits = df.dropna(subset=['IS_FAILED_VISIT'])
+    trip_summary = valid_visits.groupby("TRAVEL_ID").agg(
+        visit_cnt=("VISIT_AREA_ID", "count"),
+        failed_trip=("IS_FAILED_VISIT", "sum")
+    )
+    trip_summary["failed_trip_rate"] = (trip_summary["failed_trip"] / trip_summary["visit_cnt"]).fillna(0)
+    trip_summary["IS_FAILED_TRIP"] = (trip_summary["failed_trip_rate"] >= 0.5).astype(int)
+    parts.append(trip_summary["IS_FAILED_TRIP"])
+
+    if {"VISIT_START_YMD", "VISIT_END_YMD"}.issubset(df.columns):
+        trip_days = df.groupby("TRAVEL_ID").apply(
+            lambda x: (x["VISIT_END_YMD"].max() - x["VISIT_START_YMD"].min()).days + 1
+            if x["VISIT_START_YMD"].notna().any() and x["VISIT_END_YMD"].notna().any()
+            else np.nan
+        ).rename("TRIP_DAYS")
+        parts.append(trip_days)
+    if "VISIT_AREA_NM" in df.columns:
+        move_count = df.groupby("TRAVEL_ID")["VISIT_AREA_NM"].count().rename("MOVE_CNT")
+        parts.append(move_count)
+
+    aggregated = pd.concat(parts, axis=1).reset_index()
+    aggregated['IS_FAILED_TRIP'] = aggregated['IS_FAILED_TRIP'].fillna(0).astype(int)
+    return aggregated
+
+
+@pytest.fixture
+def visit_area_dataset(tmp_path, monkeypatch):
+    """Register the inline 방문지정보 CSV as mode 'test', year '2000' with a private Arrow cache."""
+    csv_path = tmp_path / "tn_visit_area_info_방문지정보_T.csv"
+    csv_path.write_text(VISIT_AREA_CSV, encoding="utf-8")
+    monkeypatch.setattr(pp, "_file_map_cache", {"test_2000": {"방문지정보": str(csv_path)}})
+    monkeypatch.setattr(pp, "_dataset_cache_root", str(tmp_path / "cache"))
+    return {"mode": "test", "year": "2000"}
+
+
+LEGACY_APPLY_WARNING = "ignore:DataFrameGroupBy.apply operated on the grouping columns:FutureWarning"
+
+
+@pytest.mark.filterwarnings(LEGACY_APPLY_WARNING)
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_visit_area_summary_matches_legacy_lambda(visit_area_dataset, monkeypatch, use_cache):
+    raw = pp.load_dataset("방문지정보", use_cache=use_cache, **visit_area_dataset)
+    expected = _legacy_visit_area_summary(raw.copy())
+
+    load_dataset = pp.load_dataset
+    monkeypatch.setattr(pp, "load_dataset", lambda key, **kw: load_dataset(key, use_cache=use_cache, **kw))
+    result = pp.preprocess_visit_area_info(**visit_area_dataset)
+
+    pd.testing.assert_frame_equal(result, expected)
+    # 경계 사례가 실제로 다뤄졌는지 확인 (뒤섞인 날짜, 일부/전체 결측 날짜, 방문지명 결측)
+    summary = result.set_index("TRAVEL_ID")
+    assert summary.loc["a_0001", "TRIP_DAYS"] == 5
+    assert summary.loc["a_0004", "TRIP_DAYS"] == 5
+    assert np.isnan(summary.loc["a_0005", "TRIP_DAYS"])
+    assert np.isnan(summary.loc["a_0006", "TRIP_DAYS"])
+    assert summary.loc["a_0004", "MOVE_CNT"] == 1
+
+
+@pytest.mark.filterwarnings(LEGACY_APPLY_WARNING)
+def test_visit_area_summary_matches_legacy_lambda_without_schema(visit_area_dataset, monkeypatch):
+    # 스키마 없이 pandas 기본 추론으로 읽은 프레임에서도 두 구현이 같아야 합니다.
+    raw = pd.read_csv(io.StringIO(VISIT_AREA_CSV))
+    expected = _legacy_visit_area_summary(raw.copy())
+
+    monkeypatch.setattr(pp, "load_dataset", lambda key, **kw: raw.copy())
+    result = pp.preprocess_visit_area_info(**visit_area_dataset)
+
+    pd.testing.assert_frame_equal(result, expected)